@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Time repeated report calls to sample_coverage with and without a result cache.
+
+Usage: python benchmarks/bench_cache.py [SAMPLES] [TRANSCRIPTS] [CALLS]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_delete import populate
+
+from chanjo.store.api import ChanjoDB
+from chanjo.store.cache import DiskCache, MemoryCache, ResultCache
+
+
+def run(chanjo_db, calls, sample_ids, genes, summary):
+    """Time calls for one sample at a time, like report pages do."""
+    start = time.perf_counter()
+    for index in range(calls):
+        chanjo_db.sample_coverage([sample_ids[index % len(sample_ids)]], genes, summary=summary)
+    return (time.perf_counter() - start) / calls * 1000
+
+
+if __name__ == "__main__":
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    transcripts = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    calls = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chanjo_db = ChanjoDB(str(Path(tmp_dir).joinpath("bench.sqlite3")))
+        chanjo_db.set_up()
+        populate(chanjo_db, samples, transcripts)
+        chanjo_db.refresh_summaries()
+        sample_ids = [f"sample{index}" for index in range(samples)]
+        genes = list(range(0, transcripts, 5))
+        for summary in [True, False]:
+            for name, cache in [
+                ("none", None),
+                ("memory", ResultCache(MemoryCache())),
+                ("disk", ResultCache(DiskCache(Path(tmp_dir).joinpath(f"cache-{summary}")))),
+            ]:
+                chanjo_db.result_cache = cache
+                elapsed = run(chanjo_db, calls, sample_ids, genes, summary)
+                print(f"summary={summary}\t{name}\t{elapsed:.2f} ms/call")
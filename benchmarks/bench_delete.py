@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare ORM cascade and set-based deletes of a sample group.
+
+Usage: python benchmarks/bench_delete.py [SAMPLES] [TRANSCRIPTS]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from chanjo.store.api import ChanjoDB
+from chanjo.store.models import Sample, Transcript, TranscriptStat
+
+
+def populate(chanjo_db, samples, transcripts):
+    """Insert a group of samples with stats for every transcript."""
+    with chanjo_db.engine.begin() as connection:
+        connection.execute(
+            Transcript.__table__.insert(),
+            [
+                {"id": f"TX{index}", "gene_id": index, "chromosome": "1", "length": 100}
+                for index in range(transcripts)
+            ],
+        )
+        for sample_index in range(samples):
+            sample_id = f"sample{sample_index}"
+            connection.execute(Sample.__table__.insert(), {"id": sample_id, "group_id": "group"})
+            connection.execute(
+                TranscriptStat.__table__.insert(),
+                [
+                    {"sample_id": sample_id, "transcript_id": f"TX{index}", "mean_coverage": 30.0}
+                    for index in range(transcripts)
+                ],
+            )
+
+
+def orm_delete(chanjo_db):
+    with chanjo_db.begin() as session:
+        for sample in session.all(Sample.select().where(Sample.group_id == "group")):
+            session.delete(sample)
+
+
+def set_delete(chanjo_db):
+    chanjo_db.delete_group(group_id="group")
+
+
+def run(samples, transcripts, deleter):
+    """Time one way of deleting against a fresh SQLite database."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chanjo_db = ChanjoDB(str(Path(tmp_dir).joinpath("bench.sqlite3")))
+        chanjo_db.set_up()
+        populate(chanjo_db, samples, transcripts)
+        start = time.perf_counter()
+        deleter(chanjo_db)
+        elapsed = time.perf_counter() - start
+        chanjo_db.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 96
+    transcripts = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    for name, deleter in [("orm", orm_delete), ("set", set_delete)]:
+        elapsed = run(samples, transcripts, deleter)
+        print(f"{name}: {elapsed:.2f} s for {samples} samples x {transcripts} transcripts")
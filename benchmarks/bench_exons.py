@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare text and binary storage of incomplete exons.
+
+Usage: python benchmarks/bench_exons.py [EXONS]
+"""
+import random
+import sys
+import time
+
+from chanjo.store.models import Exon, TranscriptStat
+
+
+def make_exons(count):
+    """Generate incomplete exons for a single transcript."""
+    exons = []
+    start = 1000000
+    for _ in range(count):
+        start += random.randint(200, 5000)
+        exons.append(Exon("7", start, start + random.randint(50, 300), random.uniform(0, 100)))
+    return exons
+
+
+def run(stat, accessor, repeat=1000):
+    """Time repeated access to the incomplete exons."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        accessor(stat.incomplete_exons)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    exons = make_exons(count)
+    text_stat = TranscriptStat(
+        _incomplete_exons=",".join("|".join(map(str, exon)) for exon in exons)
+    )
+    binary_stat = TranscriptStat(incomplete_exons=exons)
+    print(f"text size\t{len(text_stat._incomplete_exons)} bytes")
+    print(f"binary size\t{len(binary_stat._packed_exons)} bytes")
+    print(f"text all\t{run(text_stat, list):.3f} sec")
+    print(f"binary all\t{run(binary_stat, list):.3f} sec")
+    print(f"text column\t{run(text_stat, lambda view: [exon.start for exon in view]):.3f} sec")
+    print(f"binary column\t{run(binary_stat, lambda view: view.starts.tolist()):.3f} sec")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Time CLI start-up for commands that don't need the database.
+
+Usage: python benchmarks/bench_import.py [RUNS]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = [
+    ["--version"],
+    ["sex", "--help"],
+    ["sambamba", "--help"],
+    ["calculate", "--help"],
+]
+
+
+def start_up(args, runs):
+    """Median wall time of running the CLI in a fresh interpreter."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", "from chanjo.cli import root; root()"] + args,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def imported_modules(args):
+    """Count modules imported by a run of the CLI."""
+    code = (
+        "import sys\n"
+        "from chanjo.cli import root\n"
+        "try:\n"
+        "    root({!r})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(len(sys.modules), 'sqlalchemy' in sys.modules)"
+    ).format(args)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return output.stdout.split()[-2:]
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for args in COMMANDS:
+        count, sqlalchemy = imported_modules(args)
+        print(
+            f"chanjo {' '.join(args)}: {start_up(args, runs) * 1000:.0f} ms, "
+            f"{count} modules, sqlalchemy imported: {sqlalchemy}"
+        )
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare ORM and bulk loading of transcript stats.
+
+Usage: python benchmarks/bench_load.py [TRANSCRIPTS]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from chanjo.load.sambamba import load_transcripts
+from chanjo.store.api import ChanjoDB
+
+HEADER = (
+    "# chrom\tchromStart\tchromEnd\tF3\tF4\tF5\tF6\treadCount\tmeanCoverage\t"
+    "percentage10\tpercentage20\tpercentage100\tsampleName\n"
+)
+
+
+def fake_sambamba(transcripts, exons=3):
+    """Generate Sambamba depth output for a number of transcripts."""
+    yield HEADER
+    for tx_index in range(transcripts):
+        for exon_index in range(exons):
+            start = tx_index * 1000 + exon_index * 200
+            yield (
+                f"1\t{start}\t{start + 150}\t1-{start}-{start + 150}\tTX{tx_index}\t"
+                f"{tx_index}\tGENE{tx_index}\t100\t35.2\t100\t95.5\t10.3\tsample\n"
+            )
+
+
+def run(transcripts, loader):
+    """Time one loader against a fresh SQLite database."""
+    lines = list(fake_sambamba(transcripts))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chanjo_db = ChanjoDB(str(Path(tmp_dir).joinpath("bench.sqlite3")))
+        chanjo_db.set_up()
+        start = time.perf_counter()
+        result = load_transcripts(lines, threshold=10)
+        loader(chanjo_db, result)
+        elapsed = time.perf_counter() - start
+        chanjo_db.close()
+    return transcripts / elapsed
+
+
+def orm_loader(chanjo_db, result):
+    with chanjo_db.begin() as session:
+        session.add(result.sample)
+        for tx_model in result.models:
+            session.add(tx_model)
+
+
+def bulk_loader(chanjo_db, result):
+    chanjo_db.add_transcript_stats(result.sample, result.stats)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    for name, loader in [("orm", orm_loader), ("bulk", bulk_loader)]:
+        print(f"{name}\t{run(count, loader):,.0f} rows/sec")
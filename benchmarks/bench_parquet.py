@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare cohort-wide queries on SQLite and on exported Parquet files.
+
+Usage: python benchmarks/bench_parquet.py [SAMPLES] [TRANSCRIPTS]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_delete import populate
+
+from chanjo.store.api import ChanjoDB
+from chanjo.store.parquet import ParquetStore
+
+
+def timed(name, function):
+    start = time.perf_counter()
+    function()
+    print(f"{name}: {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    transcripts = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chanjo_db = ChanjoDB(str(Path(tmp_dir).joinpath("bench.sqlite3")))
+        chanjo_db.set_up()
+        populate(chanjo_db, samples, transcripts)
+        timed("export", lambda: chanjo_db.export_coverage(tmp_dir, partition_by="sample"))
+        store = ParquetStore(tmp_dir)
+        sample_ids = [f"sample{index}" for index in range(samples)]
+        genes = list(range(0, transcripts, 10))
+        for name, query in [
+            ("mean", lambda db: db.mean(summary=False, weighted=True)),
+            ("gene", lambda db: db.gene_metrics(42, summary=False)),
+            ("coverage", lambda db: db.sample_coverage(sample_ids, genes, summary=False)),
+        ]:
+            timed(f"{name} sqlite", lambda: list(query(chanjo_db)))
+            timed(f"{name} parquet", lambda: list(query(store)))
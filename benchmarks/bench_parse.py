@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare per-row and columnar parsing + aggregation of Sambamba output.
+
+Usage: python benchmarks/bench_parse.py [TRANSCRIPTS]
+"""
+import sys
+import time
+
+from bench_load import fake_sambamba
+
+from chanjo.load import columnar, sambamba
+
+
+def run(transcripts, loader):
+    """Time parsing and aggregating all transcript stats."""
+    lines = list(fake_sambamba(transcripts))
+    start = time.perf_counter()
+    result = loader(lines, threshold=10)
+    for _ in result.stats:
+        pass
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for name, module in [("rows", sambamba), ("columnar", columnar)]:
+        print(f"{name}\t{run(count, module.load_transcripts):.2f} sec")
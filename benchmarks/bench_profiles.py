@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare connection profiles when loading many samples into SQLite.
+
+Usage: python benchmarks/bench_profiles.py [SAMPLES] [TRANSCRIPTS]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_load import fake_sambamba
+
+from chanjo.load.link import link_elements
+from chanjo.load.sambamba import load_transcripts
+from chanjo.store.api import ChanjoDB
+from chanjo.store.profiles import PROFILES
+
+
+def run(samples, transcripts, profile):
+    """Time loading samples one commit at a time, like "chanjo load"."""
+    lines = list(fake_sambamba(transcripts))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chanjo_db = ChanjoDB(str(Path(tmp_dir).joinpath("bench.sqlite3")), profile=profile)
+        chanjo_db.set_up()
+        # link first: the bulk and read profiles enforce foreign keys
+        with chanjo_db.begin() as session:
+            session.add_all(link_elements(lines).models)
+        start = time.perf_counter()
+        for index in range(samples):
+            result = load_transcripts(lines, sample_id="sample{}".format(index), threshold=10)
+            chanjo_db.add_transcript_stats(result.sample, result.stats)
+        elapsed = time.perf_counter() - start
+        chanjo_db.close()
+    return samples / elapsed
+
+
+if __name__ == "__main__":
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    transcripts = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    for profile in sorted(PROFILES):
+        print(f"{profile}\t{run(samples, transcripts, profile):,.1f} samples/sec")
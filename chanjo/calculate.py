@@ -1,64 +1,324 @@
 """Module for calculate operations on database"""
 
-from sqlalchemy.sql import func
+from sqlalchemy import Column, MetaData, Table, delete, event, exists, insert, select, types
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql import Select, case, func
 
-from chanjo.store.models import Transcript, TranscriptStat
+from chanjo.store.cache import cache_key, current_generation
+from chanjo.store.constants import COMPLETENESS_LEVELS
+from chanjo.store.models import (
+    GenePanelGene,
+    GeneStat,
+    PanelCoverage,
+    Sample,
+    SampleSummary,
+    Transcript,
+    TranscriptStat,
+    completeness_column,
+)
+
+# longer gene lists are sent once to a temporary table instead of "IN (...)"
+IN_LIST_LIMIT = 500
+GENE_FILTER = Table(
+    "chanjo_gene_filter",
+    MetaData(),
+    Column("gene_id", types.Integer, primary_key=True),
+    prefixes=["TEMPORARY"],
+)
+
+
+def gene_filter(session, column, genes):
+    """Filter a gene id column on a list of genes.
+
+    Short lists are inlined. Long lists, like the OMIM panel, are
+    inserted into a temporary table on the session connection and
+    matched with a sub-select, avoiding huge bound parameter lists.
+    Repeating the same list on a connection reuses the table. The query
+    must run in the same session.
+
+    Args:
+        session (Session): session the query will run in
+        column (Column): gene id column to filter
+        genes (List[int]|Select): gene ids, or a query for them
+
+    Returns:
+        ColumnElement: filter expression
+    """
+    if isinstance(genes, Select):
+        return column.in_(genes)
+    genes = frozenset(genes)
+    if len(genes) <= IN_LIST_LIMIT:
+        return column.in_(genes)
+    connection = session.connection()
+    # temporary tables live as long as the pooled DBAPI connection
+    if connection.info.get(GENE_FILTER.name) != genes:
+        connection.execute(CreateTable(GENE_FILTER, if_not_exists=True))
+        connection.execute(delete(GENE_FILTER))
+        connection.execute(insert(GENE_FILTER), [{"gene_id": gene_id} for gene_id in genes])
+        connection.info[GENE_FILTER.name] = genes
+        # the rows are gone if the transaction is rolled back
+        event.listen(connection, "rollback", forget_gene_filter, once=True)
+    return column.in_(select(GENE_FILTER.c.gene_id))
+
+
+def forget_gene_filter(connection):
+    """Mark the gene filter table of a connection as empty."""
+    connection.info.pop(GENE_FILTER.name, None)
+
+
+def weighted_avg(column):
+    """Average a metric weighted by transcript length.
+
+    Like ``AVG``, rows where the metric is NULL are left out.
+    """
+    weight = case((column.isnot(None), Transcript.length))
+    return func.sum(column * Transcript.length) / func.sum(weight)
+
+
+def stat_metrics(levels=COMPLETENESS_LEVELS, weighted=False):
+    """Aggregate expressions for mean coverage and completeness levels."""
+    aggregate = weighted_avg if weighted else func.avg
+    columns = [TranscriptStat.mean_coverage]
+    columns += [completeness_column(level) for level in levels]
+    return [aggregate(column) for column in columns]
+
+
+def missing_summaries(session, sample_ids=None):
+    """Check for samples with transcript stats but no summary row.
+
+    Summaries are maintained on every write through the store, samples
+    written by other means, e.g. older versions of chanjo, are
+    calculated from transcript stats until "chanjo db refresh-summaries".
+
+    Args:
+        session (Session): session the query will run in
+        sample_ids (Optional[List[str]]): samples to check, else all
+
+    Returns:
+        bool: whether any sample lacks its summary
+    """
+    query = (
+        select(Sample.id)
+        .outerjoin(SampleSummary, SampleSummary.sample_id == Sample.id)
+        .where(
+            SampleSummary.sample_id.is_(None),
+            exists().where(TranscriptStat.sample_id == Sample.id),
+        )
+    )
+    if sample_ids:
+        query = query.where(Sample.id.in_(sample_ids))
+    return session.execute(query.limit(1)).first() is not None
+
+
+def mean_query(session, sample_ids=None, levels=COMPLETENESS_LEVELS, summary=True, weighted=False):
+    """Build the query behind :meth:`CalculateMixin.mean` in a session."""
+    if (
+        summary
+        and not weighted
+        and set(levels).issubset(COMPLETENESS_LEVELS)
+        and not missing_summaries(session, sample_ids)
+    ):
+        query = session.query(
+            SampleSummary.sample_id,
+            SampleSummary.mean_coverage,
+            *[getattr(SampleSummary, "completeness_{}".format(level)) for level in levels],
+        )
+        if sample_ids:
+            query = query.filter(SampleSummary.sample_id.in_(sample_ids))
+        return query
+
+    query = session.query(
+        TranscriptStat.sample_id, *stat_metrics(levels, weighted=weighted)
+    ).group_by(TranscriptStat.sample_id)
+    if weighted:
+        query = query.join(TranscriptStat.transcript)
+    if sample_ids:
+        query = query.filter(TranscriptStat.sample_id.in_(sample_ids))
+    return query
+
+
+def gene_metrics_query(session, *genes, summary=True, weighted=False):
+    """Build the query behind :meth:`CalculateMixin.gene_metrics` in a session."""
+    if summary and not weighted and not missing_summaries(session):
+        return session.query(
+            GeneStat.sample_id,
+            GeneStat.mean_coverage,
+            *[getattr(GeneStat, "completeness_{}".format(level)) for level in COMPLETENESS_LEVELS],
+            GeneStat.gene_id,
+        ).filter(GeneStat.gene_id.in_(genes))
+
+    return (
+        session.query(
+            TranscriptStat.sample_id, *stat_metrics(weighted=weighted), Transcript.gene_id
+        )
+        .join(TranscriptStat.transcript)
+        .filter(Transcript.gene_id.in_(genes))
+        .group_by(TranscriptStat.sample_id, Transcript.gene_id)
+    )
+
+
+def coverage_query(
+    session, sample_ids, genes=None, level=10, summary=True, weighted=False, panel=None
+):
+    """Build the query behind :meth:`CalculateMixin.sample_coverage` in a session."""
+    use_summary = summary and not weighted and level in COMPLETENESS_LEVELS
+    use_summary = use_summary and not missing_summaries(session, sample_ids)
+    if panel is not None:
+        if use_summary:
+            return session.query(
+                PanelCoverage.sample_id.label("sample_id"),
+                PanelCoverage.mean_coverage.label("mean_coverage"),
+                getattr(PanelCoverage, "completeness_{}".format(level)).label("mean_completeness"),
+            ).filter(PanelCoverage.panel_id == panel, PanelCoverage.sample_id.in_(sample_ids))
+        genes = select(GenePanelGene.gene_id).where(GenePanelGene.panel_id == panel)
+
+    if use_summary:
+        count = GeneStat.transcript_count
+        total = func.sum(count)
+        completeness = getattr(GeneStat, "completeness_{}".format(level))
+        query = (
+            session.query(
+                GeneStat.sample_id.label("sample_id"),
+                (func.sum(GeneStat.mean_coverage * count) / total).label("mean_coverage"),
+                (func.sum(completeness * count) / total).label("mean_completeness"),
+            )
+            .filter(
+                gene_filter(session, GeneStat.gene_id, genes),
+                GeneStat.sample_id.in_(sample_ids),
+            )
+            .group_by(GeneStat.sample_id)
+        )
+    else:
+        coverage, completeness = stat_metrics([level], weighted=weighted)
+        query = (
+            session.query(
+                TranscriptStat.sample_id.label("sample_id"),
+                coverage.label("mean_coverage"),
+                completeness.label("mean_completeness"),
+            )
+            .join(Transcript, TranscriptStat.transcript_id == Transcript.id)
+            .filter(
+                gene_filter(session, Transcript.gene_id, genes),
+                TranscriptStat.sample_id.in_(sample_ids),
+            )
+            .group_by(TranscriptStat.sample_id)
+        )
+    return query
+
+
+def coverage_results(query):
+    """Collect coverage per sample from a :func:`coverage_query`."""
+    return {
+        result.sample_id: {
+            "mean_coverage": result.mean_coverage,
+            "mean_completeness": result.mean_completeness,
+        }
+        for result in query
+    }
 
 
 class CalculateMixin:
-    """Methods for calculating various metrics."""
+    """Methods for calculating various metrics.
+
+    Attributes:
+        result_cache (Optional[chanjo.store.cache.ResultCache]): reuses
+            :meth:`sample_coverage` results until the data changes
+    """
+
+    result_cache = None
 
-    def mean(self, sample_ids=None):
-        """Calculate the mean values of all metrics per sample."""
+    def mean(self, sample_ids=None, levels=COMPLETENESS_LEVELS, summary=True, weighted=False):
+        """Calculate the mean values of all metrics per sample.
+
+        Args:
+            sample_ids (Optional[List[str]]): samples to limit query to
+            levels (Optional[List[int]]): completeness levels to include
+            summary (Optional[bool]): read from the "sample_summary" table,
+                levels without a fixed column and samples without a
+                summary are always calculated
+            weighted (Optional[bool]): weight transcripts by length, always
+                calculated from transcript stats
+        """
         with self.begin() as session:
-            sql_query = session.query(
-                TranscriptStat.sample_id,
-                func.avg(TranscriptStat.mean_coverage),
-                func.avg(TranscriptStat.completeness_10),
-                func.avg(TranscriptStat.completeness_15),
-                func.avg(TranscriptStat.completeness_20),
-                func.avg(TranscriptStat.completeness_50),
-                func.avg(TranscriptStat.completeness_100),
-            ).group_by(TranscriptStat.sample_id)
-            if sample_ids:
-                sql_query = sql_query.filter(TranscriptStat.sample_id.in_(sample_ids))
-            return sql_query
-
-    def gene_metrics(self, *genes):
-        """Calculate gene statistics."""
-        query = (
-            self.mean()
-            .add_column(Transcript.gene_id)
-            .join(TranscriptStat.transcript)
-            .filter(Transcript.gene_id.in_(genes))
-            .group_by(Transcript.gene_id)
+            return mean_query(
+                session, sample_ids=sample_ids, levels=levels, summary=summary, weighted=weighted
+            )
+
+    def gene_metrics(self, *genes, summary=True, weighted=False):
+        """Calculate gene statistics.
+
+        Args:
+            genes (List[int]): gene ids to limit query to
+            summary (Optional[bool]): read from the "gene_stat" table,
+                unless samples lack their summary
+            weighted (Optional[bool]): weight transcripts by length, always
+                calculated from transcript stats
+        """
+        with self.begin() as session:
+            return gene_metrics_query(session, *genes, summary=summary, weighted=weighted)
+
+    def coverage_query(
+        self,
+        session,
+        sample_ids: list,
+        genes: list = None,
+        level: int = 10,
+        summary: bool = True,
+        weighted: bool = False,
+        panel: str = None,
+    ):
+        """Build the query behind :meth:`sample_coverage` in a session."""
+        return coverage_query(
+            session,
+            sample_ids,
+            genes,
+            level=level,
+            summary=summary,
+            weighted=weighted,
+            panel=panel,
         )
-        return query
 
-    def sample_coverage(self, sample_ids: list, genes: list) -> dict:
-        """Calculate coverage for samples."""
+    def sample_coverage(
+        self,
+        sample_ids: list,
+        genes: list = None,
+        level: int = 10,
+        summary: bool = True,
+        weighted: bool = False,
+        panel: str = None,
+    ) -> dict:
+        """Calculate coverage for samples, completeness at ``level``.
+
+        The summary averages are per gene so they are weighted by the
+        number of transcripts in each gene to average across transcripts.
+        With ``weighted`` transcripts are instead weighted by length.
+        For a stored ``panel`` the coverage calculated at load time is
+        looked up instead of ``genes``. Results are cached with a
+        :attr:`result_cache`.
+        """
         with self.begin() as session:
-            query = (
-                session.query(
-                    TranscriptStat.sample_id.label("sample_id"),
-                    func.avg(TranscriptStat.mean_coverage).label("mean_coverage"),
-                    func.avg(TranscriptStat.completeness_10).label("mean_completeness"),
-                )
-                .join(
-                    Transcript,
-                )
-                .filter(
-                    Transcript.gene_id.in_(genes),
-                    TranscriptStat.sample_id.in_(sample_ids),
+
+            def compute():
+                query = self.coverage_query(
+                    session,
+                    sample_ids,
+                    genes,
+                    level=level,
+                    summary=summary,
+                    weighted=weighted,
+                    panel=panel,
                 )
-                .group_by(TranscriptStat.sample_id)
-            )
+                return coverage_results(query)
 
-            data = {
-                result.sample_id: {
-                    "mean_coverage": result.mean_coverage,
-                    "mean_completeness": result.mean_completeness,
-                }
-                for result in query
-            }
-            return data
+            if self.result_cache is None:
+                return compute()
+            key = cache_key(
+                "sample_coverage",
+                frozenset(sample_ids),
+                None if genes is None else frozenset(genes),
+                level,
+                summary,
+                weighted,
+                panel,
+            )
+            return self.result_cache.get_or_compute(current_generation(session), key, compute)
@@ -1,7 +1,51 @@
+"""Command line interface, subcommands are imported on first access.
+
+``from chanjo.cli import sex`` imports only the "sex" module, so running
+one command doesn't import the others (and SQLAlchemy).
+"""
+import sys
+from importlib import import_module
+from types import ModuleType
+
 from .base import root
-from .calculate import calculate
-from .db import db_cmd
-from .init import init
-from .load import link, load
-from .sambamba import sambamba
-from .sex import sex
+
+# command name: module defining it
+COMMANDS = {
+    "calculate": "calculate",
+    "db_cmd": "db",
+    "export": "export",
+    "init": "init",
+    "link": "load",
+    "load": "load",
+    "load_bam": "load",
+    "load_batch": "load",
+    "panel": "panel",
+    "sambamba": "sambamba",
+    "serve": "serve",
+    "sex": "sex",
+}
+
+__all__ = ["root"] + sorted(COMMANDS)
+
+
+class CommandsModule(ModuleType):
+    """Keep commands from being shadowed by their modules.
+
+    Importing e.g. ``chanjo.cli.calculate`` sets the module as an
+    attribute on the package, hiding the command of the same name.
+    """
+
+    def __setattr__(self, name, value):
+        if name in COMMANDS and isinstance(value, ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+def __getattr__(name):
+    if name not in COMMANDS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    module = import_module("." + COMMANDS[name], __name__)
+    return getattr(module, name)
+
+
+sys.modules[__name__].__class__ = CommandsModule
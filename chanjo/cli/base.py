@@ -6,6 +6,7 @@ Command line interface (console entry points). Based on Click_.
 """
 import logging
 import os
+from functools import lru_cache
 
 try:
     from importlib.metadata import entry_points
@@ -14,32 +15,44 @@ except ImportError:  # Backport support for importlib metadata on Python 3.7
 
 import click
 import coloredlogs
-import yaml
 
 from chanjo import __title__, __version__
+from chanjo.store.profiles import PROFILES
 
 LOG = logging.getLogger(__name__)
 
 COMMAND_GROUP_KEY = "chanjo.subcommands.4"
 
 
+@lru_cache(maxsize=None)
+def command_entry_points():
+    """Find the sub-command entry points, once per process.
+
+    Returns:
+        Dict[str, EntryPoint]: entry points by command name
+    """
+    if hasattr(entry_points(), "select"):
+        # Python >3.10, importlib
+        eps = entry_points(group=COMMAND_GROUP_KEY)
+    else:
+        eps = entry_points().get(COMMAND_GROUP_KEY, [])
+    return {ep.name: ep for ep in eps}
+
+
 class EntryPointsCLI(click.MultiCommand):
-    """Add sub-commands dynamically to a CLI via entry points."""
+    """Add sub-commands dynamically to a CLI via entry points.
+
+    Only the module of the command that is run gets imported.
+    """
 
     def _iter_commands(self):
         """Iterate over all sub-commands as defined by the entry point."""
-        # Get all entry points for the specified group
-        if hasattr(entry_points(), "select"):
-            # Python >3.10, importlib
-            eps = entry_points(group=COMMAND_GROUP_KEY)
-        else:
-            eps = entry_points().get(COMMAND_GROUP_KEY, [])
-        return {ep.name: ep for ep in eps}
+        return command_entry_points()
 
     def list_commands(self, ctx):
         """List the available commands."""
         commands = self._iter_commands()
-        return commands.keys()
+        return sorted(commands.keys())
 
     def get_command(self, ctx, name):
         """Load one of the available commands."""
@@ -55,11 +68,19 @@ class EntryPointsCLI(click.MultiCommand):
     "-c", "--config", default="./chanjo.yaml", type=click.Path(), help="path to config file"
 )
 @click.option("-d", "--database", help="path/URI of the SQL database")
+@click.option(
+    "--profile",
+    type=click.Choice(sorted(PROFILES)),
+    help=(
+        "connection settings tuned for a workload [default: default], SQLite foreign keys"
+        " are on with bulk/read: stats for unlinked transcripts aren't loaded"
+    ),
+)
 @click.option("-l", "--log-level", default="INFO")
 @click.option("--log-file", type=click.File("a"))
 @click.version_option(__version__, prog_name=__title__)
 @click.pass_context
-def root(context, config, database, log_level, log_file):
+def root(context, config, database, profile, log_level, log_file):
     """Clinical sequencing coverage analysis tool."""
     logout = log_file or click.get_text_stream("stderr")
     coloredlogs.install(level=log_level, stream=logout)
@@ -67,11 +88,14 @@ def root(context, config, database, log_level, log_file):
 
     # Load configuration from the provided file
     if os.path.exists(config):
+        import yaml
+
         with open(config) as conf_handle:
             context.obj = yaml.safe_load(conf_handle)
     else:
         context.obj = {}
     context.obj["database"] = database or context.obj.get("database")
+    context.obj["profile"] = profile or context.obj.get("profile")
 
     # Update the context with new defaults from the config file
     context.default_map = context.obj
@@ -5,8 +5,9 @@ import logging
 
 import click
 
-from chanjo.store.api import ChanjoDB
-from chanjo.store.constants import OMIM_GENE_IDS, STAT_COLUMNS
+from chanjo.store.constants import COMPLETENESS_LEVELS, OMIM_GENE_IDS
+from chanjo.store.parquet import get_store
+from chanjo.store.profiles import store_options
 
 LOG = logging.getLogger(__name__)
 
@@ -23,18 +24,34 @@ def dump_json(data, pretty=False):
 @click.group()
 @click.pass_context
 def calculate(context):
-    """Calculate statistics across samples."""
-    context.obj["db"] = ChanjoDB(uri=context.obj["database"])
+    """Calculate statistics across samples.
+
+    The database may also be Parquet files from "chanjo export".
+    """
+    try:
+        context.obj["db"] = get_store(context.obj["database"], **store_options(context.obj))
+    except ImportError:
+        raise click.UsageError("Parquet files require DuckDB: pip install chanjo[duckdb]")
 
 
 @calculate.command()
 @click.option("-p", "--pretty", is_flag=True)
 @click.option("-s", "--sample", multiple=True, help="sample to limit query to")
+@click.option(
+    "-l",
+    "--level",
+    multiple=True,
+    type=int,
+    help="completeness levels to include [default: 10, 15, 20, 50, 100]",
+)
+@click.option("-w", "--weighted", is_flag=True, help="weight transcripts by length")
 @click.pass_context
-def mean(context, sample, pretty):
+def mean(context, sample, level, weighted, pretty):
     """Calculate mean statistics."""
-    query = context.obj["db"].mean(sample_ids=sample)
-    columns = ["sample_id"] + STAT_COLUMNS
+    levels = level or COMPLETENESS_LEVELS
+    query = context.obj["db"].mean(sample_ids=sample, levels=levels, weighted=weighted)
+    columns = ["sample_id", "mean_coverage"]
+    columns += ["completeness_{}".format(completeness_level) for completeness_level in levels]
     for result in query:
         row = {column: value for column, value in zip(columns, result)}
         click.echo(dump_json(row, pretty=pretty))
@@ -44,17 +61,22 @@ def mean(context, sample, pretty):
 @click.option("-p", "--pretty", is_flag=True, help="Print in pretty format")
 @click.option("-s", "--sample", multiple=True, type=str, help="Sample to get coverage for")
 @click.option("-o", "--omim", is_flag=True, help="Use genes in the OMIM panel")
+@click.option("-P", "--panel", help="Use a stored gene panel (see 'chanjo panel')")
+@click.option("-l", "--level", default=10, help="Completeness level to report")
+@click.option("-w", "--weighted", is_flag=True, help="Weight transcripts by length")
 @click.option(
     "-f", "--gene-file", type=click.Path(exists=True), help="File with row separated gene IDs"
 )
 @click.argument("genes", nargs=-1)
 @click.pass_context
-def coverage(context, pretty, sample, omim, gene_file, genes):
+def coverage(context, pretty, sample, omim, panel, level, weighted, gene_file, genes):
     """Calculate coverage for sample on specified genes"""
     if omim:
         genes = OMIM_GENE_IDS
     if gene_file:
         with open(gene_file) as file_handle:
             genes = file_handle.read().strip().split("\n")
-    query = context.obj["db"].sample_coverage(sample_ids=sample, genes=list(genes))
+    query = context.obj["db"].sample_coverage(
+        sample_ids=sample, genes=list(genes), level=level, weighted=weighted, panel=panel
+    )
     click.echo(dump_json(query, pretty=pretty))
@@ -2,20 +2,35 @@
 
 import json
 import logging
+import textwrap
 
 import click
 
+from chanjo.client import ChanjoClient, is_server_uri
 from chanjo.store.api import ChanjoDB
-from chanjo.store.models import Sample
+from chanjo.store.profiles import store_options
 
 LOG = logging.getLogger(__name__)
+# rows fetched from the database at a time when streaming output
+YIELD_PER = 1000
+# commands a "chanjo serve" process can answer
+FORWARDED_COMMANDS = ("samples", "transcripts")
 
 
 @click.group("db")
 @click.pass_context
 def db_cmd(context):
     """Interact with the database for maintainance tasks."""
-    context.obj["db"] = ChanjoDB(uri=context.obj["database"])
+    if is_server_uri(context.obj["database"]):
+        if context.invoked_subcommand not in FORWARDED_COMMANDS:
+            raise click.UsageError(
+                "'db {}' needs direct access to the database, not a server".format(
+                    context.invoked_subcommand
+                )
+            )
+        context.obj["db"] = ChanjoClient(context.obj["database"])
+        return
+    context.obj["db"] = ChanjoDB(uri=context.obj["database"], **store_options(context.obj))
 
 
 @db_cmd.command()
@@ -30,50 +45,99 @@ def setup(context, reset):
     context.obj["db"].set_up()
 
 
+@db_cmd.command()
+@click.pass_context
+def migrate(context):
+    """Upgrade an existing database to the current schema."""
+    added = context.obj["db"].migrate()
+    for column in added:
+        click.echo("added column: {}".format(column))
+
+
+@db_cmd.command("refresh-summaries")
+@click.option("--sample-id", "-s", multiple=True, help="Samples to refresh [default: all]")
+@click.pass_context
+def refresh_summaries(context, sample_id):
+    """Rebuild the per-sample and per-gene summary tables."""
+    LOG.info("refreshing summaries")
+    context.obj["db"].refresh_summaries(sample_ids=list(sample_id) or None)
+
+
 @db_cmd.command()
 @click.argument("sample_id", type=str)
 @click.pass_context
 def remove(context, sample_id):
     """Remove all traces of a sample from the database."""
     store = context.obj["db"]
-    LOG.debug("find sample in database with id: %s", sample_id)
-    with store.begin() as session:
-        sample_obj = session.first(Sample.select().where(Sample.id == sample_id))
-        if sample_obj is None:
-            LOG.warning("sample (%s) not found in database", sample_id)
-            context.abort()
-        LOG.info("delete sample (%s) from database", sample_id)
-        session.delete(sample_obj)
+    LOG.info("delete sample (%s) from database", sample_id)
+    if not store.delete_sample(sample_id):
+        LOG.warning("sample (%s) not found in database", sample_id)
+        context.abort()
+
+
+def stream_json(rows, pretty=False, ndjson=False):
+    """Serialize rows to JSON one at a time.
+
+    Args:
+        rows (Iterable[dict]): rows to serialize
+        pretty (Optional[bool]): indent the output
+        ndjson (Optional[bool]): write one JSON object per line instead of
+            an array
+
+    Yields:
+        str: chunks of JSON text, the same as dumping the list at once
+    """
+    indent = 4 if pretty else None
+    if ndjson:
+        for row in rows:
+            yield json.dumps(row, default=str) + "\n"
+        return
+
+    separator = ",\n" if pretty else ", "
+    prefix = "[\n" if pretty else "["
+    empty = True
+    for row in rows:
+        chunk = json.dumps(row, default=str, indent=indent)
+        if pretty:
+            chunk = textwrap.indent(chunk, " " * indent)
+        yield prefix + chunk
+        prefix = separator
+        empty = False
+    yield "[]\n" if empty else ("\n]\n" if pretty else "]\n")
+
+
+def echo_rows(rows, pretty=False, ndjson=False):
+    """Stream ORM query results, or dicts from a server, to the console as JSON."""
+    if hasattr(rows, "yield_per"):
+        rows = (dict(result) for result in rows.yield_per(YIELD_PER))
+    for chunk in stream_json(rows, pretty=pretty, ndjson=ndjson):
+        click.echo(chunk, nl=False)
 
 
 @db_cmd.command()
 @click.option("--group-id", "-g", help="Display samples in a group")
 @click.option("--sample-id", "-s", help="Display sample")
 @click.option("--pretty", "-p", is_flag=True, help="Print in pretty format")
+@click.option("--ndjson", is_flag=True, help="Print one JSON object per line")
 @click.pass_context
-def samples(context, group_id, sample_id, pretty):
+def samples(context, group_id, sample_id, pretty, ndjson):
     """Display samples from database"""
 
     store = context.obj["db"]
-    query = store.fetch_samples(sample_id=sample_id, group_id=group_id)
-    indent = None
-    if pretty:
-        indent = 4
-    click.echo(json.dumps([dict(result) for result in query], default=str, indent=indent))
+    rows = store.fetch_samples(sample_id=sample_id, group_id=group_id)
+    echo_rows(rows, pretty=pretty, ndjson=ndjson)
 
 
 @db_cmd.command()
 @click.option("--sample-id", "-s", help="Samples to limit query to")
 @click.option("--pretty", "-p", is_flag=True, help="Print in pretty format")
+@click.option("--ndjson", is_flag=True, help="Print one JSON object per line")
 @click.pass_context
-def transcripts(context, sample_id, pretty):
+def transcripts(context, sample_id, pretty, ndjson):
     """Display transcripts from database"""
     store = context.obj["db"]
-    query = store.fetch_transcripts(sample_id=sample_id)
-    indent = None
-    if pretty:
-        indent = 4
-    click.echo(json.dumps([dict(result) for result in query], default=str, indent=indent))
+    rows = store.fetch_transcripts(sample_id=sample_id)
+    echo_rows(rows, pretty=pretty, ndjson=ndjson)
 
 
 @db_cmd.command()
@@ -0,0 +1,46 @@
+"""CLI command to export coverage to Parquet or Arrow IPC files"""
+
+import logging
+
+import click
+
+from chanjo.store.api import ChanjoDB
+from chanjo.store.export import EXPORT_FORMATS, PARTITIONS
+from chanjo.store.profiles import store_options
+
+LOG = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option(
+    "-f", "--format", "file_format", type=click.Choice(sorted(EXPORT_FORMATS)), default="parquet"
+)
+@click.option(
+    "-p",
+    "--partition-by",
+    type=click.Choice(sorted(PARTITIONS)),
+    help="write a directory with one file per sample or group",
+)
+@click.option("-s", "--sample", multiple=True, help="sample to limit export to")
+@click.option("-g", "--group", help="group to limit export to")
+@click.option("-b", "--batch-size", default=65536, help="rows per record batch")
+@click.argument("out_path", type=click.Path())
+@click.pass_context
+def export(context, file_format, partition_by, sample, group, batch_size, out_path):
+    """Export transcript stats, with transcript and sample columns."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise click.UsageError("'export' requires pyarrow: pip install chanjo[arrow]")
+
+    chanjo_db = ChanjoDB(uri=context.obj["database"], **store_options(context.obj))
+    written = chanjo_db.export_coverage(
+        out_path,
+        file_format=file_format,
+        partition_by=partition_by,
+        sample_ids=list(sample),
+        group_id=group,
+        batch_size=batch_size,
+    )
+    for path, rows in written.items():
+        click.echo("{}\t{}".format(path, rows))
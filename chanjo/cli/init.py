@@ -10,6 +10,7 @@ import yaml
 from chanjo.init.bootstrap import BED_NAME, DB_NAME, pull
 from chanjo.init.demo import DEMO_BED_NAME, setup_demo
 from chanjo.store.api import ChanjoDB
+from chanjo.store.profiles import store_options
 
 LOG = logging.getLogger(__name__)
 
@@ -49,14 +50,14 @@ def init(context, force, demo, auto, build, root_dir):
         setup_demo(root_dir, force=force)
 
         LOG.info("configure new chanjo database: %s", db_uri)
-        chanjo_db = ChanjoDB(db_uri)
+        chanjo_db = ChanjoDB(db_uri, **store_options(context.obj))
         chanjo_db.set_up()
         is_bootstrapped = True
     elif auto or click.confirm("Bootstrap HGNC transcript BED?"):
         pull(root_dir, force=force, build=build)
 
         LOG.info("configure new chanjo database: %s", db_uri)
-        chanjo_db = ChanjoDB(db_uri)
+        chanjo_db = ChanjoDB(db_uri, **store_options(context.obj))
         chanjo_db.set_up()
         is_bootstrapped = True
 
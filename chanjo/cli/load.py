@@ -6,9 +6,15 @@ from pathlib import Path
 import click
 from sqlalchemy.exc import IntegrityError
 
+from chanjo.client import ChanjoClient, is_server_uri
+from chanjo.exc import BedFormattingError, ServerError
+from chanjo.load.batch import Job, process_jobs, read_manifest
 from chanjo.load.link import link_elements
-from chanjo.load.sambamba import load_transcripts
+from chanjo.load.sambamba import load_exons, load_transcripts
 from chanjo.store.api import ChanjoDB
+from chanjo.store.constants import COMPLETENESS_LEVELS
+from chanjo.store.models import Sample
+from chanjo.store.profiles import store_options
 
 LOG = logging.getLogger(__name__)
 
@@ -32,6 +38,11 @@ def validate_stdin(context, param, value):
 @click.option("-n", "--name", help="display name for sample")
 @click.option("-gn", "--group-name", help="display name for sample group")
 @click.option("-r", "--threshold", default=10, help="completeness level to disqualify exons")
+@click.option("-b", "--batch-size", type=int, help="rows per bulk insert statement")
+@click.option("--columnar", is_flag=True, help="parse with NumPy column arrays")
+@click.option("--stream", is_flag=True, help="input is sorted by transcript, stream it")
+@click.option("-w", "--window", type=int, help="stream input sorted by position, max intron size")
+@click.option("-i", "--index", is_flag=True, help="look up transcripts in exons from 'chanjo link'")
 @click.argument(
     "bed_stream",
     callback=validate_stdin,
@@ -40,33 +51,207 @@ def validate_stdin(context, param, value):
     required=False,
 )
 @click.pass_context
-def load(context, sample, group, name, group_name, threshold, bed_stream):
+def load(
+    context,
+    sample,
+    group,
+    name,
+    group_name,
+    threshold,
+    batch_size,
+    columnar,
+    stream,
+    window,
+    index,
+    bed_stream,
+):
     """Load Sambamba output into the database for a sample."""
-    chanjo_db = ChanjoDB(uri=context.obj["database"])
     source = str(Path(bed_stream.name).resolve())
+    if is_server_uri(context.obj["database"]):
+        if columnar or batch_size:
+            raise click.UsageError("'--columnar' and '--batch-size' are set by the server")
+        options = dict(sample_id=sample, group_id=group, name=name, group_name=group_name)
+        options.update(threshold=threshold, stream=stream, window=window, index=index)
+        forward_load(context, bed_stream, source=source, **options)
+        return
 
-    result = load_transcripts(
-        bed_stream, sample_id=sample, group_id=group, source=source, threshold=threshold
-    )
+    chanjo_db = ChanjoDB(uri=context.obj["database"], **store_options(context.obj))
+
+    options = dict(sample_id=sample, group_id=group, source=source, threshold=threshold)
+    if columnar:
+        if stream or window is not None or index:
+            raise click.UsageError("'--columnar' can't be combined with streaming or '--index'")
+        try:
+            from chanjo.load.columnar import load_transcripts as columnar_loader
+        except ImportError:
+            raise click.UsageError("'--columnar' requires NumPy: pip install chanjo[numpy]")
+        result = columnar_loader(bed_stream, **options)
+    else:
+        if index:
+            options["index"] = chanjo_db.fetch_exon_index()
+            if not options["index"]:
+                raise click.UsageError("no exons linked, run: chanjo link --exons-only")
+        stream = stream or window is not None
+        result = load_transcripts(bed_stream, stream=stream, window=window, **options)
 
     result.sample.name = name
     result.sample.group_name = group_name
+    save_result(context, chanjo_db, result, batch_size=batch_size)
+
+
+@click.command("load-bam")
+@click.option(
+    "-R",
+    "--regions",
+    type=click.File(encoding="utf-8"),
+    help="chanjo BED file with exon regions [default: exons from 'chanjo link']",
+)
+@click.option(
+    "-T",
+    "--cov-threshold",
+    "cov_thresholds",
+    multiple=True,
+    type=int,
+    help="levels to sample completeness at [default: 10, 15, 20, 50, 100]",
+)
+@click.option("-s", "--sample", help="override sample id from BAM read groups")
+@click.option("-g", "--group", help="id to group related samples")
+@click.option("-n", "--name", help="display name for sample")
+@click.option("-gn", "--group-name", help="display name for sample group")
+@click.option("-r", "--threshold", default=10, help="completeness level to disqualify exons")
+@click.option("-p", "--processes", type=int, help="worker processes [default: all cores]")
+@click.option("-b", "--batch-size", type=int, help="rows per bulk insert statement")
+@click.argument("bam_file", type=click.Path(exists=True))
+@click.pass_context
+def load_bam(
+    context,
+    regions,
+    cov_thresholds,
+    sample,
+    group,
+    name,
+    group_name,
+    threshold,
+    processes,
+    batch_size,
+    bam_file,
+):
+    """Calculate coverage from a BAM file and load it for a sample."""
     try:
-        with chanjo_db.begin() as session:
-            session.add(result.sample)
-            with click.progressbar(
-                result.models, length=result.count, label="loading transcripts"
-            ) as bar:
-                for tx_model in bar:
-                    session.add(tx_model)
+        from chanjo.coverage import bam_coverage, read_regions
+    except ImportError:
+        raise click.UsageError("'load-bam' requires pysam: pip install chanjo[pysam]")
+
+    chanjo_db = ChanjoDB(uri=context.obj["database"], **store_options(context.obj))
+    index = None
+    if regions:
+        region_list = read_regions(regions)
+    else:
+        index = chanjo_db.fetch_exon_index()
+        if not index:
+            raise click.UsageError("no exons linked, provide '--regions' or run 'chanjo link'")
+        region_list = [(chrom, start, end, []) for chrom, start, end in sorted(index)]
+
+    exons = bam_coverage(
+        bam_file,
+        region_list,
+        thresholds=cov_thresholds or COMPLETENESS_LEVELS,
+        sample_id=sample,
+        processes=processes,
+    )
+    result = load_exons(
+        exons,
+        sample_id=sample,
+        group_id=group,
+        source=str(Path(bam_file).resolve()),
+        threshold=threshold,
+        index=index,
+    )
+    result.sample.name = name
+    result.sample.group_name = group_name
+    save_result(context, chanjo_db, result, batch_size=batch_size)
+
+
+def forward_load(context, bed_stream, **options):
+    """Send Sambamba output to a "chanjo serve" process, abort on failure."""
+    client = ChanjoClient(context.obj["database"])
+    try:
+        result = client.load(bed_stream.read(), **options)
+    except ServerError as error:
+        LOG.error("%s, rolling back", error)
+        context.abort()
+    LOG.info("loaded %s transcripts for sample: %s", result["count"], result["sample_id"])
+
+
+def save_result(context, chanjo_db, result, batch_size=None):
+    """Bulk insert a loaded sample, abort on failure."""
+    try:
+        with click.progressbar(
+            result.stats, length=result.count, label="loading transcripts"
+        ) as bar:
+            chanjo_db.add_transcript_stats(result.sample, bar, batch_size=batch_size)
 
     except IntegrityError as error:
         LOG.error("sample already loaded, rolling back")
         LOG.debug(error.args[0])
         context.abort()
+    except BedFormattingError as error:
+        LOG.error("%s, rolling back", error)
+        context.abort()
+
+
+@click.command("load-batch")
+@click.option("-m", "--manifest", type=click.File(encoding="utf-8"), help="TSV of samples to load")
+@click.option("-g", "--group", help="id to group related samples")
+@click.option("-gn", "--group-name", help="display name for sample group")
+@click.option("-r", "--threshold", default=10, help="completeness level to disqualify exons")
+@click.option("-p", "--processes", type=int, help="worker processes [default: all cores]")
+@click.option("-b", "--batch-size", type=int, help="rows per bulk insert statement")
+@click.argument("bed_files", nargs=-1, type=click.Path(exists=True))
+@click.pass_context
+def load_batch(context, manifest, group, group_name, threshold, processes, batch_size, bed_files):
+    """Load many Sambamba outputs into the database in parallel."""
+    jobs = [Job(path, None, group, None, group_name) for path in bed_files]
+    if manifest:
+        jobs += [
+            job._replace(group_id=job.group_id or group, group_name=job.group_name or group_name)
+            for job in read_manifest(manifest)
+        ]
+    if not jobs:
+        raise click.UsageError("provide Sambamba output files or a manifest")
+
+    chanjo_db = ChanjoDB(uri=context.obj["database"], **store_options(context.obj))
+    results = process_jobs(jobs, threshold=threshold, processes=processes)
+    failed = []
+    with click.progressbar(results, length=len(jobs), label="loading samples") as bar:
+        # single writer: parsing happens in the pool, inserts only here
+        for result in bar:
+            if result.error:
+                LOG.error("failed to parse %s: %s", result.job.path, result.error)
+                failed.append(result.job.path)
+                continue
+            sample_obj = Sample(
+                id=result.sample_id,
+                group_id=result.job.group_id,
+                source=result.source,
+                thresholds=result.thresholds,
+                name=result.job.name,
+                group_name=result.job.group_name,
+            )
+            try:
+                chanjo_db.add_transcript_stats(sample_obj, result.stats, batch_size=batch_size)
+            except IntegrityError as error:
+                LOG.error("sample %s already loaded, rolling back", result.sample_id)
+                LOG.debug(error.args[0])
+                failed.append(result.job.path)
+
+    if failed:
+        LOG.error("%s of %s samples failed to load", len(failed), len(jobs))
+        context.abort()
 
 
 @click.command()
+@click.option("--exons-only", is_flag=True, help="only (re-)build the exon index")
 @click.argument(
     "bed_stream",
     callback=validate_stdin,
@@ -75,17 +260,19 @@ def load(context, sample, group, name, group_name, threshold, bed_stream):
     required=False,
 )
 @click.pass_context
-def link(context, bed_stream):
+def link(context, exons_only, bed_stream):
     """Link related genomic elements."""
-    chanjo_db = ChanjoDB(uri=context.obj["database"])
+    chanjo_db = ChanjoDB(uri=context.obj["database"], **store_options(context.obj))
     result = link_elements(bed_stream)
     try:
-        with chanjo_db.begin() as session:
+        if exons_only:
+            LOG.info("adding exon index")
+            chanjo_db.add_exons(result.exons, replace=True)
+        else:
             with click.progressbar(
                 result.models, length=result.count, label="adding transcripts"
             ) as bar:
-                for tx_model in bar:
-                    session.add(tx_model)
+                chanjo_db.link_transcripts(bar, result.exons)
 
     except IntegrityError:
         LOG.exception("elements already linked?")
@@ -0,0 +1,72 @@
+"""CLI commands to manage named gene panels"""
+
+import json
+import logging
+
+import click
+
+from chanjo.store.api import ChanjoDB
+from chanjo.store.profiles import store_options
+
+LOG = logging.getLogger(__name__)
+
+
+@click.group()
+@click.pass_context
+def panel(context):
+    """Manage gene panels with precomputed coverage."""
+    context.obj["db"] = ChanjoDB(uri=context.obj["database"], **store_options(context.obj))
+
+
+@panel.command()
+@click.option(
+    "-f", "--gene-file", type=click.Path(exists=True), help="File with row separated gene IDs"
+)
+@click.option("--replace", is_flag=True, help="Overwrite an existing panel")
+@click.argument("name")
+@click.argument("genes", nargs=-1)
+@click.pass_context
+def add(context, gene_file, replace, name, genes):
+    """Store a gene panel and calculate its coverage for all samples."""
+    genes = list(genes)
+    if gene_file:
+        with open(gene_file) as file_handle:
+            genes += [line.strip() for line in file_handle if line.strip()]
+    if not genes:
+        LOG.error("no genes given for panel: %s", name)
+        context.abort()
+    invalid = [gene for gene in genes if not gene.isdigit()]
+    if invalid:
+        LOG.error("panels take numeric gene ids, not: %s", ", ".join(invalid[:5]))
+        context.abort()
+    store = context.obj["db"]
+    exists = any(panel_id == name for panel_id, _, _ in store.fetch_panels())
+    if exists and not replace:
+        LOG.error("panel already exists: %s, use --replace to overwrite it", name)
+        context.abort()
+    count = store.add_panel(name, genes, replace=replace)
+    click.echo("added panel: {} ({} genes)".format(name, count))
+
+
+@panel.command("list")
+@click.option("--pretty", "-p", is_flag=True, help="Print in pretty format")
+@click.pass_context
+def list_panels(context, pretty):
+    """Display stored gene panels."""
+    panels = [
+        {"panel_id": panel_id, "created_at": created_at, "genes": count}
+        for panel_id, created_at, count in context.obj["db"].fetch_panels()
+    ]
+    indent = 4 if pretty else None
+    click.echo(json.dumps(panels, default=str, indent=indent))
+
+
+@panel.command()
+@click.argument("name")
+@click.pass_context
+def remove(context, name):
+    """Remove a gene panel along with its coverage."""
+    if not context.obj["db"].remove_panel(name):
+        LOG.warning("panel (%s) not found in database", name)
+        context.abort()
+    LOG.info("removed panel: %s", name)
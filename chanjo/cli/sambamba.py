@@ -35,13 +35,23 @@ LOG = logging.getLogger(__name__)
     type=click.Path(exists=False),
     help="Specify path to a file where results should be stored.",
 )
+@click.option(
+    "-p",
+    "--processes",
+    default=1,
+    show_default=True,
+    help="number of sambamba calls to run concurrently on region shards",
+)
+@click.option(
+    "--shards", type=click.IntRange(min=1), help="split regions by length instead of by contig"
+)
 @click.argument("bam_file", type=click.Path(exists=True))
 @click.pass_context
-def sambamba(context, bam_file, regions, cov_thresholds, outfile):
+def sambamba(context, bam_file, regions, cov_thresholds, outfile, processes, shards):
     """Run Sambamba from chanjo."""
     LOG.info("Running chanjo sambamba")
     try:
-        run_sambamba(bam_file, regions, outfile, cov_thresholds)
+        run_sambamba(bam_file, regions, outfile, cov_thresholds, processes=processes, shards=shards)
     except Exception:
         LOG.exception("something went really wrong :_(")
         context.abort()
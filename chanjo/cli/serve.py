@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+
+import click
+
+from chanjo.server import is_loopback, make_server, make_unix_server
+from chanjo.store.api import ChanjoDB
+from chanjo.store.cache import DiskCache, MemoryCache, ResultCache
+from chanjo.store.profiles import store_options
+
+LOG = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option(
+    "-H",
+    "--host",
+    default="127.0.0.1",
+    show_default=True,
+    help="interface to bind, other than loopback only with --allow-remote",
+)
+@click.option("-p", "--port", default=8000, show_default=True, help="port to listen on")
+@click.option(
+    "-S",
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="serve on a Unix socket only you can access instead, clients use -d unix://PATH",
+)
+@click.option(
+    "--cache-size",
+    default=256,
+    show_default=True,
+    help="coverage results to keep in memory, 0 to disable",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="keep coverage results on disk instead, one directory per database",
+)
+@click.option(
+    "--allow-remote",
+    is_flag=True,
+    help="bind a non-loopback --host, anyone reaching it can read and load samples",
+)
+@click.pass_context
+def serve(context, host, port, socket_path, cache_size, cache_dir, allow_remote):
+    """Serve the database to "chanjo -d http://HOST:PORT" clients.
+
+    Requests aren't authenticated: anyone who can connect may read
+    coverage and load samples. Loopback servers only answer JSON requests
+    for local host names, which keeps web pages in a browser out. Only
+    serve other interfaces than loopback on trusted networks, prefer
+    "--socket" on shared machines.
+    """
+    if socket_path and os.path.exists(socket_path):
+        raise click.UsageError("{} exists, is another server running?".format(socket_path))
+    if not socket_path and not is_loopback(host):
+        if not allow_remote:
+            message = "{} isn't a loopback address, serve it with '--allow-remote'"
+            raise click.UsageError(message.format(host))
+        LOG.warning("serving on %s without authentication, anyone reaching it can load", host)
+    if cache_dir:
+        cache = ResultCache(DiskCache(cache_dir))
+    elif cache_size > 0:
+        cache = ResultCache(MemoryCache(maxsize=cache_size))
+    else:
+        cache = None
+    chanjo_db = ChanjoDB(uri=context.obj["database"], cache=cache, **store_options(context.obj))
+    if socket_path:
+        server = make_unix_server(chanjo_db, socket_path)
+        LOG.info("serving %s on unix://%s", context.obj["database"], socket_path)
+    else:
+        server = make_server(chanjo_db, host=host, port=port)
+        LOG.info("serving %s on http://%s:%s", context.obj["database"], *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        LOG.info("shutting down")
+    finally:
+        server.server_close()
+        chanjo_db.close()
+        if socket_path:
+            os.remove(socket_path)
@@ -3,23 +3,63 @@ import logging
 
 import click
 
-from chanjo.sex import sex_from_bam
+from chanjo.sex import sample_from_bam, sex_from_bams
 
 LOG = logging.getLogger(__name__)
 
 
 @click.command()
 @click.option("-p", "--prefix", default="", help="chromosome prefix")
-@click.argument("bam_path", type=click.Path(exists=True))
+@click.option("-f", "--fast", is_flag=True, help="estimate coverage from the BAM index")
+@click.option("-w", "--workers", type=int, help="BAM files to process concurrently")
+@click.option("--store", is_flag=True, help="save the prediction on the sample in the database")
+@click.argument("bam_paths", nargs=-1, required=True, type=click.Path(exists=True))
 @click.pass_context
-def sex(context, prefix, bam_path):
-    """Guess the sex of a BAM alignment."""
-    try:
-        result = sex_from_bam(bam_path, prefix=prefix)
-    except Exception:
-        LOG.exception("Something went really wrong :(")
+def sex(context, prefix, fast, workers, store, bam_paths):
+    """Guess the sex of one or more BAM alignments."""
+    batch = len(bam_paths) > 1
+    rows = []
+    predictions = {}
+    failed = []
+    for bam_path, result in sex_from_bams(bam_paths, prefix=prefix, fast=fast, workers=workers):
+        if result is None:
+            failed.append(bam_path)
+            continue
+        row = list(map(str, result))
+        if batch or store:
+            sample_id = sample_from_bam(bam_path)
+            predictions[sample_id] = result.sex
+            if batch:
+                row.append(sample_id)
+        rows.append(row)
+
+    if rows:
+        header = "#{prefix}X_coverage\t{prefix}Y_coverage\tsex".format(prefix=prefix)
+        # print the results to the console for pipeability (csv)
+        click.echo(header + "\tsample" if batch else header)
+        for row in rows:
+            click.echo("\t".join(row))
+
+    if store and predictions:
+        # deferred, guessing sex alone doesn't need the database
+        from chanjo.store.api import ChanjoDB
+        from chanjo.store.profiles import store_options
+
+        save_predictions(
+            ChanjoDB(uri=context.obj["database"], **store_options(context.obj)), predictions
+        )
+
+    if failed:
+        LOG.error("%s of %s BAM files failed", len(failed), len(bam_paths))
         context.abort()
 
-    # print the results to the console for pipeability (csv)
-    click.echo("#{prefix}X_coverage\t{prefix}Y_coverage\tsex".format(prefix=prefix))
-    click.echo("\t".join(map(str, result)))
+
+def save_predictions(chanjo_db, predictions):
+    """Store predicted sex on existing samples."""
+    from chanjo.store.models import Sample
+
+    with chanjo_db.begin() as session:
+        for sample_obj in session.query(Sample).filter(Sample.id.in_(predictions)):
+            sample_obj.sex = predictions.pop(sample_obj.id)
+    for sample_id in predictions:
+        LOG.warning("sample (%s) not found in database", sample_id)
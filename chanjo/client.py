@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Client for a ``chanjo serve`` process.
+
+Offers the calculate, fetch and load methods of the store by forwarding
+them to the server, without setting up a database connection.
+"""
+import json
+import logging
+import socket
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlsplit
+
+from chanjo.exc import ServerError
+
+LOG = logging.getLogger(__name__)
+
+UNIX_SCHEME = "unix://"
+SERVER_SCHEMES = ("http://", "https://", UNIX_SCHEME)
+
+
+def is_server_uri(uri):
+    """Check if a URI points to a "chanjo serve" process."""
+    return bool(uri) and uri.startswith(SERVER_SCHEMES)
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """HTTP connection over a Unix socket."""
+
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ChanjoClient:
+    """Forward store calls to a server started with "chanjo serve".
+
+    Results are plain JSON types: rows are lists, samples and
+    transcripts are dicts.
+
+    Args:
+        url (str): server URL, e.g. "http://127.0.0.1:8000", or
+            "unix:///path/to/chanjo.sock" for a Unix socket
+        timeout (Optional[float]): seconds to wait for a response
+    """
+
+    def __init__(self, url, timeout=300):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _connection(self):
+        """Open a connection, also returns the path the server is mounted at."""
+        if self.url.startswith(UNIX_SCHEME):
+            path = self.url[len(UNIX_SCHEME) :]
+            return UnixHTTPConnection(path, timeout=self.timeout), ""
+        parts = urlsplit(self.url)
+        connection_class = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+        return connection_class(parts.netloc, timeout=self.timeout), parts.path
+
+    def _open(self, name, body=None):
+        connection, prefix = self._connection()
+        path = "{}/{}".format(prefix, name)
+        try:
+            if body is None:
+                connection.request("GET", path)
+            else:
+                headers = {"Content-Type": "application/json"}
+                connection.request("POST", path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = json.load(response)
+        except (OSError, HTTPException) as error:
+            raise ServerError("can't reach server {}: {}".format(self.url, error))
+        except ValueError:
+            raise ServerError("{} failed: not a chanjo server: {}".format(name, self.url))
+        finally:
+            connection.close()
+        if response.status >= 400:
+            raise ServerError("{} failed: {}".format(name, data.get("error", response.reason)))
+        return data
+
+    def _call(self, method, **kwargs):
+        return self._open(method, json.dumps(kwargs).encode("utf-8"))["result"]
+
+    def health(self):
+        """Return the status and version of the server, and cache counters."""
+        return self._open("health")
+
+    def mean(self, sample_ids=None, levels=None, summary=True, weighted=False):
+        """Calculate the mean values of all metrics per sample."""
+        kwargs = dict(sample_ids=list(sample_ids or []), summary=summary, weighted=weighted)
+        if levels:
+            kwargs["levels"] = list(levels)
+        return self._call("mean", **kwargs)
+
+    def gene_metrics(self, *genes, summary=True, weighted=False):
+        """Calculate gene statistics."""
+        return self._call("gene_metrics", genes=list(genes), summary=summary, weighted=weighted)
+
+    def sample_coverage(
+        self, sample_ids, genes=None, level=10, summary=True, weighted=False, panel=None
+    ):
+        """Calculate coverage for samples, completeness at ``level``."""
+        return self._call(
+            "sample_coverage",
+            sample_ids=list(sample_ids),
+            genes=list(genes or []),
+            level=level,
+            summary=summary,
+            weighted=weighted,
+            panel=panel,
+        )
+
+    def fetch_samples(self, sample_id=None, group_id=None):
+        """Fetch samples as dicts."""
+        return self._call("fetch_samples", sample_id=sample_id, group_id=group_id)
+
+    def fetch_transcripts(self, sample_id):
+        """Fetch the transcript stats of a sample as dicts."""
+        return self._call("fetch_transcripts", sample_id=sample_id)
+
+    def load(self, data, **options):
+        """Load Sambamba output, see :func:`chanjo.server.load`.
+
+        Returns:
+            dict: sample id and number of loaded transcripts
+        """
+        return self._call("load", data=data, **options)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Compute exon coverage directly from a BAM alignment.
+
+In-process alternative to ``sambamba depth region``: exon rows are
+produced in memory, in the same shape as the parsed Sambamba output, so
+they can be passed straight to :func:`chanjo.load.sambamba.load_exons`.
+
+Requires pysam and NumPy (``pip install chanjo[pysam]``).
+"""
+import logging
+from collections import OrderedDict
+from functools import partial
+from multiprocessing import Pool
+
+import numpy as np
+import pysam
+
+from chanjo.sex import sample_from_bam
+from chanjo.store.constants import COMPLETENESS_LEVELS
+
+LOG = logging.getLogger(__name__)
+
+# same as the default Sambamba filter: skip unmapped, secondary, QC failed
+# and duplicate reads as well as reads with mapping quality 0
+SKIP_FLAGS = 0x4 | 0x100 | 0x200 | 0x400
+
+
+def read_regions(handle):
+    """Parse exon regions from a chanjo BED file.
+
+    Args:
+        handle (iterable): BED lines
+
+    Returns:
+        List[tuple]: chromosome, start, end and the extra BED columns
+    """
+    rows = (line.rstrip("\n").split("\t") for line in handle if not line.startswith("#"))
+    return [(row[0], int(row[1]), int(row[2]), row[3:]) for row in rows if len(row) >= 3]
+
+
+def is_counted(read):
+    """Filter reads like Sambamba does by default."""
+    return not read.flag & SKIP_FLAGS and read.mapping_quality > 0
+
+
+def region_coverage(bam_path, regions, thresholds=COMPLETENESS_LEVELS, sample_id=None):
+    """Calculate coverage metrics for each region.
+
+    Args:
+        bam_path (path): path to an indexed BAM alignment file
+        regions (List[tuple]): chromosome, start, end and extra BED columns
+        thresholds (List[int]): levels to sample completeness at
+        sample_id (Optional[str]): sample name to put on each exon
+
+    Returns:
+        List[dict]: exons as parsed from Sambamba output
+    """
+    exons = []
+    with pysam.AlignmentFile(str(bam_path)) as bam_file:
+        contigs = set(bam_file.references)
+        for chrom, start, end, extra_fields in regions:
+            length = end - start
+            if chrom in contigs:
+                counts = bam_file.count_coverage(
+                    chrom, start, end, quality_threshold=0, read_callback=is_counted
+                )
+                # one array('L') of counts per base A, C, G and T
+                depth = np.array(counts, dtype=np.int64).sum(axis=0)
+                read_count = bam_file.count(chrom, start, end, read_callback=is_counted)
+            else:
+                # contig missing from the alignment, no coverage
+                depth = np.zeros(length, dtype=np.int64)
+                read_count = 0
+            exons.append(
+                {
+                    "chrom": chrom,
+                    "chromStart": start,
+                    "chromEnd": end,
+                    "sampleName": sample_id,
+                    "readCount": read_count,
+                    "meanCoverage": float(depth.sum() / length) if length else 0.0,
+                    "thresholds": {
+                        level: float((depth >= level).sum() * 100 / length) if length else 0.0
+                        for level in thresholds
+                    },
+                    "extraFields": extra_fields,
+                }
+            )
+    return exons
+
+
+def bam_coverage(bam_path, regions, thresholds=COMPLETENESS_LEVELS, sample_id=None, processes=None):
+    """Calculate coverage metrics for regions, one process per chromosome.
+
+    Args:
+        bam_path (path): path to an indexed BAM alignment file
+        regions (List[tuple]): chromosome, start, end and extra BED columns
+        thresholds (List[int]): levels to sample completeness at
+        sample_id (Optional[str]): sample name, else guessed from the BAM
+        processes (Optional[int]): number of worker processes, 1 to disable
+
+    Yields:
+        dict: exons as parsed from Sambamba output, in chromosome order
+    """
+    sample_id = sample_id or sample_from_bam(bam_path)
+    chromosomes = OrderedDict()
+    for region in regions:
+        chromosomes.setdefault(region[0], []).append(region)
+    LOG.debug("calculating coverage across %s chromosomes", len(chromosomes))
+
+    worker = partial(region_coverage, bam_path, thresholds=thresholds, sample_id=sample_id)
+    if processes == 1:
+        for chrom_regions in chromosomes.values():
+            yield from worker(chrom_regions)
+        return
+
+    with Pool(processes=processes) as pool:
+        for exons in pool.imap(worker, chromosomes.values()):
+            yield from exons
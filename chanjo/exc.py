@@ -3,3 +3,7 @@
 
 class BedFormattingError(Exception):
     pass
+
+
+class ServerError(Exception):
+    """Raised when a "chanjo serve" process fails to handle a request."""
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Parse and aggregate many Sambamba outputs concurrently."""
+
+import codecs
+import csv
+import logging
+from collections import namedtuple
+from functools import partial
+from multiprocessing import Pool
+from pathlib import Path
+
+from .sambamba import load_transcripts
+
+Job = namedtuple("Job", ["path", "sample_id", "group_id", "name", "group_name"])
+BatchResult = namedtuple(
+    "BatchResult", ["job", "sample_id", "source", "thresholds", "stats", "error"]
+)
+log = logging.getLogger(__name__)
+
+
+def read_manifest(handle):
+    """Parse a tab separated manifest of samples to load.
+
+    The header row must include a "path" column. Optional columns are
+    "sample", "group", "name" and "group_name".
+
+    Args:
+        handle (iterable): manifest lines including the header
+
+    Yields:
+        Job: one job per sample
+    """
+    for row in csv.DictReader(handle, delimiter="\t"):
+        yield Job(
+            path=row["path"],
+            sample_id=row.get("sample") or None,
+            group_id=row.get("group") or None,
+            name=row.get("name") or None,
+            group_name=row.get("group_name") or None,
+        )
+
+
+def process_job(job, threshold=None):
+    """Parse and aggregate one Sambamba output file.
+
+    Args:
+        job (Job): sample to process
+        threshold (Optional[int]): completeness level to disqualify exons
+
+    Returns:
+        BatchResult: sample id, source path, completeness levels and raw
+            transcript stats
+    """
+    source = str(Path(job.path).resolve())
+    try:
+        with codecs.open(job.path, "r", encoding="utf-8") as handle:
+            result = load_transcripts(
+                handle,
+                sample_id=job.sample_id,
+                group_id=job.group_id,
+                source=source,
+                threshold=threshold,
+            )
+            stats = list(result.stats)
+    except Exception as error:
+        # exceptions are passed back as strings to keep results picklable
+        return BatchResult(
+            job=job,
+            sample_id=job.sample_id,
+            source=source,
+            thresholds=None,
+            stats=None,
+            error=str(error),
+        )
+    return BatchResult(
+        job=job,
+        sample_id=result.sample.id,
+        source=source,
+        thresholds=result.sample.thresholds,
+        stats=stats,
+        error=None,
+    )
+
+
+def process_jobs(jobs, threshold=None, processes=None):
+    """Process many Sambamba output files in a pool of workers.
+
+    Results are yielded in the order they finish so a single writer can
+    consume them as they become available.
+
+    Args:
+        jobs (List[Job]): samples to process
+        threshold (Optional[int]): completeness level to disqualify exons
+        processes (Optional[int]): number of worker processes, 1 to disable
+
+    Yields:
+        BatchResult: processed sample
+    """
+    worker = partial(process_job, threshold=threshold)
+    if processes == 1:
+        yield from map(worker, jobs)
+        return
+
+    with Pool(processes=processes) as pool:
+        yield from pool.imap_unordered(worker, jobs)
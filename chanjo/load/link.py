@@ -7,7 +7,7 @@ from chanjo.store.models import Transcript
 from .parse import bed as parse_bed
 from .utils import groupby_tx
 
-Result = namedtuple("Result", ["models", "count"])
+Result = namedtuple("Result", ["models", "count", "exons"])
 log = logging.getLogger(__name__)
 
 
@@ -19,11 +19,15 @@ def link_elements(sequence):
 
     Returns:
         Result: iterators of transcript models, number of transcripts processed
+            and exon/transcript rows for the "transcript_exon" table
     """
     exons = parse_bed.chanjo(sequence)
     transcripts = groupby_tx(exons)
     models = (make_model(tx_id, exons) for tx_id, exons in transcripts.items())
-    return Result(models=models, count=len(transcripts))
+    exon_rows = (
+        make_exon_row(tx_id, exon) for tx_id, exons in transcripts.items() for exon in exons
+    )
+    return Result(models=models, count=len(transcripts), exons=exon_rows)
 
 
 def make_model(transcript_id, exons):
@@ -49,3 +53,21 @@ def make_model(transcript_id, exons):
         gene_name=gene_symbol,
     )
     return tx_model
+
+
+def make_exon_row(transcript_id, exon):
+    """Compose a plain exon/transcript row for bulk inserts.
+
+    Args:
+        transcript_id (str): unique transcript id
+        exon (dict): parsed exon
+
+    Returns:
+        dict: column/value pairs matching the "transcript_exon" table
+    """
+    return {
+        "chromosome": exon["chrom"],
+        "start": exon["chromStart"],
+        "end": exon["chromEnd"],
+        "transcript_id": transcript_id,
+    }
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Parse the sambamba "depth region" output into typed column arrays.
+
+Requires NumPy (``pip install chanjo[numpy]``).
+"""
+import io
+from collections import namedtuple
+
+import numpy as np
+
+from chanjo.exc import BedFormattingError
+
+from .sambamba import expand_header
+
+DepthColumns = namedtuple(
+    "DepthColumns",
+    [
+        "chroms",
+        "chrom",
+        "start",
+        "end",
+        "read_count",
+        "mean_coverage",
+        "thresholds",
+        "transcripts",
+        "pair_row",
+        "pair_tx",
+        "sample_name",
+    ],
+)
+
+
+def depth_output(handle):
+    """Parse the output into column arrays.
+
+    Transcript membership is encoded as parallel ``pair_row``/``pair_tx``
+    arrays, one entry per exon/transcript combination, with ``pair_tx``
+    indexing into the ``transcripts`` string table (in order of first
+    appearance).
+
+    Args:
+        handle (iterable): Sambamba output lines
+
+    Returns:
+        DepthColumns: typed arrays for each column
+
+    Raises:
+        BedFormattingError: if the BED file doesn't contain enough columns
+    """
+    lines = iter(handle)
+    header_row = next(lines).strip().split("\t")
+    if len(header_row) < 6:
+        raise BedFormattingError("make sure fields are tab-separated")
+    header = expand_header(header_row)
+    body = io.StringIO("".join(lines))
+
+    tx_index = header["extraFields"].stop - 3
+    levels = list(header["thresholds"])
+    number_columns = [1, 2, header["readCount"], header["meanCoverage"]]
+    number_columns += [header["thresholds"][level] for level in levels]
+    string_columns = [0, tx_index, header["sampleName"]]
+    try:
+        numbers = _loadtxt(body, number_columns, np.float64)
+        body.seek(0)
+        strings = _loadtxt(body, string_columns, str)
+    except (IndexError, ValueError) as error:
+        raise BedFormattingError("malformatted Sambamba output: {}".format(error))
+    if len(strings) == 0:
+        raise BedFormattingError("no exons found in Sambamba output")
+
+    chroms, chrom = np.unique(strings[:, 0], return_inverse=True)
+    transcripts, pair_row, pair_tx = _split_transcripts(strings[:, 1])
+
+    return DepthColumns(
+        chroms=chroms.tolist(),
+        chrom=chrom,
+        start=numbers[:, 0].astype(np.int64),
+        end=numbers[:, 1].astype(np.int64),
+        read_count=numbers[:, 2].astype(np.int64),
+        mean_coverage=numbers[:, 3],
+        thresholds={level: numbers[:, 4 + index] for index, level in enumerate(levels)},
+        transcripts=transcripts,
+        pair_row=pair_row,
+        pair_tx=pair_tx,
+        sample_name=str(strings[0, 2]),
+    )
+
+
+def _loadtxt(body, columns, dtype):
+    """Read selected tab separated columns with the NumPy C parser."""
+    return np.loadtxt(body, delimiter="\t", usecols=columns, dtype=dtype, comments=None, ndmin=2)
+
+
+def _split_transcripts(tx_fields):
+    """Expand comma separated transcript ids into exon/transcript pairs.
+
+    Only unique field values are split in Python, the expansion to one
+    pair per exon and transcript is vectorised.
+    """
+    fields, field_index = np.unique(tx_fields, return_inverse=True)
+    ids = [field.split(",") for field in fields.tolist()]
+    names, flat_codes = np.unique(np.concatenate(ids), return_inverse=True)
+    field_sizes = np.array([len(field_ids) for field_ids in ids], dtype=np.int64)
+    field_offsets = np.cumsum(field_sizes) - field_sizes
+
+    row_sizes = field_sizes[field_index]
+    pair_row = np.repeat(np.arange(len(tx_fields), dtype=np.int64), row_sizes)
+    row_offsets = np.cumsum(row_sizes) - row_sizes
+    within_row = np.arange(len(pair_row), dtype=np.int64) - row_offsets[pair_row]
+    pair_tx = flat_codes[field_offsets[field_index][pair_row] + within_row]
+
+    # renumber transcripts in order of first appearance
+    _, first_seen = np.unique(pair_tx, return_index=True)
+    order = np.argsort(first_seen, kind="stable")
+    codes = np.empty_like(order)
+    codes[order] = np.arange(len(order))
+    return names[order].tolist(), pair_row, codes[pair_tx]
@@ -20,7 +20,9 @@ def depth_output(handle):
     lines = (line.strip() for line in handle)
     rows = (line.split("\t") for line in lines)
     # expect only a single header row
-    header_row = next(rows)
+    header_row = next(rows, None)
+    if header_row is None:
+        return
     if len(header_row) < 6:
         raise BedFormattingError("make sure fields are tab-separated")
     header_data = expand_header(header_row)
@@ -2,16 +2,28 @@
 from __future__ import division
 
 from collections import namedtuple
+from itertools import chain
 
+from chanjo.exc import BedFormattingError
+from chanjo.store.constants import COMPLETENESS_LEVELS
 from chanjo.store.models import Exon, Sample, TranscriptStat
 
 from .parse import sambamba
-from .utils import groupby_tx
+from .utils import groupby_tx, stream_tx
 
-Result = namedtuple("Result", ["models", "count", "sample"])
+Result = namedtuple("Result", ["models", "count", "sample", "stats"])
 
 
-def load_transcripts(sequence, sample_id=None, group_id=None, source=None, threshold=None):
+def load_transcripts(
+    sequence,
+    sample_id=None,
+    group_id=None,
+    source=None,
+    threshold=None,
+    stream=False,
+    window=None,
+    index=None,
+):
     """Process a sequence of exon lines.
 
     Args:
@@ -20,22 +32,73 @@ def load_transcripts(sequence, sample_id=None, group_id=None, source=None, thres
         grouip_id (Optional[str]): id to group samples
         source (Optional[str]): path to coverage source (BAM/Sambamba)
         threshold (Optional[int]): completeness level to disqualify exons
+        stream (Optional[bool]): aggregate sorted input with bounded memory
+        window (Optional[int]): max exon distance for position sorted input
+        index (Optional[dict]): transcript ids per exon position, replaces
+            the transcript columns in the Sambamba output
 
     Returns:
         Result: iterators of `Transcript`, transcripts processed, sample model
+            and raw stats. ``models`` and ``stats`` share the same underlying
+            iterator so only one of them should be consumed. When streaming
+            the number of transcripts isn't known up front and is ``None``.
     """
     exons = sambamba.depth_output(sequence)
-    transcripts = groupby_tx(exons, sambamba=True)
+    return load_exons(
+        exons,
+        sample_id=sample_id,
+        group_id=group_id,
+        source=source,
+        threshold=threshold,
+        stream=stream,
+        window=window,
+        index=index,
+    )
+
+
+def load_exons(
+    exons,
+    sample_id=None,
+    group_id=None,
+    source=None,
+    threshold=None,
+    stream=False,
+    window=None,
+    index=None,
+):
+    """Process parsed exons, see :func:`load_transcripts`.
+
+    Args:
+        exons (iterable): exon dicts as parsed from Sambamba output
+
+    Returns:
+        Result: iterators of `Transcript`, transcripts processed, sample model
+            and raw stats
+    """
+    exons = iter(exons)
+    if stream:
+        first_exon = next(exons, None)
+        head = [] if first_exon is None else [first_exon]
+        transcripts = stream_tx(chain(head, exons), sambamba=True, window=window, index=index)
+        count = None
+    else:
+        grouped = groupby_tx(exons, sambamba=True, index=index)
+        first_exon = next(iter(grouped.values()), [None])[0]
+        transcripts = grouped.items()
+        count = len(grouped)
     raw_stats = (
-        (tx_id, tx_stat(tx_id, exons, threshold=threshold)) for tx_id, exons in transcripts.items()
+        (tx_id, tx_stat(tx_id, exons, threshold=threshold)) for tx_id, exons in transcripts
     )
 
     if sample_id is None:
-        sample_id = next(iter(transcripts.values()))[0]["sampleName"]
-    sample_obj = Sample(id=sample_id, group_id=group_id, source=source)
+        if first_exon is None:
+            raise BedFormattingError("no exons to guess the sample id from")
+        sample_id = first_exon["sampleName"]
+    thresholds = None if first_exon is None else sorted(first_exon["thresholds"])
+    sample_obj = Sample(id=sample_id, group_id=group_id, source=source, thresholds=thresholds)
 
     models = (make_model(sample_obj, tx_id, raw_stat) for tx_id, raw_stat in raw_stats)
-    return Result(models=models, count=len(transcripts), sample=sample_obj)
+    return Result(models=models, count=count, sample=sample_obj, stats=raw_stats)
 
 
 def tx_stat(transcript_id, exons, threshold=None):
@@ -49,32 +112,47 @@ def tx_stat(transcript_id, exons, threshold=None):
     Returns:
         dict: aggregated stats over all exons
     """
-    sums = {"bases": 0, "mean_coverage": 0}
+    bases = 0
+    coverage_sum = 0
+    completeness_sums = {}
     incomplete_exons = []
 
     # for each of the exons (linked to one transcript)
     for exon in exons:
         # go over each of the fields to sum up
         exon_length = exon["chromEnd"] - exon["chromStart"]
-        sums["bases"] += exon_length
-        sums["mean_coverage"] += exon["meanCoverage"] * exon_length
-
-        # add to the total sum for completeness levels
-        for comp_key in [10, 15, 20, 50, 100]:
-            if comp_key in exon["thresholds"]:
-                sums_key = "completeness_{}".format(comp_key)
-                if sums_key not in sums:
-                    sums[sums_key] = 0
-                completeness = exon["thresholds"][comp_key]
-                sums[sums_key] += completeness * exon_length
-
-                if threshold == comp_key and completeness < 100:
-                    exon_obj = Exon(
-                        exon["chrom"], exon["chromStart"], exon["chromEnd"], completeness
-                    )
-                    incomplete_exons.append(exon_obj)
-
-    fields = {key: (value / sums["bases"]) for key, value in sums.items() if key != "bases"}
+        bases += exon_length
+        coverage_sum += exon["meanCoverage"] * exon_length
+
+        # add to the total sum for every completeness level
+        for level, completeness in exon["thresholds"].items():
+            completeness_sums[level] = completeness_sums.get(level, 0) + completeness * exon_length
+
+            if threshold == level and completeness < 100:
+                exon_obj = Exon(exon["chrom"], exon["chromStart"], exon["chromEnd"], completeness)
+                incomplete_exons.append(exon_obj)
+
+    levels = {level: value / bases for level, value in sorted(completeness_sums.items())}
+    return make_fields(coverage_sum / bases, levels, incomplete_exons, threshold)
+
+
+def make_fields(mean_coverage, levels, incomplete_exons, threshold):
+    """Compose transcript stat fields from aggregated metrics.
+
+    Args:
+        mean_coverage (float): mean coverage across all exons
+        levels (dict): completeness per completeness level
+        incomplete_exons (List[Exon]): exons below the threshold
+        threshold (Optional[int]): completeness level to disqualify exons
+
+    Returns:
+        dict: key/values of metrics
+    """
+    fields = {"mean_coverage": mean_coverage}
+    for level in COMPLETENESS_LEVELS:
+        if level in levels:
+            fields["completeness_{}".format(level)] = levels[level]
+    fields["completeness"] = {str(level): value for level, value in levels.items()}
     fields["incomplete_exons"] = incomplete_exons
     fields["threshold"] = threshold
     return fields
@@ -1,25 +1,89 @@
 # -*- coding: utf-8 -*-
+from chanjo.exc import BedFormattingError
 
 
-def groupby_tx(exons, sambamba=False):
+def groupby_tx(exons, sambamba=False, index=None):
     """Group (unordered) exons per transcript."""
     transcripts = {}
     for exon in exons:
-        if sambamba:
-            ids = zip(
-                exon["extraFields"][-3].split(","),
-                exon["extraFields"][-2].split(","),
-                exon["extraFields"][-1].split(","),
-            )
-        else:
-            ids = exon["elements"]
-        elements = {}
-        for tx_id, gene_id, symbol in ids:
-            elements[tx_id] = dict(symbol=symbol, gene_id=gene_id)
-        exon["elements"] = elements
+        exon["elements"] = exon_elements(exon, sambamba=sambamba, index=index)
 
         for transcript_id in exon["elements"]:
             if transcript_id not in transcripts:
                 transcripts[transcript_id] = []
             transcripts[transcript_id].append(exon)
     return transcripts
+
+
+def stream_tx(exons, sambamba=False, window=None, index=None):
+    """Group sorted exons per transcript, yield transcripts once complete.
+
+    Without ``window`` the exons of each transcript must be on consecutive
+    rows (sorted by transcript): a transcript is complete as soon as a row
+    doesn't include it. With ``window`` the input must be sorted by
+    position: a transcript is complete once an exon on another chromosome,
+    or starting more than ``window`` bases after its last exon, is seen.
+
+    Args:
+        exons (iterable): parsed exon dicts
+        sambamba (Optional[bool]): read ids from Sambamba extra fields
+        window (Optional[int]): max distance between exons in a transcript
+        index (Optional[dict]): transcript ids per exon position
+
+    Yields:
+        tuple: transcript id, list of exons
+
+    Raises:
+        BedFormattingError: if a transcript is seen again after completion
+    """
+    pending = {}
+    completed = set()
+    for exon in exons:
+        exon["elements"] = exon_elements(exon, sambamba=sambamba, index=index)
+
+        for transcript_id in list(pending):
+            last_exon = pending[transcript_id][-1]
+            if window is None:
+                is_complete = transcript_id not in exon["elements"]
+            else:
+                is_complete = (
+                    last_exon["chrom"] != exon["chrom"]
+                    or exon["chromStart"] - last_exon["chromEnd"] > window
+                )
+            if is_complete:
+                completed.add(transcript_id)
+                yield transcript_id, pending.pop(transcript_id)
+
+        for transcript_id in exon["elements"]:
+            if transcript_id in completed:
+                raise BedFormattingError(
+                    "input not sorted, transcript seen again: {}".format(transcript_id)
+                )
+            if transcript_id not in pending:
+                pending[transcript_id] = []
+            pending[transcript_id].append(exon)
+
+    yield from pending.items()
+
+
+def exon_elements(exon, sambamba=False, index=None):
+    """Map the transcripts of an exon to their gene id and symbol.
+
+    With an ``index`` of transcript ids per exon position, as stored by
+    ``chanjo link``, only the transcript ids are looked up.
+    """
+    if index is not None:
+        tx_ids = index.get((exon["chrom"], exon["chromStart"], exon["chromEnd"]), [])
+        return {tx_id: {} for tx_id in tx_ids}
+    if sambamba:
+        ids = zip(
+            exon["extraFields"][-3].split(","),
+            exon["extraFields"][-2].split(","),
+            exon["extraFields"][-1].split(","),
+        )
+    else:
+        ids = exon["elements"]
+    elements = {}
+    for tx_id, gene_id, symbol in ids:
+        elements[tx_id] = dict(symbol=symbol, gene_id=gene_id)
+    return elements
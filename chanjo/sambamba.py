@@ -1,28 +1,80 @@
 # -*- coding: utf-8 -*-
 import logging
+import shutil
 import subprocess
+import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from subprocess import CalledProcessError
 
 log = logging.getLogger(__name__)
 
 
-def run_sambamba(bam_file, region_file, outfile=None, cov_thresholds=()):
+def run_sambamba(bam_file, region_file, outfile=None, cov_thresholds=(), processes=1, shards=None):
     """Run sambamba from Chanjo.
 
+    With more than one process the regions are split into shards, by
+    contig or into ``shards`` parts of similar total length, which are
+    run concurrently and merged in input order under a single header.
+
     Args:
         bam_file (Path): path to the BAM alignment file
         region_file (Path): path to the input BED file defining exon regions
         outfile (Optional[Path]): file to write to (otherwise STDOUT)
         cov_thresholds (Optional[List[int]]): levels to sample completeness at
+        processes (Optional[int]): number of concurrent sambamba calls
+        shards (Optional[int]): number of balanced shards, else one per contig
+    """
+    if processes == 1 and shards is None:
+        call_sambamba(sambamba_command(bam_file, region_file, outfile, cov_thresholds))
+        return
+
+    with open(region_file) as handle:
+        region_shards = split_regions(handle, shards=shards)
+    log.info("running sambamba on %s shards", len(region_shards))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        commands = []
+        out_paths = []
+        for index, lines in enumerate(region_shards):
+            shard_path = Path(tmp_dir).joinpath("shard{}.bed".format(index))
+            shard_path.write_text("".join(lines))
+            out_path = Path(tmp_dir).joinpath("shard{}.coverage.bed".format(index))
+            commands.append(sambamba_command(bam_file, shard_path, out_path, cov_thresholds))
+            out_paths.append(out_path)
+
+        with ThreadPoolExecutor(max_workers=processes) as executor:
+            # consume results to re-raise any failure
+            list(executor.map(call_sambamba, commands))
+
+        if outfile:
+            with open(outfile, "w") as out_handle:
+                merge_outputs(out_paths, out_handle)
+        else:
+            merge_outputs(out_paths, sys.stdout)
+
+    log.debug("sambamba ran successfully")
+
+
+def sambamba_command(bam_file, region_file, outfile=None, cov_thresholds=()):
+    """Compose a "sambamba depth region" call.
+
+    Returns:
+        List[str]: command and arguments
     """
-    sambamba_call = ["sambamba", "depth", "region", "--regions", region_file, bam_file]
+    sambamba_call = ["sambamba", "depth", "region", "--regions", str(region_file), str(bam_file)]
 
     if outfile:
-        sambamba_call += ["-o", outfile]
+        sambamba_call += ["-o", str(outfile)]
 
     for coverage_threshold in cov_thresholds:
         sambamba_call += ["-T", str(coverage_threshold)]
+    return sambamba_call
+
 
+def call_sambamba(sambamba_call):
+    """Execute a sambamba call and wait for it to finish."""
     log.info("Running sambamba with call: %s", " ".join(sambamba_call))
     try:
         subprocess.check_call(sambamba_call)  # stderr=log_stream
@@ -36,3 +88,58 @@ def run_sambamba(bam_file, region_file, outfile=None, cov_thresholds=()):
         raise error
 
     log.debug("sambamba ran successfully")
+
+
+def split_regions(handle, shards=None):
+    """Split BED lines into shards, keeping the input order.
+
+    Args:
+        handle (iterable): BED lines
+        shards (Optional[int]): number of shards of similar total region
+            length, else one shard per contig
+
+    Returns:
+        List[List[str]]: BED lines per shard
+
+    Raises:
+        ValueError: for less than one shard
+    """
+    if shards is not None and shards < 1:
+        raise ValueError("shards must be at least 1, got {}".format(shards))
+    lines = [line for line in handle if line.strip() and not line.startswith("#")]
+    if shards is None:
+        contigs = OrderedDict()
+        for line in lines:
+            contigs.setdefault(line.split("\t", 1)[0], []).append(line)
+        return list(contigs.values())
+
+    lengths = []
+    for line in lines:
+        row = line.split("\t", 3)
+        lengths.append(int(row[2]) - int(row[1]))
+    target = sum(lengths) / shards
+    region_shards = [[]]
+    cumulative = 0
+    for line, length in zip(lines, lengths):
+        if cumulative >= target * len(region_shards) and len(region_shards) < shards:
+            region_shards.append([])
+        region_shards[-1].append(line)
+        cumulative += length
+    return [shard for shard in region_shards if shard]
+
+
+def merge_outputs(paths, out_handle):
+    """Concatenate sambamba outputs, keeping only the first header.
+
+    Args:
+        paths (List[Path]): sambamba output files, in order
+        out_handle (file): handle to write the merged output to
+    """
+    for index, path in enumerate(paths):
+        with open(path) as handle:
+            if index == 0:
+                shutil.copyfileobj(handle, out_handle)
+                continue
+            for line in handle:
+                if not line.startswith("#"):
+                    out_handle.write(line)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""Long-running chanjo process serving a warm database over local HTTP.
+
+Started with ``chanjo serve`` on a loopback port or a Unix socket.
+Requests are JSON objects POSTed to ``/<method>`` with the keyword
+arguments of the store method, responses are JSON encoded results.
+:class:`chanjo.client.ChanjoClient` offers the same methods as the store
+on top of it.
+"""
+import ipaddress
+import json
+import logging
+import os
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from socketserver import ThreadingUnixStreamServer
+
+from sqlalchemy.exc import IntegrityError
+
+from chanjo import __version__
+from chanjo.calculate import gene_metrics_query, mean_query
+from chanjo.exc import BedFormattingError
+from chanjo.load.sambamba import load_transcripts
+from chanjo.store.fetch import samples_query, transcripts_query
+
+LOG = logging.getLogger(__name__)
+
+
+def load(chanjo_db, data, sample_id=None, group_id=None, name=None, group_name=None, **options):
+    """Load Sambamba output sent by a client, like "chanjo load".
+
+    Args:
+        chanjo_db (ChanjoDB): store to load into
+        data (str): Sambamba output
+        sample_id (Optional[str]): override sample id from the output
+        group_id (Optional[str]): id to group related samples
+        name (Optional[str]): display name for sample
+        group_name (Optional[str]): display name for sample group
+        options: passed on to :func:`chanjo.load.sambamba.load_transcripts`
+
+    Returns:
+        dict: sample id and number of loaded transcripts
+    """
+    if options.pop("index", False):
+        options["index"] = chanjo_db.fetch_exon_index()
+    result = load_transcripts(StringIO(data), sample_id=sample_id, group_id=group_id, **options)
+    result.sample.name = name
+    result.sample.group_name = group_name
+    count = chanjo_db.add_transcript_stats(result.sample, result.stats)
+    return {"sample_id": result.sample.id, "count": count}
+
+
+def fetch_all(chanjo_db, build_query, convert, *args, **kwargs):
+    """Build a query in a session and convert all results before closing it.
+
+    The store methods return queries that keep their connection checked
+    out until garbage collected, which drains the pool of a long-running
+    process.
+    """
+    with chanjo_db.begin() as session:
+        return [convert(row) for row in build_query(session, *args, **kwargs)]
+
+
+# method name: call returning JSON serializable results
+METHODS = {
+    "mean": lambda chanjo_db, **kwargs: fetch_all(chanjo_db, mean_query, list, **kwargs),
+    "gene_metrics": lambda chanjo_db, genes=(), **kwargs: fetch_all(
+        chanjo_db, gene_metrics_query, list, *genes, **kwargs
+    ),
+    "sample_coverage": lambda chanjo_db, **kwargs: chanjo_db.sample_coverage(**kwargs),
+    "fetch_samples": lambda chanjo_db, **kwargs: fetch_all(
+        chanjo_db, samples_query, dict, **kwargs
+    ),
+    "fetch_transcripts": lambda chanjo_db, **kwargs: fetch_all(
+        chanjo_db, transcripts_query, dict, **kwargs
+    ),
+    "load": load,
+}
+
+
+class ChanjoHandler(BaseHTTPRequestHandler):
+    """Dispatch JSON requests to the store of the server."""
+
+    protocol_version = "HTTP/1.1"
+
+    def check_request(self, post=False):
+        """Reject requests a web page could send, before reading the body.
+
+        Browsers send "simple" cross-origin POSTs without a preflight
+        unless the content type is JSON, and DNS rebinding reaches the
+        server under a foreign host name. Only local host names and the
+        bound port are accepted on loopback servers.
+
+        Returns:
+            bool: whether the request may be handled
+        """
+        if self.server.local_port is not None:
+            host, _, port = self.headers.get("Host", "").rpartition(":")
+            if not (port == str(self.server.local_port) and is_loopback(host.strip("[]"))):
+                self.send_json(HTTPStatus.FORBIDDEN, {"error": "only local clients are served"})
+                return False
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if post and content_type != "application/json":
+            self.send_json(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE, {"error": "requests must be application/json"}
+            )
+            return False
+        return True
+
+    def do_GET(self):
+        if not self.check_request():
+            return
+        if self.path != "/health":
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "unknown path: {}".format(self.path)})
+            return
+        data = {"status": "ok", "version": __version__}
+        result_cache = self.server.chanjo_db.result_cache
+        if result_cache is not None:
+            data["cache"] = result_cache.stats()
+        self.send_json(HTTPStatus.OK, data)
+
+    def do_POST(self):
+        if not self.check_request(post=True):
+            return
+        method = METHODS.get(self.path.strip("/"))
+        if method is None:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "unknown method: {}".format(self.path)})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            kwargs = json.loads(self.rfile.read(length) or b"{}")
+            result = method(self.server.chanjo_db, **kwargs)
+        except (BedFormattingError, TypeError, ValueError) as error:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+        except IntegrityError:
+            self.send_json(HTTPStatus.CONFLICT, {"error": "sample already loaded"})
+        except Exception as error:
+            LOG.exception("request failed: %s", self.path)
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)})
+        else:
+            self.send_json(HTTPStatus.OK, {"result": result})
+
+    def send_json(self, status, data):
+        body = json.dumps(data, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        LOG.debug("%s - %s", self.address_string(), format % args)
+
+
+class UnixHTTPServer(ThreadingUnixStreamServer):
+    """HTTP server on a Unix socket, only reachable with file permissions."""
+
+    def server_bind(self):
+        # create the socket accessible to the owner only, no window to chmod it
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+
+def is_loopback(host):
+    """Check if a host only accepts connections from the same machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def make_server(chanjo_db, host="127.0.0.1", port=0):
+    """Create a threaded HTTP server for a store.
+
+    Args:
+        chanjo_db (ChanjoDB): store shared by all requests
+        host (Optional[str]): interface to bind, only local by default
+        port (Optional[int]): port to bind, 0 to pick a free one
+
+    Returns:
+        ThreadingHTTPServer: call ``serve_forever`` to start serving
+    """
+    server = ThreadingHTTPServer((host, port), ChanjoHandler)
+    server.daemon_threads = True
+    server.chanjo_db = chanjo_db
+    # host names can only be checked on loopback, others are reached by any name
+    server.local_port = server.server_address[1] if is_loopback(host) else None
+    return server
+
+
+def make_unix_server(chanjo_db, path):
+    """Create a threaded HTTP server on a Unix socket.
+
+    Only the current user may connect: the socket is created with mode
+    0600. There are no host names to check.
+
+    Args:
+        chanjo_db (ChanjoDB): store shared by all requests
+        path (path): socket file to create
+
+    Returns:
+        UnixHTTPServer: call ``serve_forever`` to start serving
+    """
+    server = UnixHTTPServer(str(path), ChanjoHandler)
+    server.daemon_threads = True
+    server.chanjo_db = chanjo_db
+    server.local_port = None
+    return server
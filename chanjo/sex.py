@@ -4,17 +4,27 @@
 The component reads coverage for subsections of each sex chromosome.
 Based on the ratio between the average coverage across chromosomes it
 makes a simple sex prediction.
+
+A fast mode estimates coverage from the number of mapped reads per
+chromosome recorded in the BAM index (like ``samtools idxstats``).
 """
 from __future__ import division
 
+import gzip
 import logging
+import struct
 import subprocess
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 LOG = logging.getLogger(__name__)
 
 SexGuess = namedtuple("SexGuess", ["x_coverage", "y_coverage", "sex"])
 
+# pseudo-bin in the BAI format holding mapped/unmapped read counts
+INDEX_PSEUDO_BIN = 37450
+
 
 def predict_sex(x_coverage, y_coverage):
     """Make a simple yet accurate prediction of a samples sex.
@@ -44,12 +54,15 @@ def predict_sex(x_coverage, y_coverage):
             return "female"
 
 
-def sex_from_bam(bam_path, prefix=""):
+def sex_from_bam(bam_path, prefix="", fast=False):
     """Predict the sex from a BAM alignment file.
 
     Args:
         bam_path (path): path to a BAM alignment file
         prefix (str, optional): string to prefix to 'X', 'Y'
+        fast (bool, optional): estimate coverage from the BAM index, fall
+            back to reading coverage if there's no index or the guess is
+            "unknown"
 
     Returns:
         SexGuess: tuple of X coverage, Y coverage, and sex prediction
@@ -58,6 +71,16 @@ def sex_from_bam(bam_path, prefix=""):
         >>> sex_from_bam('alignment.bam', prefix='chr')
         SexGuess(x_coverage=123.31, y_coverage=0.13, sex='female')
     """
+    if fast:
+        try:
+            result = sex_from_index(bam_path, prefix=prefix)
+        except (OSError, ValueError) as error:
+            LOG.warning("can't use BAM index (%s), reading coverage", error)
+        else:
+            if result.sex != "unknown":
+                return result
+            LOG.info("index based guess inconclusive, reading coverage")
+
     # make up some sex chromosome regions
     regions = ["{}X:1-59373566".format(prefix), "{}Y:69362-11375310".format(prefix)]
     averages = []
@@ -77,3 +100,178 @@ def sex_from_bam(bam_path, prefix=""):
     x_coverage, y_coverage = list(averages)
     sex = predict_sex(x_coverage, y_coverage)
     return SexGuess(x_coverage, y_coverage, sex)
+
+
+def sex_from_index(bam_path, prefix=""):
+    """Predict the sex from mapped read counts in the BAM index.
+
+    Coverage is estimated as mapped reads times mean read length divided
+    by chromosome length. Only the BAM header, the first reads and the
+    index are read so it returns in well under a second.
+
+    Args:
+        bam_path (path): path to an indexed BAM alignment file
+        prefix (str, optional): string to prefix to 'X', 'Y'
+
+    Returns:
+        SexGuess: tuple of X coverage, Y coverage, and sex prediction
+
+    Raises:
+        OSError: if the BAM index can't be found
+        ValueError: if the files are malformed or lack a sex chromosome
+    """
+    with gzip.open(str(bam_path), "rb") as handle:
+        _, references = read_bam_header(handle)
+        read_length = mean_read_length(handle)
+    mapped_reads = read_index_counts(index_path(bam_path))
+    if len(mapped_reads) != len(references):
+        raise ValueError("BAM index doesn't match the BAM header")
+
+    coverages = []
+    for chromosome in ["{}X".format(prefix), "{}Y".format(prefix)]:
+        names = [name for name, _ in references]
+        if chromosome not in names:
+            raise ValueError("chromosome {} not found in BAM header".format(chromosome))
+        ref_index = names.index(chromosome)
+        ref_length = references[ref_index][1]
+        coverages.append(mapped_reads[ref_index] * read_length / ref_length)
+
+    x_coverage, y_coverage = coverages
+    sex = predict_sex(x_coverage, y_coverage)
+    return SexGuess(x_coverage, y_coverage, sex)
+
+
+def sample_from_bam(bam_path):
+    """Guess the sample id from the read groups of a BAM file.
+
+    Args:
+        bam_path (path): path to a BAM alignment file
+
+    Returns:
+        str: "SM" tag of the first read group, else the file name
+    """
+    with gzip.open(str(bam_path), "rb") as handle:
+        header_text, _ = read_bam_header(handle)
+    for line in header_text.splitlines():
+        if line.startswith("@RG"):
+            tags = dict(field.split(":", 1) for field in line.split("\t")[1:] if ":" in field)
+            if tags.get("SM"):
+                return tags["SM"]
+    return Path(bam_path).name.split(".")[0]
+
+
+def sex_from_bams(bam_paths, prefix="", fast=False, workers=None):
+    """Predict the sex for many BAM alignment files concurrently.
+
+    Args:
+        bam_paths (List[path]): paths to BAM alignment files
+        prefix (str, optional): string to prefix to 'X', 'Y'
+        fast (bool, optional): estimate coverage from the BAM index
+        workers (int, optional): number of worker threads
+
+    Yields:
+        tuple: BAM path and SexGuess, ``None`` if the prediction failed
+    """
+
+    def guess(bam_path):
+        try:
+            return sex_from_bam(bam_path, prefix=prefix, fast=fast)
+        except Exception:
+            LOG.exception("failed to guess sex for %s", bam_path)
+            return None
+
+    # the work happens in subprocesses and file IO so threads are enough
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from zip(bam_paths, executor.map(guess, bam_paths))
+
+
+def index_path(bam_path):
+    """Find the index of a BAM file: "<name>.bam.bai" or "<name>.bai".
+
+    Raises:
+        OSError: if no index exists
+    """
+    bam_path = Path(bam_path)
+    for candidate in [Path("{}.bai".format(bam_path)), bam_path.with_suffix(".bai")]:
+        if candidate.exists():
+            return candidate
+    raise OSError("no index found for {}".format(bam_path))
+
+
+def read_bam_header(handle):
+    """Read the header text and references of a BAM file.
+
+    Args:
+        handle (file): decompressed BAM stream positioned at the start
+
+    Returns:
+        tuple: SAM header text, list of reference names and lengths
+    """
+    if handle.read(4) != b"BAM\1":
+        raise ValueError("not a BAM file")
+    (text_length,) = struct.unpack("<i", handle.read(4))
+    header_text = handle.read(text_length).rstrip(b"\0").decode("utf-8")
+    (ref_count,) = struct.unpack("<i", handle.read(4))
+    references = []
+    for _ in range(ref_count):
+        (name_length,) = struct.unpack("<i", handle.read(4))
+        name = handle.read(name_length).rstrip(b"\0").decode("utf-8")
+        (ref_length,) = struct.unpack("<i", handle.read(4))
+        references.append((name, ref_length))
+    return header_text, references
+
+
+def mean_read_length(handle, reads=1000):
+    """Estimate the read length from the first alignments in a BAM file.
+
+    Args:
+        handle (file): decompressed BAM stream positioned after the header
+        reads (int, optional): number of alignments to sample
+
+    Returns:
+        float: mean sequence length of the sampled alignments
+    """
+    lengths = []
+    for _ in range(reads):
+        block = handle.read(4)
+        if len(block) < 4:
+            break
+        (block_size,) = struct.unpack("<i", block)
+        record = handle.read(block_size)
+        (seq_length,) = struct.unpack_from("<i", record, 16)
+        lengths.append(seq_length)
+    if not lengths:
+        raise ValueError("no alignments found in BAM file")
+    return sum(lengths) / len(lengths)
+
+
+def read_index_counts(bai_path):
+    """Read the number of mapped reads per reference from a BAM index.
+
+    Args:
+        bai_path (path): path to a BAI index file
+
+    Returns:
+        List[int]: mapped reads per reference, in header order
+    """
+    with open(str(bai_path), "rb") as handle:
+        data = handle.read()
+    if data[:4] != b"BAI\1":
+        raise ValueError("not a BAM index")
+    (ref_count,) = struct.unpack_from("<i", data, 4)
+    offset = 8
+    mapped_reads = []
+    for _ in range(ref_count):
+        mapped = 0
+        (bin_count,) = struct.unpack_from("<i", data, offset)
+        offset += 4
+        for _ in range(bin_count):
+            bin_id, chunk_count = struct.unpack_from("<Ii", data, offset)
+            offset += 8
+            if bin_id == INDEX_PSEUDO_BIN:
+                mapped = struct.unpack_from("<Q", data, offset + 16)[0]
+            offset += chunk_count * 16
+        (interval_count,) = struct.unpack_from("<i", data, offset)
+        offset += 4 + interval_count * 8
+        mapped_reads.append(mapped)
+    return mapped_reads
@@ -5,13 +5,21 @@ import logging
 import os
 from pathlib import Path
 
+from sqlalchemy import event, inspect, text
 from sqlservice import Database
 
 from chanjo.calculate import CalculateMixin
 
+from .cache import ensure_generation
 from .delete import DeleteMixin
+from .export import ExportMixin
 from .fetch import FetchMixin
+from .insert import InsertMixin
+from .migrations import BACKFILLS
 from .models import BASE
+from .panel import PanelMixin
+from .profiles import resolve_profile, set_pragmas
+from .summary import SummaryMixin, refresh_flushed_summaries
 
 LOG = logging.getLogger(__name__)
 
@@ -23,7 +31,16 @@ def get_absolute_path(db_uri):
     return db_path
 
 
-class ChanjoDB(Database, CalculateMixin, DeleteMixin, FetchMixin):
+class ChanjoDB(
+    Database,
+    CalculateMixin,
+    DeleteMixin,
+    ExportMixin,
+    FetchMixin,
+    InsertMixin,
+    PanelMixin,
+    SummaryMixin,
+):
     """SQLAlchemy-based database object.
 
     Bundles functionality required to setup and interact with various
@@ -45,6 +62,12 @@ class ChanjoDB(Database, CalculateMixin, DeleteMixin, FetchMixin):
         uri (Optional[str]): path/URI to the database to connect to
         debug (Optional[bool]): whether to output logging information
         base (Optional[sqlalchemy.ext.declarative.api.Base]): schema definition
+        profile (Optional[str]): connection settings, "default", "bulk" or
+            "read" (see :data:`chanjo.store.profiles.PROFILES`)
+        pragmas (Optional[dict]): SQLite PRAGMAs overriding the profile
+        pool (Optional[dict]): pool options overriding the profile
+        cache (Optional[chanjo.store.cache.ResultCache]): cache for
+            calculate results
 
     Attributes:
         uri (str): path/URI to the database to connect to
@@ -55,28 +78,43 @@ class ChanjoDB(Database, CalculateMixin, DeleteMixin, FetchMixin):
         classes (dict): bound ORM classes
     """
 
-    def __init__(self, uri=None, debug=False, base=BASE):
+    def __init__(
+        self, uri=None, debug=False, base=BASE, profile=None, pragmas=None, pool=None, cache=None
+    ):
         self.model_class = base
+        self.result_cache = cache
         if uri:
-            self.connect(uri, debug=debug)
+            self.connect(uri, debug=debug, profile=profile, pragmas=pragmas, pool=pool)
 
-    def connect(self, db_uri, debug=False):
+    def connect(self, db_uri, debug=False, profile=None, pragmas=None, pool=None):
         """Configure connection to a SQL database.
 
+        SQLite connections get the PRAGMAs of the profile, other databases
+        its connection pool options.
+
         Args:
             db_uri (str): path/URI to the database to connect to
             debug (Optional[bool]): whether to output logging information
+            profile (Optional[str]): name of the connection profile
+            pragmas (Optional[dict]): SQLite PRAGMAs overriding the profile
+            pool (Optional[dict]): pool options overriding the profile
         """
-        config = {"SQLALCHEMY_ECHO": debug}
-        if "mysql" in db_uri:  # pragma: no cover
-            config["SQLALCHEMY_POOL_RECYCLE"] = 3600
-        elif "://" not in db_uri:
+        if "://" not in db_uri:
             # expect only a path to a sqlite database
             db_path = get_absolute_path(db_uri)
             db_uri = "sqlite:///{}".format(db_path)
 
-        config["SQLALCHEMY_DATABASE_URI"] = db_uri
-        super(ChanjoDB, self).__init__(db_uri, model_class=BASE)
+        pragmas, pool = resolve_profile(profile, pragmas=pragmas, pool=pool)
+        is_sqlite = db_uri.startswith("sqlite")
+        options = {} if is_sqlite else pool
+        super(ChanjoDB, self).__init__(db_uri, model_class=BASE, echo=debug, **options)
+        event.listen(self.sessionmaker, "after_flush", refresh_flushed_summaries)
+        if is_sqlite and pragmas:
+            event.listen(
+                self.engine,
+                "connect",
+                lambda dbapi_connection, record: set_pragmas(dbapi_connection, pragmas),
+            )
 
     @property
     def dialect(self):
@@ -110,3 +148,54 @@ class ChanjoDB(Database, CalculateMixin, DeleteMixin, FetchMixin):
         # drop/delete the tables
         self.drop_all()
         return self
+
+    def migrate(self):
+        """Upgrade an existing database to the current schema.
+
+        Creates missing tables and adds missing columns and indexes to
+        existing tables. Added columns are nullable, some columns and
+        tables are filled in from existing data (see
+        :data:`chanjo.store.migrations.BACKFILLS`).
+
+        Returns:
+            List[str]: added columns, as "table.column"
+        """
+        existing_tables = set(inspect(self.engine).get_table_names())
+        self.create_all()
+        inspector = inspect(self.engine)
+        preparer = self.engine.dialect.identifier_preparer
+        added = []
+        with self.engine.begin() as connection:
+            for table in self.model_class.metadata.sorted_tables:
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    connection.execute(
+                        text(
+                            "ALTER TABLE {} ADD COLUMN {} {}".format(
+                                preparer.quote(table.name), preparer.quote(column.name), column_type
+                            )
+                        )
+                    )
+                    added.append("{}.{}".format(table.name, column.name))
+                indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name not in indexes:
+                        LOG.info("creating index: %s", index.name)
+                        index.create(connection)
+            created = [
+                table.name
+                for table in self.model_class.metadata.sorted_tables
+                if table.name not in existing_tables
+            ]
+            backfills = []
+            for key in added + created:
+                if key in BACKFILLS and BACKFILLS[key] not in backfills:
+                    backfills.append(BACKFILLS[key])
+            for backfill in backfills:
+                backfill(connection)
+            ensure_generation(connection)
+        LOG.info("migrated database, %s tables and %s columns added", len(created), len(added))
+        return added
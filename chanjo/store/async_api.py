@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Asyncio variant of the store for web front-ends.
+
+Requires an async database driver, aiosqlite for SQLite or asyncmy for
+MySQL (``pip install chanjo[async]``).
+"""
+import logging
+
+from sqlservice import AsyncDatabase
+
+from chanjo.calculate import coverage_query, coverage_results, gene_metrics_query, mean_query
+from chanjo.store.api import get_absolute_path
+from chanjo.store.constants import COMPLETENESS_LEVELS
+from chanjo.store.fetch import samples_query, transcripts_query
+from chanjo.store.models import BASE
+
+LOG = logging.getLogger(__name__)
+
+# sync driver: async driver
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+asyncmy",
+    "mysql+pymysql": "mysql+asyncmy",
+    "mysql+mysqldb": "mysql+asyncmy",
+}
+
+
+def async_uri(db_uri):
+    """Switch a database URI, or path to a SQLite file, to an async driver."""
+    if "://" not in db_uri:
+        return "sqlite+aiosqlite:///{}".format(get_absolute_path(db_uri))
+    scheme, rest = db_uri.split("://", 1)
+    return "{}://{}".format(ASYNC_DRIVERS.get(scheme, scheme), rest)
+
+
+class AsyncChanjoDB(AsyncDatabase):
+    """Asyncio store with the calculate and fetch methods of ChanjoDB.
+
+    Each call runs the same queries as :class:`chanjo.store.api.ChanjoDB`
+    in its own session and awaits the results, so one event loop can
+    serve many coverage reports at once. Results are lists rather than
+    queries.
+
+    Examples:
+        >>> chanjo_db = AsyncChanjoDB('coverage.sqlite3')
+        >>> await chanjo_db.sample_coverage(['sample'], genes=[14825])
+
+    Args:
+        uri (str): path/URI to the database, sync drivers are switched to
+            their async counterpart
+    """
+
+    def __init__(self, uri, **kwargs):
+        super().__init__(async_uri(uri), model_class=BASE, **kwargs)
+
+    @property
+    def dialect(self):
+        """Return database dialect name used for the current connection."""
+        return self.engine.dialect.name
+
+    async def _run(self, build_query, *args, **kwargs):
+        """Build a query in a session and fetch all results."""
+        async with self.begin() as session:
+            return await session.run_sync(
+                lambda sync_session: build_query(sync_session, *args, **kwargs).all()
+            )
+
+    async def mean(self, sample_ids=None, levels=COMPLETENESS_LEVELS, summary=True, weighted=False):
+        """Calculate the mean values of all metrics per sample.
+
+        See :meth:`chanjo.calculate.CalculateMixin.mean`.
+        """
+        return await self._run(
+            mean_query, sample_ids=sample_ids, levels=levels, summary=summary, weighted=weighted
+        )
+
+    async def gene_metrics(self, *genes, summary=True, weighted=False):
+        """Calculate gene statistics.
+
+        See :meth:`chanjo.calculate.CalculateMixin.gene_metrics`.
+        """
+        return await self._run(gene_metrics_query, *genes, summary=summary, weighted=weighted)
+
+    async def sample_coverage(
+        self,
+        sample_ids: list,
+        genes: list = None,
+        level: int = 10,
+        summary: bool = True,
+        weighted: bool = False,
+        panel: str = None,
+    ) -> dict:
+        """Calculate coverage for samples, completeness at ``level``.
+
+        See :meth:`chanjo.calculate.CalculateMixin.sample_coverage`.
+        """
+        rows = await self._run(
+            coverage_query,
+            sample_ids,
+            genes,
+            level=level,
+            summary=summary,
+            weighted=weighted,
+            panel=panel,
+        )
+        return coverage_results(rows)
+
+    async def fetch_samples(self, sample_id=None, group_id=None):
+        """Fetch samples from database."""
+        return await self._run(samples_query, sample_id=sample_id, group_id=group_id)
+
+    async def fetch_transcripts(self, sample_id):
+        """Fetch transcripts from database."""
+        return await self._run(transcripts_query, sample_id)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""Cache for calculate results, invalidated by the database generation.
+
+Every load, delete, panel change or summary refresh bumps the counter in
+the "generation" table in the same transaction. Results are cached
+along with the generation they were calculated in and only reused while
+it is current, also across processes sharing a :class:`DiskCache`.
+
+Examples:
+    >>> chanjo_db = ChanjoDB('coverage.sqlite3', cache=ResultCache())
+    >>> chanjo_db.sample_coverage(['sample'], panel='OMIM')
+    >>> chanjo_db.result_cache.stats()
+    {'hits': 0, 'misses': 1, 'size': 1, 'generation': 3}
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from sqlalchemy import insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from chanjo.store.models import GENERATION_ID, Generation
+
+LOG = logging.getLogger(__name__)
+
+
+def has_generation(connection):
+    """Check if the database has the "generation" table.
+
+    Databases from before the table need "chanjo db migrate". Found
+    tables are remembered per pooled connection.
+
+    Args:
+        connection (Connection|Session): where to look for the table
+
+    Returns:
+        bool: whether the table exists
+    """
+    if isinstance(connection, Session):
+        connection = connection.connection()
+    if connection.info.get(Generation.__tablename__):
+        return True
+    exists = inspect(connection).has_table(Generation.__tablename__)
+    if exists:
+        connection.info[Generation.__tablename__] = True
+    return exists
+
+
+def current_generation(connection):
+    """Return the generation of the data seen by a connection/session.
+
+    Returns:
+        Optional[int]: generation, ``None`` if the database isn't migrated
+    """
+    if not has_generation(connection):
+        LOG.warning("no generation table, not caching: run 'chanjo db migrate'")
+        return None
+    query = select(Generation.value).where(Generation.id == GENERATION_ID)
+    return connection.execute(query).scalar()
+
+
+def bump_generation(connection):
+    """Invalidate cached results, as part of the transaction changing the data."""
+    if not has_generation(connection):
+        LOG.warning("no generation table to invalidate cached results: run 'chanjo db migrate'")
+        return
+    statement = (
+        update(Generation).where(Generation.id == GENERATION_ID).values(value=Generation.value + 1)
+    )
+    connection.execute(statement)
+
+
+def ensure_generation(connection):
+    """Insert the generation row if the table is missing it."""
+    query = select(Generation.id).where(Generation.id == GENERATION_ID)
+    if connection.execute(query).first() is None:
+        connection.execute(insert(Generation).values(id=GENERATION_ID, value=0))
+
+
+def cache_key(*parts):
+    """Hash the arguments of a call into a key.
+
+    Lists of samples and genes are order-insensitive sets, pass them as
+    ``frozenset`` to hash them in a stable order.
+    """
+    normalized = [sorted(map(str, part)) if isinstance(part, frozenset) else part for part in parts]
+    data = json.dumps(normalized, default=str, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """Least recently used results of a single process.
+
+    Args:
+        maxsize (Optional[int]): results to keep
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, generation, key):
+        with self._lock:
+            value = self._results.get((generation, key))
+            if value is None:
+                return None
+            self._results.move_to_end((generation, key))
+        return copy.deepcopy(value)
+
+    def set(self, generation, key, value):
+        with self._lock:
+            self._results[(generation, key)] = copy.deepcopy(value)
+            self._results.move_to_end((generation, key))
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def prune(self, generation):
+        """Drop results from other generations."""
+        with self._lock:
+            for stale_key in [key for key in self._results if key[0] != generation]:
+                del self._results[stale_key]
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
+
+
+class DiskCache:
+    """Results stored as JSON files, shared by processes and restarts.
+
+    Use one directory per database.
+
+    Args:
+        path (str): directory for the cache files, created if missing
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, generation, key):
+        return self.path.joinpath("{}-{}.json".format(generation, key))
+
+    def get(self, generation, key):
+        try:
+            with open(self._file(generation, key)) as handle:
+                return json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, generation, key, value):
+        # write to a temporary file first, readers never see partial results
+        handle, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(handle, "w") as tmp_handle:
+            json.dump(value, tmp_handle)
+        os.replace(tmp_path, self._file(generation, key))
+
+    def prune(self, generation):
+        """Remove results from other generations."""
+        prefix = "{}-".format(generation)
+        for path in self.path.glob("*.json"):
+            if not path.name.startswith(prefix):
+                path.unlink(missing_ok=True)
+
+    def clear(self):
+        for path in self.path.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def __len__(self):
+        return sum(1 for _ in self.path.glob("*.json"))
+
+
+class ResultCache:
+    """Reuse calculate results within a database generation.
+
+    Results from older generations are pruned from the backend when a
+    new generation is seen.
+
+    Args:
+        backend (Optional[MemoryCache|DiskCache]): storage for results,
+            an in-memory LRU by default
+
+    Attributes:
+        hits (int): calls answered from the cache
+        misses (int): calls that ran the query
+    """
+
+    def __init__(self, backend=None):
+        self.backend = MemoryCache() if backend is None else backend
+        self.hits = 0
+        self.misses = 0
+        self.generation = None
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, generation, key, compute):
+        """Return the cached result for a key or compute and store it.
+
+        Args:
+            generation (int): current generation of the database
+            key (str): hashed call, see :func:`cache_key`
+            compute (Callable[[], object]): calculates a JSON serializable result
+
+        Returns:
+            object: result of ``compute``, not cached without a generation
+        """
+        if generation is None:
+            return compute()
+        if generation != self.generation:
+            LOG.debug("database generation %s, pruning cached results", generation)
+            self.backend.prune(generation)
+            self.generation = generation
+        value = self.backend.get(generation, key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            value = compute()
+            self.backend.set(generation, key, value)
+        return value
+
+    def clear(self):
+        """Drop all results and reset the counters."""
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return counters for monitoring.
+
+        Returns:
+            dict: hits, misses, cached results and current generation
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.backend),
+            "generation": self.generation,
+        }
@@ -2,7 +2,10 @@
 
 import logging
 
-from chanjo.store.models import Sample
+from sqlalchemy import delete, select
+
+from chanjo.store.cache import bump_generation
+from chanjo.store.models import BASE, Sample
 
 LOG = logging.getLogger(__name__)
 
@@ -11,18 +14,53 @@ class DeleteMixin:
     """Methods for deleting samples from database"""
 
     def delete_sample(self, sample_id):
-        """Delete single sample from database"""
+        """Delete single sample from database
+
+        Returns:
+            bool: whether the sample existed
+        """
         LOG.info(f"Deleting sample {sample_id} from database")
         with self.begin() as session:
-            sample = session.get(Sample, sample_id)
-            if sample:
-                session.delete(sample)
+            return delete_samples(session, Sample.id == sample_id) > 0
 
     def delete_group(self, group_id):
         """Delete entire group from database"""
         LOG.info("Deleting entire group %s from database", group_id)
-        samples = self.fetch_samples(group_id=group_id)
         with self.begin() as session:
-            for sample in samples:
-                LOG.info("Deleting sample %s from database", sample.id)
-                session.execute(sample.delete())
+            count = delete_samples(session, Sample.group_id == group_id)
+        LOG.info("Deleted %s samples from database", count)
+
+
+def sample_references():
+    """Yield tables referencing samples, with the referencing column.
+
+    Found in the models so new tables are cleaned up too, dependent tables
+    first.
+    """
+    for table in reversed(BASE.metadata.sorted_tables):
+        for foreign_key in table.foreign_keys:
+            if foreign_key.column.table is Sample.__table__:
+                yield table, foreign_key.parent
+
+
+def delete_samples(session, criterion):
+    """Delete samples and their rows with set-based statements.
+
+    Child rows are deleted with "sample_id IN (SELECT ...)" rather than
+    loaded into the session. Their foreign keys cascade, but SQLite only
+    enforces "ON DELETE CASCADE" with foreign keys switched on, e.g. in
+    the bulk and read profiles.
+
+    Args:
+        session (Session): session to delete in
+        criterion (ColumnElement): filter on the "sample" table
+
+    Returns:
+        int: number of deleted samples
+    """
+    sample_ids = select(Sample.id).where(criterion).scalar_subquery()
+    for table, column in sample_references():
+        session.execute(delete(table).where(column.in_(sample_ids)))
+    result = session.execute(delete(Sample).where(criterion))
+    bump_generation(session)
+    return result.rowcount
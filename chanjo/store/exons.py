@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Compact binary encoding of incomplete exons.
+
+Layout (little-endian, every section padded to 8 bytes)::
+
+    uint32   number of exons (n)
+    uint32   length of the chromosome table in bytes
+    bytes    chromosome names separated by NUL
+    uint8[n] chromosome code per exon, index into the table
+    int32[n] exon starts
+    int32[n] exon ends
+    float64[n] completeness
+
+Completeness is kept as float64 so values round-trip exactly.
+"""
+import struct
+from collections import namedtuple
+from collections.abc import Sequence
+
+Exon = namedtuple("Exon", ["chrom", "start", "end", "completeness"])
+
+HEADER = struct.Struct("<II")
+ALIGNMENT = 8
+
+
+def _padded(size):
+    """Round a section size up to the alignment."""
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def _section(data):
+    """Pad a section with NUL bytes up to the alignment."""
+    return data.ljust(_padded(len(data)), b"\0")
+
+
+def pack_exons(exon_list):
+    """Encode incomplete exons for storage on a transcript stat row.
+
+    Args:
+        exon_list (List[Exon]): exons to encode
+
+    Returns:
+        bytes: packed exons, ``None`` if the list is empty
+    """
+    exon_list = list(exon_list)
+    if not exon_list:
+        return None
+    chroms = []
+    codes = []
+    for exon in exon_list:
+        if exon.chrom not in chroms:
+            chroms.append(exon.chrom)
+        codes.append(chroms.index(exon.chrom))
+    if len(chroms) > 255:
+        raise ValueError("too many chromosomes to encode: {}".format(len(chroms)))
+
+    count = len(exon_list)
+    table = "\0".join(chroms).encode("utf-8")
+    parts = [
+        HEADER.pack(count, len(table)),
+        _section(table),
+        _section(bytes(codes)),
+        _section(struct.pack("<{}i".format(count), *(exon.start for exon in exon_list))),
+        _section(struct.pack("<{}i".format(count), *(exon.end for exon in exon_list))),
+        struct.pack("<{}d".format(count), *(exon.completeness for exon in exon_list)),
+    ]
+    return b"".join(parts)
+
+
+class ExonView(Sequence):
+    """Read-only sequence of exons over packed bytes.
+
+    Nothing is decoded up front: ``Exon`` tuples are built on access and
+    the columns are exposed as zero-copy memoryviews or NumPy arrays.
+
+    Args:
+        data (bytes): exons encoded with :func:`pack_exons`
+    """
+
+    def __init__(self, data):
+        self._data = memoryview(data or b"")
+        if data:
+            self._count, table_size = HEADER.unpack_from(self._data)
+            offset = HEADER.size
+            table = bytes(self._data[offset : offset + table_size]).decode("utf-8")
+            self._chroms = table.split("\0")
+            offset += _padded(table_size)
+        else:
+            self._count, self._chroms, offset = 0, [], HEADER.size
+        self._offsets = {}
+        for name, size in [("codes", 1), ("starts", 4), ("ends", 4), ("completeness", 8)]:
+            self._offsets[name] = offset
+            offset += _padded(size * self._count)
+
+    def _column(self, name, size, fmt):
+        offset = self._offsets[name]
+        return self._data[offset : offset + size * self._count].cast(fmt)
+
+    @property
+    def chromosomes(self):
+        """List[str]: chromosome name per code."""
+        return self._chroms
+
+    @property
+    def codes(self):
+        """memoryview: chromosome code per exon (uint8)."""
+        return self._column("codes", 1, "B")
+
+    @property
+    def starts(self):
+        """memoryview: exon starts (int32, little-endian hosts)."""
+        return self._column("starts", 4, "i")
+
+    @property
+    def ends(self):
+        """memoryview: exon ends (int32, little-endian hosts)."""
+        return self._column("ends", 4, "i")
+
+    @property
+    def completeness(self):
+        """memoryview: exon completeness (float64, little-endian hosts)."""
+        return self._column("completeness", 8, "d")
+
+    def to_numpy(self):
+        """Return the columns as NumPy arrays sharing the packed buffer.
+
+        Returns:
+            dict: "codes", "starts", "ends" and "completeness" arrays
+        """
+        import numpy as np
+
+        columns = [("codes", "u1"), ("starts", "<i4"), ("ends", "<i4"), ("completeness", "<f8")]
+        return {
+            name: np.frombuffer(
+                self._data, dtype=dtype, count=self._count, offset=self._offsets[name]
+            )
+            for name, dtype in columns
+        }
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        # decode whole columns at once rather than exon by exon
+        count = self._count
+        if not count:
+            return iter(())
+        chroms = [self._chroms[code] for code in self.codes]
+        starts = struct.unpack_from("<{}i".format(count), self._data, self._offsets["starts"])
+        ends = struct.unpack_from("<{}i".format(count), self._data, self._offsets["ends"])
+        completeness = struct.unpack_from(
+            "<{}d".format(count), self._data, self._offsets["completeness"]
+        )
+        return map(Exon._make, zip(chroms, starts, ends, completeness))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("exon index out of range")
+        return Exon(
+            self._chroms[self._data[self._offsets["codes"] + index]],
+            struct.unpack_from("<i", self._data, self._offsets["starts"] + 4 * index)[0],
+            struct.unpack_from("<i", self._data, self._offsets["ends"] + 4 * index)[0],
+            struct.unpack_from("<d", self._data, self._offsets["completeness"] + 8 * index)[0],
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return "ExonView({!r})".format(list(self))
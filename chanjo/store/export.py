@@ -0,0 +1,169 @@
+"""Module for exporting coverage tables to Apache Arrow formats
+
+Requires pyarrow (``pip install chanjo[arrow]``), imported on use.
+"""
+
+import logging
+from pathlib import Path
+from urllib.parse import quote
+
+from sqlalchemy import select
+
+from chanjo.store.constants import STAT_COLUMNS
+from chanjo.store.models import Sample, Transcript, TranscriptStat
+
+LOG = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+PARTITIONS = {"sample": ("sample_id", Sample.id), "group": ("group_id", Sample.group_id)}
+# same marker as pyarrow for missing partition values
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+EXPORT_COLUMNS = [
+    ("sample_id", TranscriptStat.sample_id, "string"),
+    ("group_id", Sample.group_id, "string"),
+    ("transcript_id", TranscriptStat.transcript_id, "string"),
+    ("gene_id", Transcript.gene_id, "int64"),
+    ("gene_name", Transcript.gene_name, "string"),
+    ("chromosome", Transcript.chromosome, "string"),
+    ("length", Transcript.length, "int64"),
+] + [(column, getattr(TranscriptStat, column), "float64") for column in STAT_COLUMNS]
+EXPORT_COLUMNS.append(("threshold", TranscriptStat.threshold, "int64"))
+
+
+def export_schema():
+    """Return the Arrow schema of exported transcript stats."""
+    import pyarrow as pa
+
+    return pa.schema([(name, getattr(pa, type_name)()) for name, _, type_name in EXPORT_COLUMNS])
+
+
+def export_query(sample_ids=None, group_id=None):
+    """Select transcript stats joined with their transcript and sample."""
+    query = (
+        select(*[column.label(name) for name, column, _ in EXPORT_COLUMNS])
+        .select_from(TranscriptStat)
+        .join(Sample, TranscriptStat.sample_id == Sample.id)
+        .outerjoin(Transcript, TranscriptStat.transcript_id == Transcript.id)
+        .order_by(TranscriptStat.sample_id)
+    )
+    if sample_ids:
+        query = query.where(TranscriptStat.sample_id.in_(sample_ids))
+    if group_id:
+        query = query.where(Sample.group_id == group_id)
+    return query
+
+
+def partition_path(out_dir, name, value, file_format):
+    """Build a hive style partition path, "<out_dir>/<name>=<value>/part-0"."""
+    value = NULL_PARTITION if value is None else quote(str(value), safe="")
+    directory = Path(out_dir).joinpath("{}={}".format(name, value))
+    return directory.joinpath("part-0{}".format(EXPORT_FORMATS[file_format]))
+
+
+class ExportMixin:
+    """Methods for exporting coverage to Parquet and Arrow IPC files"""
+
+    def coverage_batches(self, sample_ids=None, group_id=None, batch_size=65536):
+        """Stream transcript stats as Arrow record batches.
+
+        Rows are fetched from the database ``batch_size`` at a time and
+        converted column by column, bypassing the ORM.
+
+        Args:
+            sample_ids (Optional[List[str]]): samples to limit export to
+            group_id (Optional[str]): group to limit export to
+            batch_size (Optional[int]): rows per record batch
+
+        Yields:
+            pyarrow.RecordBatch: transcript stats, see :func:`export_schema`
+        """
+        query = export_query(sample_ids=sample_ids, group_id=group_id)
+        return self._query_batches(query, batch_size)
+
+    def _query_batches(self, query, batch_size):
+        import pyarrow as pa
+
+        schema = export_schema()
+        with self.engine.connect() as connection:
+            result = connection.execution_options(yield_per=batch_size).execute(query)
+            for rows in result.partitions():
+                columns = zip(*rows)
+                arrays = [
+                    pa.array(values, type=field.type) for values, field in zip(columns, schema)
+                ]
+                yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def export_coverage(
+        self,
+        out_path,
+        file_format="parquet",
+        partition_by=None,
+        sample_ids=None,
+        group_id=None,
+        batch_size=65536,
+    ):
+        """Write transcript stats to Parquet or Arrow IPC files.
+
+        Without ``partition_by`` a single file is written to ``out_path``.
+        Otherwise ``out_path`` is a directory with one hive style
+        partition per sample ("sample_id=...") or group ("group_id=...")
+        which pyarrow, pandas and DuckDB read back as a dataset.
+
+        Args:
+            out_path (path): output file, or directory when partitioned
+            file_format (Optional[str]): "parquet" or "arrow" (IPC file)
+            partition_by (Optional[str]): "sample" or "group"
+            sample_ids (Optional[List[str]]): samples to limit export to
+            group_id (Optional[str]): group to limit export to
+            batch_size (Optional[int]): rows per record batch
+
+        Returns:
+            Dict[Path, int]: number of rows written per file
+        """
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError("unknown export format: {}".format(file_format))
+        if partition_by is None:
+            batches = self.coverage_batches(sample_ids, group_id, batch_size=batch_size)
+            return {Path(out_path): write_batches(out_path, batches, file_format)}
+
+        name, column = PARTITIONS[partition_by]
+        # only values with stats to export, no empty partitions
+        query = export_query(sample_ids=sample_ids, group_id=group_id)
+        query = query.with_only_columns(column).distinct().order_by(None).order_by(column)
+        with self.begin() as session:
+            values = list(session.scalars(query))
+
+        written = {}
+        for value in values:
+            path = partition_path(out_path, name, value, file_format)
+            query = export_query(sample_ids=sample_ids, group_id=group_id)
+            query = query.where(column.is_(None) if value is None else column == value)
+            batches = self._query_batches(query, batch_size)
+            written[path] = write_batches(path, batches, file_format)
+        return written
+
+
+def write_batches(out_path, batches, file_format="parquet"):
+    """Write record batches to a single file as they arrive.
+
+    Returns:
+        int: number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    schema = export_schema()
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(str(out_path), schema)
+    else:
+        writer = pa.ipc.new_file(str(out_path), schema)
+    rows = 0
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    LOG.info("exported %s rows to %s", rows, out_path)
+    return rows
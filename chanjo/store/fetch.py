@@ -1,6 +1,21 @@
 """Module for fetching from database"""
 
-from chanjo.store.models import Sample, TranscriptStat
+from chanjo.store.models import Sample, TranscriptExon, TranscriptStat
+
+
+def samples_query(session, sample_id=None, group_id=None):
+    """Build the query behind :meth:`FetchMixin.fetch_samples` in a session."""
+    query = session.query(Sample)
+    if sample_id:
+        query = query.filter(Sample.id == sample_id)
+    if group_id:
+        query = query.filter(Sample.group_id == group_id)
+    return query
+
+
+def transcripts_query(session, sample_id):
+    """Build the query behind :meth:`FetchMixin.fetch_transcripts` in a session."""
+    return session.query(TranscriptStat).filter(TranscriptStat.sample_id == sample_id)
 
 
 class FetchMixin:
@@ -11,17 +26,27 @@ class FetchMixin:
         Fetch samples from database
         """
         with self.begin() as session:
-            query = session.query(Sample)
-            if sample_id:
-                query = query.filter(Sample.id == sample_id)
-            if group_id:
-                query = query.filter(Sample.group_id == group_id)
-            return query
+            return samples_query(session, sample_id=sample_id, group_id=group_id)
 
     def fetch_transcripts(self, sample_id):
         """
         Fetch transcripts from database
         """
         with self.begin() as session:
-            query = session.query(TranscriptStat).filter(TranscriptStat.sample_id == sample_id)
-            return query
+            return transcripts_query(session, sample_id)
+
+    def fetch_exon_index(self):
+        """
+        Fetch transcript ids per exon position, as linked by "chanjo link"
+        """
+        index = {}
+        with self.begin() as session:
+            query = session.query(
+                TranscriptExon.chromosome,
+                TranscriptExon.start,
+                TranscriptExon.end,
+                TranscriptExon.transcript_id,
+            )
+            for chromosome, start, end, transcript_id in query:
+                index.setdefault((chromosome, start, end), []).append(transcript_id)
+        return index
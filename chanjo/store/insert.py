@@ -0,0 +1,142 @@
+"""Module for bulk inserting into database"""
+
+import logging
+
+from sqlalchemy import delete, select
+from toolz import partition_all
+
+from chanjo.store.cache import bump_generation
+from chanjo.store.constants import COMPLETENESS_COLUMNS
+from chanjo.store.models import Transcript, TranscriptExon, TranscriptStat, pack_exons
+from chanjo.store.summary import refresh_summaries
+
+LOG = logging.getLogger(__name__)
+
+# rows per "executemany" round trip, MySQL is bounded by "max_allowed_packet"
+BATCH_SIZES = {"sqlite": 10000, "mysql": 2000}
+DEFAULT_BATCH_SIZE = 5000
+
+
+def make_row(sample_id, transcript_id, fields):
+    """Compose a plain transcript stat row for bulk inserts.
+
+    Args:
+        sample_id (str): unique sample id
+        transcript_id (str): unique transcript id
+        fields (dict): key/values of metrics
+
+    Returns:
+        dict: column/value pairs matching the "transcript_stat" table
+    """
+    row = {column: None for column in COMPLETENESS_COLUMNS}
+    row["completeness"] = None
+    row.update(fields)
+    row["_packed_exons"] = pack_exons(row.pop("incomplete_exons", []))
+    row["sample_id"] = sample_id
+    row["transcript_id"] = transcript_id
+    return row
+
+
+class InsertMixin:
+    """Methods for bulk inserting into database"""
+
+    def batch_size(self):
+        """Return a sensible number of rows per insert for the current dialect."""
+        return BATCH_SIZES.get(self.dialect, DEFAULT_BATCH_SIZE)
+
+    def add_transcript_stats(self, sample_obj, stats, batch_size=None):
+        """Bulk insert a sample along with its transcript stats.
+
+        Bypasses the ORM unit of work: rows are sent as plain dicts in
+        batches using Core "executemany" inserts, all in one transaction
+        along with refreshing the summaries for the sample. Where foreign
+        keys are enforced, stats for transcripts that were never linked
+        are skipped with a warning.
+
+        Args:
+            sample_obj (Sample): uncommitted sample model
+            stats (Iterable[tuple]): pairs of transcript id and raw stats
+            batch_size (Optional[int]): rows per insert statement
+
+        Returns:
+            int: number of inserted transcript stats
+        """
+        rows = (make_row(sample_obj.id, tx_id, fields) for tx_id, fields in stats)
+        with self.begin() as session:
+            session.add(sample_obj)
+            session.flush()
+            if enforces_foreign_keys(session):
+                rows = skip_unlinked(session, rows)
+            total = self._insert_batches(session, TranscriptStat, rows, batch_size)
+            refresh_summaries(session, [sample_obj.id])
+        LOG.debug("inserted %s transcript stats for sample %s", total, sample_obj.id)
+        return total
+
+    def link_transcripts(self, transcripts, exon_rows, batch_size=None):
+        """Add transcripts along with their exon index in one transaction.
+
+        Args:
+            transcripts (Iterable[Transcript]): uncommitted transcript models
+            exon_rows (Iterable[dict]): rows for the "transcript_exon" table
+            batch_size (Optional[int]): rows per exon insert statement
+
+        Returns:
+            int: number of inserted exon rows
+        """
+        with self.begin() as session:
+            session.add_all(transcripts)
+            session.flush()
+            total = self._insert_batches(session, TranscriptExon, exon_rows, batch_size)
+            bump_generation(session)
+        LOG.debug("inserted %s exons", total)
+        return total
+
+    def add_exons(self, exon_rows, batch_size=None, replace=False):
+        """Bulk insert the exon/transcript index.
+
+        Args:
+            exon_rows (Iterable[dict]): rows for the "transcript_exon" table
+            batch_size (Optional[int]): rows per insert statement
+            replace (Optional[bool]): remove existing exons first
+
+        Returns:
+            int: number of inserted exon rows
+        """
+        with self.begin() as session:
+            if replace:
+                session.execute(delete(TranscriptExon))
+            total = self._insert_batches(session, TranscriptExon, exon_rows, batch_size)
+        LOG.debug("inserted %s exons", total)
+        return total
+
+    def _insert_batches(self, session, model, rows, batch_size=None):
+        """Insert plain rows with "executemany" batches in the session transaction."""
+        batch_size = batch_size or self.batch_size()
+        statement = model.__table__.insert()
+        connection = session.connection()
+        total = 0
+        for batch in partition_all(batch_size, rows):
+            connection.execute(statement, list(batch))
+            total += len(batch)
+        return total
+
+
+def enforces_foreign_keys(session):
+    """Check if inserts fail on missing parents, SQLite only with the PRAGMA."""
+    connection = session.connection()
+    if connection.dialect.name != "sqlite":
+        return True
+    return bool(connection.exec_driver_sql("PRAGMA foreign_keys").scalar())
+
+
+def skip_unlinked(session, rows):
+    """Drop transcript stat rows for transcripts missing in the database."""
+    linked = set(session.scalars(select(Transcript.id)))
+    skipped = 0
+    for row in rows:
+        if row["transcript_id"] in linked:
+            yield row
+        else:
+            skipped += 1
+    if skipped:
+        LOG.warning("skipped %s stats for transcripts not linked, run 'chanjo link'", skipped)
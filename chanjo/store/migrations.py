@@ -0,0 +1,85 @@
+"""Data migrations run by "chanjo db migrate" when columns are added."""
+
+import logging
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.sql import func
+
+from chanjo.store.constants import COMPLETENESS_LEVELS
+from chanjo.store.models import Sample, TranscriptStat, pack_exons, parse_exons
+from chanjo.store.summary import refresh_summaries
+
+LOG = logging.getLogger(__name__)
+
+
+def backfill_completeness(connection):
+    """Copy the fixed completeness columns into the JSON column."""
+    pairs = []
+    for level in COMPLETENESS_LEVELS:
+        pairs += [str(level), getattr(TranscriptStat, "completeness_{}".format(level))]
+    statement = (
+        update(TranscriptStat)
+        .where(TranscriptStat.completeness.is_(None))
+        .values(completeness=func.json_object(*pairs))
+    )
+    result = connection.execute(statement)
+    LOG.info("filled in completeness for %s transcript stats", result.rowcount)
+
+
+def backfill_thresholds(connection):
+    """Record the default completeness levels for existing samples."""
+    statement = (
+        update(Sample).where(Sample.thresholds.is_(None)).values(thresholds=COMPLETENESS_LEVELS)
+    )
+    connection.execute(statement)
+
+
+def convert_incomplete_exons(connection, batch_size=5000):
+    """Re-encode incomplete exons from the legacy text column to binary.
+
+    Rows are read in pages of ``batch_size`` by id, so memory use doesn't
+    grow with the number of transcript stats.
+
+    Returns:
+        int: number of converted transcript stats
+    """
+    table = TranscriptStat.__table__
+    query = (
+        select(table.c.id, table.c._incomplete_exons)
+        .where(table.c._incomplete_exons.isnot(None), table.c._packed_exons.is_(None))
+        .order_by(table.c.id)
+        .limit(batch_size)
+    )
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("stat_id"))
+        .values(_packed_exons=bindparam("packed"), _incomplete_exons=None)
+    )
+    total = 0
+    last_id = None
+    while True:
+        page = query if last_id is None else query.where(table.c.id > last_id)
+        batch = connection.execute(page).fetchall()
+        if not batch:
+            break
+        connection.execute(
+            statement,
+            [
+                {"stat_id": stat_id, "packed": pack_exons(parse_exons(raw_exons))}
+                for stat_id, raw_exons in batch
+            ],
+        )
+        total += len(batch)
+        last_id = batch[-1].id
+    LOG.info("converted incomplete exons for %s transcript stats", total)
+    return total
+
+
+# data migrations per added "table.column" or created "table"
+BACKFILLS = {
+    "transcript_stat.completeness": backfill_completeness,
+    "sample.thresholds": backfill_thresholds,
+    "transcript_stat._packed_exons": convert_incomplete_exons,
+    "sample_summary": refresh_summaries,
+    "gene_stat": refresh_summaries,
+}
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
-from collections import namedtuple
 from datetime import datetime
 
-from sqlalchemy import Column, ForeignKey, UniqueConstraint, orm, types
+from sqlalchemy import Column, ForeignKey, Index, event, orm, types
 from sqlservice import declarative_base
 
-Exon = namedtuple("Exon", ["chrom", "start", "end", "completeness"])
+from chanjo.store.constants import COMPLETENESS_LEVELS, STAT_COLUMNS
+
+from .exons import Exon, ExonView, pack_exons
 
 # base for declaring a mapping
 BASE = declarative_base()
@@ -24,6 +25,8 @@ class Transcript(BASE):
     """
 
     __tablename__ = "transcript"
+    # gene panel lookups find transcript ids and lengths without the table
+    __table_args__ = (Index("ix_transcript_gene_covering", "gene_id", "id", "length"),)
 
     id = Column(types.String(32), primary_key=True)
     gene_id = Column(types.Integer, index=True, nullable=False)
@@ -34,6 +37,31 @@ class Transcript(BASE):
     stats = orm.relationship("TranscriptStat", backref="transcript")
 
 
+class TranscriptExon(BASE):
+    """Exon coordinates linked to a transcript.
+
+    Index to look up which transcripts an exon belongs to by position.
+    Exons shared between transcripts are stored once per transcript.
+
+    Args:
+        chromosome (str): related contig id
+        start (int): exon start position, as in the linked BED file
+        end (int): exon end position, as in the linked BED file
+        transcript_id (str): link to transcript record
+    """
+
+    __tablename__ = "transcript_exon"
+    __table_args__ = (Index("ix_transcript_exon_position", "chromosome", "start", "end"),)
+
+    id = Column(types.Integer, primary_key=True)
+    chromosome = Column(types.String(10), nullable=False)
+    start = Column(types.Integer, nullable=False)
+    end = Column(types.Integer, nullable=False)
+    transcript_id = Column(
+        types.String(32), ForeignKey("transcript.id", ondelete="CASCADE"), nullable=False
+    )
+
+
 class Sample(BASE):
     """Metadata for a single sample.
 
@@ -42,6 +70,8 @@ class Sample(BASE):
         group_id (str): unique group id
         source (str): path to coverage source Sambamba output/BAM file
         created_at (DateTime): date of addition to database
+        sex (str): sex predicted by "chanjo sex"
+        thresholds (List[int]): completeness levels in the coverage source
     """
 
     __tablename__ = "sample"
@@ -53,8 +83,13 @@ class Sample(BASE):
 
     name = Column(types.String(128))
     group_name = Column(types.String(128))
+    sex = Column(types.String(16))
+    thresholds = Column(types.JSON(none_as_null=True))
 
     sample = orm.relationship("TranscriptStat", cascade="all,delete", backref="sample")
+    summary = orm.relationship("SampleSummary", cascade="all,delete", uselist=False)
+    gene_stats = orm.relationship("GeneStat", cascade="all,delete")
+    panel_coverage = orm.relationship("PanelCoverage", cascade="all,delete")
 
 
 class TranscriptStat(BASE):
@@ -67,11 +102,19 @@ class TranscriptStat(BASE):
         transcript (Transcript): parent transcript record
         mean_coverage (Float): mean coverage across all exons
         completeness_XX (Float): percentage of exon bases coverage at XX
-        _incomplete_exons (str): comma separated list of exon ids
+        completeness (dict): completeness for every level in the source,
+            keyed by level as a string
+        _incomplete_exons (str): comma separated list of exon ids (legacy)
+        _packed_exons (bytes): incomplete exons encoded by ``pack_exons``
     """
 
     __tablename__ = "transcript_stat"
-    __table_args__ = (UniqueConstraint("sample_id", "transcript_id", name="_sample_transcript_uc"),)
+    # covering index for the aggregations in chanjo.calculate starting from
+    # samples, the unique one finds the stats of transcripts in a gene panel
+    __table_args__ = (
+        Index("ix_transcript_stat_sample_covering", "sample_id", "transcript_id", *STAT_COLUMNS),
+        Index("ix_transcript_stat_transcript", "transcript_id", "sample_id", unique=True),
+    )
 
     id = Column(types.Integer, primary_key=True)
     mean_coverage = Column(types.Float, nullable=False)
@@ -80,9 +123,11 @@ class TranscriptStat(BASE):
     completeness_20 = Column(types.Float)
     completeness_50 = Column(types.Float)
     completeness_100 = Column(types.Float)
+    completeness = Column(types.JSON(none_as_null=True))
 
     threshold = Column(types.Integer)
     _incomplete_exons = Column(types.Text)
+    _packed_exons = Column(types.LargeBinary)
 
     sample_id = Column(
         types.String(32), ForeignKey("sample.id", ondelete="CASCADE"), nullable=False
@@ -91,15 +136,188 @@ class TranscriptStat(BASE):
 
     @property
     def incomplete_exons(self):
-        """Return a list of exons ids."""
-        raw_exons = self._incomplete_exons.split(",") if self._incomplete_exons else []
-        for raw_exon in raw_exons:
-            data = raw_exon.split("|")
-            yield Exon(
-                chrom=data[0], start=int(data[1]), end=int(data[2]), completeness=float(data[3])
-            )
+        """Return a sequence of incomplete exons, decoded on access."""
+        if self._packed_exons is not None or not self._incomplete_exons:
+            return ExonView(self._packed_exons)
+        return parse_exons(self._incomplete_exons)
 
     @incomplete_exons.setter
     def incomplete_exons(self, exon_list):
-        raw_exons = ["|".join(map(str, exon)) for exon in exon_list]
-        self._incomplete_exons = ",".join(raw_exons) if raw_exons else None
+        self._packed_exons = pack_exons(exon_list)
+        self._incomplete_exons = None
+
+    def to_dict(self, **kwargs):
+        """Serialize to a dict with the incomplete exons decoded.
+
+        The raw exon columns are left out, "incomplete_exons" is a list of
+        dicts with "chrom", "start", "end" and "completeness".
+        """
+        data = super().to_dict(**kwargs)
+        data.pop("_packed_exons", None)
+        data.pop("_incomplete_exons", None)
+        data["incomplete_exons"] = [exon._asdict() for exon in self.incomplete_exons]
+        return data
+
+
+class SummaryMetrics:
+    """Averaged metrics shared by the summary tables.
+
+    Args:
+        transcript_count (int): number of transcript stats averaged
+        mean_coverage (Float): average mean coverage
+        completeness_XX (Float): average completeness at XX
+    """
+
+    transcript_count = Column(types.Integer, nullable=False)
+    mean_coverage = Column(types.Float)
+    completeness_10 = Column(types.Float)
+    completeness_15 = Column(types.Float)
+    completeness_20 = Column(types.Float)
+    completeness_50 = Column(types.Float)
+    completeness_100 = Column(types.Float)
+
+
+class SampleSummary(SummaryMetrics, BASE):
+    """Transcript stats averaged per sample.
+
+    Maintained by :meth:`chanjo.store.summary.SummaryMixin.refresh_summaries`.
+    """
+
+    __tablename__ = "sample_summary"
+
+    sample_id = Column(
+        types.String(32), ForeignKey("sample.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class GeneStat(SummaryMetrics, BASE):
+    """Transcript stats averaged per sample and gene.
+
+    Maintained by :meth:`chanjo.store.summary.SummaryMixin.refresh_summaries`.
+    """
+
+    __tablename__ = "gene_stat"
+    # rows are unique per sample and gene by construction (GROUP BY)
+    __table_args__ = (
+        Index(
+            "ix_gene_stat_sample_covering",
+            "sample_id",
+            "gene_id",
+            "transcript_count",
+            *STAT_COLUMNS
+        ),
+        Index(
+            "ix_gene_stat_gene_covering", "gene_id", "sample_id", "transcript_count", *STAT_COLUMNS
+        ),
+    )
+
+    id = Column(types.Integer, primary_key=True)
+    sample_id = Column(
+        types.String(32), ForeignKey("sample.id", ondelete="CASCADE"), nullable=False
+    )
+    gene_id = Column(types.Integer, nullable=False)
+
+
+class GenePanel(BASE):
+    """Named list of genes, e.g. a clinical panel.
+
+    Args:
+        id (str): unique panel name
+        created_at (DateTime): date of addition to database
+    """
+
+    __tablename__ = "gene_panel"
+
+    id = Column(types.String(128), primary_key=True)
+    created_at = Column(types.DateTime, default=datetime.now)
+
+    genes = orm.relationship("GenePanelGene", cascade="all,delete")
+    coverage = orm.relationship("PanelCoverage", cascade="all,delete")
+
+
+class GenePanelGene(BASE):
+    """Gene included in a gene panel."""
+
+    __tablename__ = "gene_panel_gene"
+
+    panel_id = Column(
+        types.String(128), ForeignKey("gene_panel.id", ondelete="CASCADE"), primary_key=True
+    )
+    gene_id = Column(types.Integer, primary_key=True)
+
+
+class PanelCoverage(SummaryMetrics, BASE):
+    """Transcript stats averaged per sample across the genes of a panel.
+
+    Maintained by :meth:`chanjo.store.summary.SummaryMixin.refresh_summaries`.
+    """
+
+    __tablename__ = "panel_coverage"
+
+    sample_id = Column(
+        types.String(32), ForeignKey("sample.id", ondelete="CASCADE"), primary_key=True
+    )
+    panel_id = Column(
+        types.String(128), ForeignKey("gene_panel.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class Generation(BASE):
+    """Counter bumped by every change to the coverage data.
+
+    Cached calculate results are only reused within a generation, see
+    :mod:`chanjo.store.cache`. A single row, inserted with the table.
+
+    Args:
+        value (int): number of changes so far
+    """
+
+    __tablename__ = "generation"
+
+    id = Column(types.Integer, primary_key=True)
+    value = Column(types.Integer, nullable=False)
+
+
+# id of the single "generation" row
+GENERATION_ID = 1
+
+
+@event.listens_for(Generation.__table__, "after_create")
+def seed_generation(table, connection, **kwargs):
+    """Insert the counter along with the table, writers only update it."""
+    connection.execute(table.insert().values(id=GENERATION_ID, value=0))
+
+
+def parse_exons(raw_exons):
+    """Parse incomplete exons from the legacy text column.
+
+    Args:
+        raw_exons (str): comma separated "chrom|start|end|completeness"
+
+    Returns:
+        List[Exon]: parsed exons
+    """
+    exons = []
+    for raw_exon in raw_exons.split(","):
+        data = raw_exon.split("|")
+        exons.append(
+            Exon(chrom=data[0], start=int(data[1]), end=int(data[2]), completeness=float(data[3]))
+        )
+    return exons
+
+
+def completeness_column(level):
+    """Return a SQL expression for transcript completeness at a level.
+
+    The default levels have their own (indexable) columns, other levels
+    are extracted from the JSON "completeness" column.
+
+    Args:
+        level (int): completeness level
+
+    Returns:
+        ColumnElement: completeness expression
+    """
+    if level in COMPLETENESS_LEVELS:
+        return getattr(TranscriptStat, "completeness_{}".format(level))
+    return TranscriptStat.completeness[str(level)].as_float()
@@ -0,0 +1,74 @@
+"""Module for managing named gene panels"""
+
+import logging
+
+from sqlalchemy import delete, func, select
+
+from chanjo.store.cache import bump_generation
+from chanjo.store.models import GenePanel, GenePanelGene, PanelCoverage
+from chanjo.store.summary import refresh_panel_coverage
+
+LOG = logging.getLogger(__name__)
+
+
+class PanelMixin:
+    """Methods for managing gene panels"""
+
+    def add_panel(self, panel_id, gene_ids, replace=False):
+        """Store a gene panel and calculate its coverage for all samples.
+
+        Args:
+            panel_id (str): unique panel name
+            gene_ids (List[int]): genes in the panel
+            replace (Optional[bool]): overwrite an existing panel
+
+        Returns:
+            int: number of genes in the panel
+        """
+        gene_ids = set(map(int, gene_ids))
+        with self.begin() as session:
+            if replace:
+                delete_panel(session, panel_id)
+            session.add(GenePanel(id=panel_id))
+            session.flush()
+            rows = [{"panel_id": panel_id, "gene_id": gene_id} for gene_id in gene_ids]
+            self._insert_batches(session, GenePanelGene, rows)
+            refresh_panel_coverage(session, panel_ids=[panel_id])
+            bump_generation(session)
+        LOG.info("added panel %s with %s genes", panel_id, len(gene_ids))
+        return len(gene_ids)
+
+    def fetch_panels(self):
+        """Fetch panel names along with their number of genes."""
+        with self.begin() as session:
+            query = (
+                session.query(GenePanel.id, GenePanel.created_at, func.count(GenePanelGene.gene_id))
+                .outerjoin(GenePanelGene)
+                .group_by(GenePanel.id, GenePanel.created_at)
+                .order_by(GenePanel.id)
+            )
+            return query
+
+    def panel_genes(self, panel_id):
+        """Fetch the gene ids of a panel."""
+        with self.begin() as session:
+            query = select(GenePanelGene.gene_id).where(GenePanelGene.panel_id == panel_id)
+            return [gene_id for gene_id in session.scalars(query)]
+
+    def remove_panel(self, panel_id):
+        """Remove a panel along with its genes and coverage.
+
+        Returns:
+            bool: whether the panel existed
+        """
+        with self.begin() as session:
+            return delete_panel(session, panel_id)
+
+
+def delete_panel(session, panel_id):
+    """Delete a panel and its rows in the session."""
+    for model in (PanelCoverage, GenePanelGene):
+        session.execute(delete(model).where(model.panel_id == panel_id))
+    result = session.execute(delete(GenePanel).where(GenePanel.id == panel_id))
+    bump_generation(session)
+    return result.rowcount > 0
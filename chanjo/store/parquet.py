@@ -0,0 +1,202 @@
+"""Read-only store over Parquet files exported by ``chanjo export``
+
+Cohort-wide aggregations run as vectorised scans in an embedded DuckDB
+database. Requires DuckDB (``pip install chanjo[duckdb]``), imported on
+use.
+"""
+
+import logging
+from pathlib import Path
+
+from chanjo.client import ChanjoClient, is_server_uri
+from chanjo.store.constants import COMPLETENESS_LEVELS
+
+LOG = logging.getLogger(__name__)
+
+PARQUET_SCHEME = "parquet://"
+
+
+def is_parquet_uri(uri):
+    """Check if a URI points to exported Parquet files."""
+    if uri.startswith(PARQUET_SCHEME):
+        return True
+    return "://" not in uri and (uri.endswith(".parquet") or Path(uri).expanduser().is_dir())
+
+
+def get_store(uri, **kwargs):
+    """Open the store behind a URI.
+
+    Parquet files, a directory of them or "parquet://<path>" opens a
+    :class:`ParquetStore`, the URL of a "chanjo serve" process a
+    :class:`chanjo.client.ChanjoClient` and anything else the default
+    SQL store.
+
+    Args:
+        uri (str): path/URI to the database or Parquet files
+        kwargs: passed on to the SQL store
+
+    Returns:
+        ChanjoDB|ParquetStore|ChanjoClient: store with the calculate and
+            fetch methods
+    """
+    if is_server_uri(uri):
+        return ChanjoClient(uri)
+    if is_parquet_uri(uri):
+        return ParquetStore(uri[len(PARQUET_SCHEME) :] if uri.startswith(PARQUET_SCHEME) else uri)
+    from chanjo.store.api import ChanjoDB
+
+    return ChanjoDB(uri=uri, **kwargs)
+
+
+def placeholders(values):
+    """Return a "?, ?, ..." parameter list for the values."""
+    return ", ".join("?" for _ in values)
+
+
+def completeness_name(level):
+    """Return the exported completeness column for a level."""
+    if level not in COMPLETENESS_LEVELS:
+        raise ValueError("completeness level not exported: {}".format(level))
+    return "completeness_{}".format(level)
+
+
+def metric_sql(column, weighted=False):
+    """Aggregate a metric, like ``chanjo.calculate.stat_metrics``."""
+    if weighted:
+        return "SUM({0} * length) / SUM(CASE WHEN {0} IS NOT NULL THEN length END)".format(column)
+    return "AVG({})".format(column)
+
+
+class ParquetStore:
+    """Read-heavy store over transcript stats in partitioned Parquet files.
+
+    Offers the calculate and fetch methods of
+    :class:`chanjo.store.api.ChanjoDB` for files written by
+    :meth:`chanjo.store.export.ExportMixin.export_coverage`, ideally
+    partitioned by sample so that sample filters skip whole files.
+    Results are lists of rows rather than SQLAlchemy queries.
+
+    Args:
+        path (path): Parquet file or directory of (hive partitioned) files
+    """
+
+    def __init__(self, path):
+        import duckdb
+
+        self.path = Path(path).expanduser()
+        if self.path.is_dir():
+            source = str(self.path.joinpath("**", "*.parquet"))
+        else:
+            source = str(self.path)
+        self.connection = duckdb.connect()
+        # views can't take parameters, quote the path as a string literal
+        self.connection.execute(
+            "CREATE VIEW transcript_stat AS SELECT * FROM read_parquet('{}', "
+            "hive_partitioning = true, union_by_name = true)".format(source.replace("'", "''"))
+        )
+
+    @property
+    def dialect(self):
+        """Return the name of the query engine."""
+        return "duckdb"
+
+    def close(self):
+        """Close the DuckDB connection."""
+        self.connection.close()
+
+    def _rows(self, sql, params=()):
+        return self.connection.execute(sql, list(params)).fetchall()
+
+    def mean(self, sample_ids=None, levels=COMPLETENESS_LEVELS, summary=True, weighted=False):
+        """Calculate the mean values of all metrics per sample.
+
+        Args:
+            sample_ids (Optional[List[str]]): samples to limit query to
+            levels (Optional[List[int]]): completeness levels to include
+            summary (Optional[bool]): ignored, there are no summary tables
+            weighted (Optional[bool]): weight transcripts by length
+
+        Returns:
+            List[tuple]: sample id, mean coverage and completeness levels
+        """
+        columns = ["mean_coverage"] + [completeness_name(level) for level in levels]
+        metrics = ", ".join(metric_sql(column, weighted) for column in columns)
+        sql = "SELECT sample_id, {} FROM transcript_stat".format(metrics)
+        params = list(sample_ids or [])
+        if params:
+            sql += " WHERE sample_id IN ({})".format(placeholders(params))
+        return self._rows(sql + " GROUP BY sample_id ORDER BY sample_id", params)
+
+    def gene_metrics(self, *genes, summary=True, weighted=False):
+        """Calculate gene statistics.
+
+        Returns:
+            List[tuple]: sample id, metrics and gene id per sample and gene
+        """
+        columns = ["mean_coverage"] + [completeness_name(level) for level in COMPLETENESS_LEVELS]
+        metrics = ", ".join(metric_sql(column, weighted) for column in columns)
+        gene_ids = [int(gene_id) for gene_id in genes]
+        sql = (
+            "SELECT sample_id, {}, gene_id FROM transcript_stat WHERE gene_id IN ({}) "
+            "GROUP BY sample_id, gene_id ORDER BY sample_id, gene_id"
+        ).format(metrics, placeholders(gene_ids) or "NULL")
+        return self._rows(sql, gene_ids)
+
+    def sample_coverage(
+        self,
+        sample_ids: list,
+        genes: list = None,
+        level: int = 10,
+        summary: bool = True,
+        weighted: bool = False,
+        panel: str = None,
+    ) -> dict:
+        """Calculate coverage for samples, completeness at ``level``."""
+        if panel is not None:
+            raise ValueError("gene panels are only stored in the SQL database")
+        sample_ids = list(sample_ids)
+        gene_ids = [int(gene_id) for gene_id in genes or []]
+        sql = (
+            "SELECT sample_id, {}, {} FROM transcript_stat "
+            "WHERE sample_id IN ({}) AND gene_id IN (SELECT UNNEST(?)) GROUP BY sample_id"
+        ).format(
+            metric_sql("mean_coverage", weighted),
+            metric_sql(completeness_name(level), weighted),
+            placeholders(sample_ids) or "NULL",
+        )
+        # DuckDB skips partitions on the bound sample ids, genes are sent as one list
+        return {
+            sample_id: {"mean_coverage": coverage, "mean_completeness": completeness}
+            for sample_id, coverage, completeness in self._rows(sql, sample_ids + [gene_ids])
+        }
+
+    def fetch_samples(self, sample_id=None, group_id=None):
+        """Fetch the samples present in the files.
+
+        Returns:
+            List[dict]: "id" and "group_id" per sample
+        """
+        sql = "SELECT DISTINCT sample_id, group_id FROM transcript_stat"
+        conditions, params = [], []
+        if sample_id:
+            conditions.append("sample_id = ?")
+            params.append(sample_id)
+        if group_id:
+            conditions.append("group_id = ?")
+            params.append(group_id)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        rows = self._rows(sql + " ORDER BY sample_id", params)
+        return [{"id": row[0], "group_id": row[1]} for row in rows]
+
+    def fetch_transcripts(self, sample_id):
+        """Fetch the transcript stats of a sample.
+
+        Returns:
+            List[dict]: exported columns per transcript
+        """
+        cursor = self.connection.execute(
+            "SELECT * FROM transcript_stat WHERE sample_id = ?", [sample_id]
+        )
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
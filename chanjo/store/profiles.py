@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Connection settings tuned for different workloads.
+
+A profile bundles PRAGMAs applied to each new SQLite connection and
+connection pool options for server databases like MySQL. Pick one with
+``chanjo --profile`` or ``profile:`` in "chanjo.yaml", where ``pragmas:``
+and ``pool:`` mappings override single settings of the profile.
+"""
+
+DEFAULT_PROFILE = "default"
+
+# profile: SQLite PRAGMAs and pool options for other databases
+PROFILES = {
+    # SQLite defaults, recycle connections before MySQL times them out
+    "default": {"pragmas": {}, "pool": {"pool_recycle": 3600}},
+    # loads: WAL journal and fsync only at checkpoints, one writer.
+    # Foreign keys: stats for transcripts that were never linked are skipped.
+    "bulk": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -262144,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+            "foreign_keys": "ON",
+        },
+        "pool": {"pool_recycle": 3600, "pool_size": 2, "max_overflow": 0},
+    },
+    # reports: memory mapped reads next to writers, many connections
+    "read": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "cache_size": -65536,
+            "mmap_size": 1073741824,
+            "foreign_keys": "ON",
+        },
+        "pool": {"pool_recycle": 3600, "pool_size": 10, "max_overflow": 20, "pool_pre_ping": True},
+    },
+}
+
+
+def resolve_profile(profile=None, pragmas=None, pool=None):
+    """Look up a profile and apply overrides.
+
+    Args:
+        profile (Optional[str]): name of the profile, "default" if unset
+        pragmas (Optional[dict]): SQLite PRAGMAs to add or override
+        pool (Optional[dict]): pool options to add or override
+
+    Returns:
+        Tuple[dict, dict]: SQLite PRAGMAs and pool options
+
+    Raises:
+        ValueError: for an unknown profile
+    """
+    name = profile or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(
+            "unknown profile: {} (choose from {})".format(name, ", ".join(sorted(PROFILES)))
+        )
+    settings = PROFILES[name]
+    return dict(settings["pragmas"], **(pragmas or {})), dict(settings["pool"], **(pool or {}))
+
+
+def store_options(config):
+    """Pick the connection settings from a "chanjo.yaml" config.
+
+    Args:
+        config (dict): loaded config, the CLI context object
+
+    Returns:
+        dict: keyword arguments for :class:`chanjo.store.api.ChanjoDB`
+    """
+    return {
+        "profile": config.get("profile"),
+        "pragmas": config.get("pragmas"),
+        "pool": config.get("pool"),
+    }
+
+
+def set_pragmas(dbapi_connection, pragmas):
+    """Apply PRAGMAs to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if not name.isidentifier():
+                raise ValueError("invalid PRAGMA: {}".format(name))
+            cursor.execute("PRAGMA {} = {}".format(name, value))
+    finally:
+        cursor.close()
@@ -0,0 +1,142 @@
+"""Module for maintaining pre-aggregated summary tables"""
+
+import logging
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.sql import func
+
+from chanjo.store.cache import bump_generation
+from chanjo.store.constants import STAT_COLUMNS
+from chanjo.store.models import (
+    GenePanelGene,
+    GeneStat,
+    PanelCoverage,
+    SampleSummary,
+    Transcript,
+    TranscriptStat,
+)
+
+LOG = logging.getLogger(__name__)
+
+
+def refresh_summaries(connection, sample_ids=None):
+    """Rebuild summary rows with "INSERT ... SELECT" aggregations.
+
+    Args:
+        connection (Connection|Session): where to execute statements
+        sample_ids (Optional[List[str]]): samples to refresh, else all
+    """
+    clear_summaries(connection, sample_ids)
+    metrics = [func.avg(getattr(TranscriptStat, column)) for column in STAT_COLUMNS]
+    sample_query = select(
+        TranscriptStat.sample_id, func.count(TranscriptStat.id), *metrics
+    ).group_by(TranscriptStat.sample_id)
+    gene_query = (
+        select(
+            TranscriptStat.sample_id, Transcript.gene_id, func.count(TranscriptStat.id), *metrics
+        )
+        .join(Transcript, TranscriptStat.transcript_id == Transcript.id)
+        .group_by(TranscriptStat.sample_id, Transcript.gene_id)
+    )
+    if sample_ids is not None:
+        sample_query = sample_query.where(TranscriptStat.sample_id.in_(sample_ids))
+        gene_query = gene_query.where(TranscriptStat.sample_id.in_(sample_ids))
+
+    columns = ["sample_id", "transcript_count"] + STAT_COLUMNS
+    connection.execute(insert(SampleSummary).from_select(columns, sample_query))
+    columns = ["sample_id", "gene_id", "transcript_count"] + STAT_COLUMNS
+    connection.execute(insert(GeneStat).from_select(columns, gene_query))
+    refresh_panel_coverage(connection, sample_ids=sample_ids)
+    bump_generation(connection)
+
+
+def refresh_flushed_summaries(session, flush_context):
+    """Refresh summaries for transcript stats written through the ORM.
+
+    Listens to "after_flush" on the sessions of the store, so stats
+    added, changed or deleted as models, not only with
+    :meth:`chanjo.store.insert.InsertMixin.add_transcript_stats`, are
+    reflected in the summary tables within the same transaction.
+    """
+    sample_ids = {
+        model.sample_id
+        for model in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(model, TranscriptStat) and model.sample_id is not None
+    }
+    if sample_ids:
+        refresh_summaries(session.connection(), sorted(sample_ids))
+
+
+def refresh_panel_coverage(connection, sample_ids=None, panel_ids=None):
+    """Rebuild panel coverage from the per gene summaries.
+
+    Gene averages are weighted by their number of transcripts so the
+    result is the average across all transcripts in the panel.
+
+    Args:
+        connection (Connection|Session): where to execute statements
+        sample_ids (Optional[List[str]]): samples to refresh, else all
+        panel_ids (Optional[List[str]]): panels to refresh, else all
+    """
+    clear_panel_coverage(connection, sample_ids=sample_ids, panel_ids=panel_ids)
+    total = func.sum(GeneStat.transcript_count)
+    metrics = [
+        func.sum(getattr(GeneStat, column) * GeneStat.transcript_count) / total
+        for column in STAT_COLUMNS
+    ]
+    query = (
+        select(GenePanelGene.panel_id, GeneStat.sample_id, total, *metrics)
+        .join(GeneStat, GeneStat.gene_id == GenePanelGene.gene_id)
+        .group_by(GenePanelGene.panel_id, GeneStat.sample_id)
+    )
+    if sample_ids is not None:
+        query = query.where(GeneStat.sample_id.in_(sample_ids))
+    if panel_ids is not None:
+        query = query.where(GenePanelGene.panel_id.in_(panel_ids))
+    columns = ["panel_id", "sample_id", "transcript_count"] + STAT_COLUMNS
+    connection.execute(insert(PanelCoverage).from_select(columns, query))
+
+
+def clear_panel_coverage(connection, sample_ids=None, panel_ids=None):
+    """Remove panel coverage rows.
+
+    Args:
+        connection (Connection|Session): where to execute statements
+        sample_ids (Optional[List[str]]): samples to clear, else all
+        panel_ids (Optional[List[str]]): panels to clear, else all
+    """
+    statement = delete(PanelCoverage)
+    if sample_ids is not None:
+        statement = statement.where(PanelCoverage.sample_id.in_(sample_ids))
+    if panel_ids is not None:
+        statement = statement.where(PanelCoverage.panel_id.in_(panel_ids))
+    connection.execute(statement)
+
+
+def clear_summaries(connection, sample_ids=None):
+    """Remove summary rows.
+
+    Args:
+        connection (Connection|Session): where to execute statements
+        sample_ids (Optional[List[str]]): samples to clear, else all
+    """
+    for model in (SampleSummary, GeneStat):
+        statement = delete(model)
+        if sample_ids is not None:
+            statement = statement.where(model.sample_id.in_(sample_ids))
+        connection.execute(statement)
+    clear_panel_coverage(connection, sample_ids=sample_ids)
+
+
+class SummaryMixin:
+    """Methods for maintaining summary tables"""
+
+    def refresh_summaries(self, sample_ids=None):
+        """Rebuild the "sample_summary", "gene_stat" and "panel_coverage" tables.
+
+        Args:
+            sample_ids (Optional[List[str]]): samples to refresh, else all
+        """
+        with self.begin() as session:
+            refresh_summaries(session, sample_ids)
+        LOG.debug("refreshed summaries for %s", "all samples" if sample_ids is None else sample_ids)
@@ -74,6 +74,13 @@ setup(
     zip_safe=False,
     # Install requirements loaded from ``requirements.txt``
     install_requires=parse_reqs(),
+    extras_require={
+        "numpy": ["numpy"],
+        "pysam": ["pysam", "numpy"],
+        "arrow": ["pyarrow"],
+        "duckdb": ["duckdb"],
+        "async": ["aiosqlite", "asyncmy"],
+    },
     tests_require=[
         "pytest",
     ],
@@ -87,13 +94,18 @@ setup(
             "chanjo = chanjo.cli:root",
         ],
         "chanjo.subcommands.4": [
-            "init = chanjo.cli:init",
-            "sex = chanjo.cli:sex",
-            "sambamba = chanjo.cli:sambamba",
-            "db = chanjo.cli:db_cmd",
-            "load = chanjo.cli:load",
-            "link = chanjo.cli:link",
-            "calculate = chanjo.cli:calculate",
+            "init = chanjo.cli.init:init",
+            "sex = chanjo.cli.sex:sex",
+            "sambamba = chanjo.cli.sambamba:sambamba",
+            "db = chanjo.cli.db:db_cmd",
+            "load = chanjo.cli.load:load",
+            "load-batch = chanjo.cli.load:load_batch",
+            "load-bam = chanjo.cli.load:load_bam",
+            "link = chanjo.cli.load:link",
+            "calculate = chanjo.cli.calculate:calculate",
+            "panel = chanjo.cli.panel:panel",
+            "export = chanjo.cli.export:export",
+            "serve = chanjo.cli.serve:serve",
         ],
     },
     # See: http://pypi.python.org/pypi?%3Aaction=list_classifiers
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
 import os
+import subprocess
+import sys
 
+import click
 import yaml
+from sqlalchemy import text
+
+from chanjo.store.api import ChanjoDB
 
 
 def test_logging_to_file(tmp_path, invoke_cli):
@@ -41,3 +47,50 @@ def test_with_config(tmpdir, invoke_cli):
     # THEN config values should be picked up
     assert result.exit_code == 0
     assert os.path.exists(db_path)
+
+
+def test_lazy_imports():
+    # GIVEN a fresh interpreter
+    code = (
+        "import sys\n"
+        "from chanjo.cli import root, sambamba\n"
+        "print('sqlalchemy' in sys.modules, 'chanjo.cli.load' in sys.modules)"
+    )
+    # WHEN importing the CLI and a command that doesn't use the database
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    # THEN neither SQLAlchemy nor the other commands should be imported
+    assert output.stdout.split() == ["False", "False"]
+
+
+def test_commands_not_shadowed():
+    # GIVEN a command module imported directly
+    import chanjo.cli.calculate  # noqa: F401
+
+    # WHEN importing the command from the package
+    from chanjo.cli import calculate
+
+    # THEN the command should be returned, not its module
+    assert isinstance(calculate, click.Group)
+
+
+def test_profile_from_config(tmp_path, invoke_cli):
+    # GIVEN a config file picking the bulk profile
+    conf_path = tmp_path.joinpath("chanjo.yaml")
+    db_path = tmp_path.joinpath("coverage.sqlite3")
+    data = {"database": str(db_path), "profile": "bulk"}
+    with open(conf_path, "w") as handle:
+        yaml.dump(data, handle, default_flow_style=False)
+    # WHEN setting up the database
+    result = invoke_cli(["-c", str(conf_path), "db", "setup"])
+    # THEN the database should be switched to WAL, which is persistent
+    assert result.exit_code == 0
+    with ChanjoDB(str(db_path)).engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+def test_unknown_profile(invoke_cli):
+    # WHEN picking a profile that doesn't exist
+    result = invoke_cli(["--profile", "fast", "db", "setup"])
+    # THEN the CLI should refuse it
+    assert result.exit_code != 0
+    assert "fast" in result.output
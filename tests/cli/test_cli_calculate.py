@@ -2,6 +2,8 @@
 
 import json
 
+import pytest
+
 from chanjo.cli import root
 from chanjo.cli.calculate import dump_json
 from chanjo.store.models import Sample
@@ -52,3 +54,54 @@ def test_coverage(popexist_db, cli_runner):
         data = json.loads(lines[0].strip())
         # THE dict should include mean_coverage and mean completeness for sample
         assert set(data["sample"].keys()) == set(["mean_coverage", "mean_completeness"])
+
+
+def test_mean_levels(popexist_db, cli_runner):
+    # GIVEN an existing database with one sample
+    # WHEN asking for mean values at some completeness levels
+    res = cli_runner.invoke(
+        root, ["-d", popexist_db.uri, "calculate", "mean", "-l", "20", "-l", "100"]
+    )
+    # THEN only those levels should be reported
+    assert res.exit_code == 0
+    data = json.loads(res.output.strip().split("\n")[0])
+    assert set(data) == set(["sample_id", "mean_coverage", "completeness_20", "completeness_100"])
+    assert data["completeness_20"] >= data["completeness_100"]
+
+
+def test_coverage_weighted(popexist_db, cli_runner):
+    # GIVEN an existing database with one sample
+    # WHEN calculating coverage weighted by transcript length
+    res = cli_runner.invoke(
+        root,
+        ["-d", popexist_db.uri, "calculate", "coverage", "-w", "-s", "sample", "14825", "28706"],
+    )
+    # THEN the command should return JSON results
+    assert res.exit_code == 0
+    assert "mean_completeness" in res.output
+
+
+def test_coverage_panel(popexist_db, cli_runner):
+    # GIVEN a database with a stored panel
+    popexist_db.add_panel("panel", [14825, 28706])
+    # WHEN calculating coverage on the panel
+    res = cli_runner.invoke(
+        root, ["-d", popexist_db.uri, "calculate", "coverage", "-s", "sample", "-P", "panel"]
+    )
+    # THEN it should match the coverage on the genes
+    assert res.exit_code == 0
+    data = json.loads(res.output.strip().split("\n")[-1])
+    assert data == popexist_db.sample_coverage(sample_ids=["sample"], genes=[14825, 28706])
+
+
+def test_mean_parquet(popexist_db, cli_runner, tmp_path):
+    # GIVEN a sample exported to Parquet files
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("duckdb")
+    popexist_db.export_coverage(tmp_path, partition_by="sample")
+    # WHEN calculating mean values from the files
+    res = cli_runner.invoke(root, ["-d", str(tmp_path), "calculate", "mean"])
+    # THEN the sample should be reported
+    assert res.exit_code == 0
+    data = json.loads(res.output.strip().split("\n")[-1])
+    assert data["sample_id"] == "sample"
@@ -0,0 +1,30 @@
+"""Test export subcommand"""
+
+import pytest
+
+from chanjo.cli import root
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_export(popexist_db, cli_runner, tmp_path):
+    # GIVEN an existing database with one sample
+    out_path = tmp_path.joinpath("coverage.parquet")
+    # WHEN exporting to Parquet
+    res = cli_runner.invoke(root, ["-d", popexist_db.uri, "export", str(out_path)])
+    # THEN the file should be written with all transcript stats
+    assert res.exit_code == 0
+    assert "{}\t9".format(out_path) in res.output
+    assert pq.read_table(out_path).num_rows == 9
+
+
+def test_export_partitioned(popexist_db, cli_runner, tmp_path):
+    # GIVEN an existing database with one sample in a group
+    # WHEN exporting Arrow IPC files partitioned by group
+    res = cli_runner.invoke(
+        root,
+        ["-d", popexist_db.uri, "export", "-f", "arrow", "-p", "group", str(tmp_path)],
+    )
+    # THEN a partition should be written for the group
+    assert res.exit_code == 0
+    assert tmp_path.joinpath("group_id=group", "part-0.arrow").exists()
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
-from chanjo.store.models import Sample, Transcript
+import pytest
+
+from chanjo.store.models import Sample, Transcript, TranscriptExon, TranscriptStat
 
 
 def test_load(existing_db, invoke_cli, sambamba_path):
@@ -35,9 +37,106 @@ def test_link(existing_db, invoke_cli, bed_path):
     assert result.exit_code == 0
     with existing_db.begin() as session:
         assert len(session.all(Transcript.select())) == 5
+        # ... and the exon index should link each exon to its transcripts
+        assert len(session.all(TranscriptExon.select())) == 20
 
         # WHEN loading again...
         result = invoke_cli(["--database", db_uri, "link", bed_path])
         # THEN it should error and rollback the session
         assert result.exit_code != 0
         assert len(session.all(Transcript.select())) == 5
+
+
+def test_load_batch(existing_db, invoke_cli, sambamba_path, tmpdir):
+    # GIVEN a manifest with two samples
+    manifest_path = tmpdir.join("manifest.tsv")
+    manifest_path.write(
+        "path\tsample\tname\n{0}\tsample1\tFirst\n{0}\tsample2\tSecond\n".format(sambamba_path)
+    )
+    # WHEN loading the samples in a batch
+    result = invoke_cli(
+        [
+            "--database",
+            existing_db.uri,
+            "load-batch",
+            "--group",
+            "group",
+            "--processes",
+            "2",
+            "--manifest",
+            str(manifest_path),
+        ]
+    )
+    # THEN both samples should be loaded into the same group
+    assert result.exit_code == 0
+    with existing_db.begin() as session:
+        samples = session.all(Sample.select())
+        assert set(sample.id for sample in samples) == {"sample1", "sample2"}
+        assert all(sample.group_id == "group" for sample in samples)
+
+    # WHEN loading the same sample twice
+    result = invoke_cli(["--database", existing_db.uri, "load-batch", sambamba_path, sambamba_path])
+    # THEN it should fail but keep the first copy
+    assert result.exit_code != 0
+    with existing_db.begin() as session:
+        assert session.first(Sample.select().where(Sample.id == "ADM992A10"))
+
+
+def test_load_columnar(existing_db, invoke_cli, sambamba_path):
+    # GIVEN processed sambamba depth output and empty database
+    # WHEN loading with the columnar parser
+    result = invoke_cli(["--database", existing_db.uri, "load", "--columnar", sambamba_path])
+    # THEN all transcript stats should be loaded
+    assert result.exit_code == 0
+    with existing_db.begin() as session:
+        assert len(session.all(TranscriptStat.select())) == 9
+
+
+def test_load_stream(existing_db, invoke_cli, sambamba_path):
+    # GIVEN processed sambamba depth output sorted by position
+    # WHEN loading while streaming transcripts
+    result = invoke_cli(
+        ["--database", existing_db.uri, "load", "--window", "100000", sambamba_path]
+    )
+    # THEN all transcript stats should be loaded
+    assert result.exit_code == 0
+    with existing_db.begin() as session:
+        assert len(session.all(TranscriptStat.select())) == 9
+
+
+def test_load_index(existing_db, invoke_cli, sambamba_path, exon_lines, tmpdir):
+    # GIVEN a database with linked exons
+    result = invoke_cli(["--database", existing_db.uri, "link", sambamba_path])
+    assert result.exit_code == 0
+    # ... and Sambamba output without the transcript columns (F4-F6)
+    slim_path = tmpdir.join("slim.bed")
+    slim_rows = [line.rstrip("\n").split("\t") for line in exon_lines]
+    slim_path.write("".join("\t".join(row[:4] + row[7:]) + "\n" for row in slim_rows))
+    # WHEN loading with the exon index
+    result = invoke_cli(["--database", existing_db.uri, "load", "--index", str(slim_path)])
+    # THEN transcripts should be looked up by exon position
+    assert result.exit_code == 0
+    with existing_db.begin() as session:
+        assert len(session.all(TranscriptStat.select())) == 9
+
+
+def test_load_index_missing(existing_db, invoke_cli, sambamba_path):
+    # GIVEN a database without linked exons
+    # WHEN loading with the exon index
+    result = invoke_cli(["--database", existing_db.uri, "load", "--index", sambamba_path])
+    # THEN it should fail
+    assert result.exit_code != 0
+
+
+def test_load_bam(existing_db, invoke_cli, bam_path, bed_path):
+    pytest.importorskip("pysam")
+    # GIVEN a database with linked exons
+    result = invoke_cli(["--database", existing_db.uri, "link", bed_path])
+    assert result.exit_code == 0
+    # WHEN loading coverage calculated from a BAM file over the linked exons
+    result = invoke_cli(["--database", existing_db.uri, "load-bam", "-p", "1", bam_path])
+    # THEN a transcript stat should be stored for each transcript
+    assert result.exit_code == 0
+    with existing_db.begin() as session:
+        assert session.first(Sample.select()).id == "ADM1003A3"
+        assert len(session.all(TranscriptStat.select())) == 5
@@ -0,0 +1,66 @@
+"""Test panel subcommand"""
+
+import json
+
+from chanjo.cli import root
+
+
+def test_add_list_remove(popexist_db, cli_runner, tmpdir):
+    # GIVEN a file with gene ids
+    gene_file = tmpdir.join("genes.txt")
+    gene_file.write("14825\n28706\n")
+    # WHEN adding a panel from the file and one more gene
+    res = cli_runner.invoke(
+        root, ["-d", popexist_db.uri, "panel", "add", "-f", str(gene_file), "panel", "31275"]
+    )
+    # THEN it should be stored with all genes
+    assert res.exit_code == 0
+    assert "added panel: panel (3 genes)" in res.output
+    # WHEN listing panels
+    res = cli_runner.invoke(root, ["-d", popexist_db.uri, "panel", "list"])
+    assert res.exit_code == 0
+    data = json.loads(res.output.strip().split("\n")[-1])
+    assert [(panel["panel_id"], panel["genes"]) for panel in data] == [("panel", 3)]
+    # WHEN removing the panel
+    res = cli_runner.invoke(root, ["-d", popexist_db.uri, "panel", "remove", "panel"])
+    # THEN it should be gone
+    assert res.exit_code == 0
+    assert popexist_db.fetch_panels().all() == []
+
+
+def test_add_existing(popexist_db, cli_runner):
+    # GIVEN a stored panel
+    popexist_db.add_panel("panel", [14825])
+    # WHEN adding it again without --replace
+    res = cli_runner.invoke(root, ["-d", popexist_db.uri, "panel", "add", "panel", "28706"])
+    # THEN the command should abort
+    assert res.exit_code == 1
+    assert popexist_db.panel_genes("panel") == [14825]
+    # WHEN replacing it
+    res = cli_runner.invoke(
+        root, ["-d", popexist_db.uri, "panel", "add", "--replace", "panel", "28706"]
+    )
+    assert res.exit_code == 0
+    assert popexist_db.panel_genes("panel") == [28706]
+
+
+def test_remove_missing(popexist_db, cli_runner):
+    # GIVEN a database without panels
+    # WHEN removing a panel
+    res = cli_runner.invoke(root, ["-d", popexist_db.uri, "panel", "remove", "missing"])
+    # THEN the command should abort
+    assert res.exit_code == 1
+
+
+def test_add_invalid_genes(popexist_db, cli_runner, tmpdir):
+    # GIVEN a gene file with a header and a gene symbol
+    gene_file = tmpdir.join("genes.txt")
+    gene_file.write("gene_id\n14825\nBRCA1\n")
+    # WHEN adding it as a panel
+    res = cli_runner.invoke(
+        root, ["-d", popexist_db.uri, "panel", "add", "-f", str(gene_file), "panel"]
+    )
+    # THEN the command should abort without storing anything
+    assert res.exit_code == 1
+    assert res.exception is None or isinstance(res.exception, SystemExit)
+    assert popexist_db.fetch_panels().all() == []
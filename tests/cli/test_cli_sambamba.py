@@ -16,3 +16,12 @@ def test_sambamba_with_bai(invoke_cli, bam_path, bed_path):
     result = invoke_cli(["sambamba", "-r", bed_path, bai_path])
     # THEN command should exit with error
     assert result.exit_code != 0
+
+
+def test_sambamba_zero_shards(invoke_cli, bam_path, bed_path):
+    # GIVEN zero shards
+    # WHEN running sambamba
+    result = invoke_cli(["sambamba", "-r", bed_path, "--shards", "0", bam_path])
+    # THEN the option should be rejected
+    assert result.exit_code == 2
+    assert "--shards" in result.output
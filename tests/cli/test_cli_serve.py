@@ -0,0 +1,67 @@
+"""Test the CLI as a client of "chanjo serve\""""
+
+import json
+
+from chanjo.cli import root
+
+
+def test_calculate_client(server_url, cli_runner):
+    # GIVEN a server for a database with one sample
+    # WHEN calculating through the server
+    res = cli_runner.invoke(root, ["-d", server_url, "calculate", "mean"])
+    # THEN the results should be forwarded
+    assert res.exit_code == 0
+    data = json.loads(res.output.strip().split("\n")[-1])
+    assert data["sample_id"] == "sample"
+
+
+def test_load_client(popexist_db, server_url, cli_runner, sambamba_path):
+    # GIVEN a server and Sambamba output for a new sample
+    # WHEN loading through the server
+    res = cli_runner.invoke(
+        root, ["-d", server_url, "load", "-s", "new", "-g", "group", sambamba_path]
+    )
+    # THEN the server should store it
+    assert res.exit_code == 0
+    assert popexist_db.fetch_samples(sample_id="new").first().source.endswith("sambamba.depth.bed")
+    # WHEN loading the same sample again
+    res = cli_runner.invoke(root, ["-d", server_url, "load", "-s", "new", sambamba_path])
+    # THEN the command should abort
+    assert res.exit_code == 1
+
+
+def test_db_client(server_url, cli_runner):
+    # GIVEN a server for a database with one sample
+    # WHEN listing samples and transcripts through the server
+    res = cli_runner.invoke(root, ["-d", server_url, "db", "samples"])
+    # THEN the rows should be forwarded
+    assert res.exit_code == 0
+    assert json.loads(res.output)[0]["id"] == "sample"
+    res = cli_runner.invoke(root, ["-d", server_url, "db", "transcripts", "-s", "sample"])
+    assert res.exit_code == 0
+    assert json.loads(res.output)[0]["sample_id"] == "sample"
+    # WHEN running a maintenance command against the server
+    res = cli_runner.invoke(root, ["-d", server_url, "db", "setup"])
+    # THEN it should be rejected as a usage error
+    assert res.exit_code == 2
+    assert "not a server" in res.output
+
+
+def test_serve_remote_host(cli_runner):
+    # GIVEN a host other than loopback
+    # WHEN serving without opting in
+    res = cli_runner.invoke(root, ["-d", "sqlite://", "serve", "--host", "0.0.0.0"])
+    # THEN the command should refuse to start
+    assert res.exit_code == 2
+    assert "--allow-remote" in res.output
+
+
+def test_serve_socket_exists(cli_runner, tmp_path):
+    # GIVEN a socket path that's already taken
+    path = tmp_path.joinpath("chanjo.sock")
+    path.touch()
+    # WHEN serving on it
+    res = cli_runner.invoke(root, ["-d", "sqlite://", "serve", "--socket", str(path)])
+    # THEN the command should refuse to start
+    assert res.exit_code == 2
+    assert "another server" in res.output
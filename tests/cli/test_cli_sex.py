@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from chanjo.cli import root
+from chanjo.store.models import Sample
 
 
 def test_sex(cli_runner, bam_path):
@@ -12,3 +13,37 @@ def test_sex_with_wrong_file(cli_runner, bam_path):
     bai_path = "{}.bai".format(bam_path)
     result = cli_runner.invoke(root, ["sex", bai_path])
     assert result.exit_code != 0
+    # no header without any prediction
+    assert "X_coverage" not in result.output
+
+
+def test_sex_fast(cli_runner, bam_path):
+    result = cli_runner.invoke(root, ["sex", "--fast", bam_path])
+    assert result.exit_code == 0
+    assert "female" in result.output
+
+
+def test_sex_batch(cli_runner, bam_path):
+    # GIVEN two BAM files
+    # WHEN guessing sex for both at once
+    result = cli_runner.invoke(root, ["sex", "--fast", "--workers", "2", bam_path, bam_path])
+    # THEN one row per BAM should be printed with the sample id last
+    assert result.exit_code == 0
+    lines = result.output.strip().split("\n")
+    assert lines[0].endswith("\tsex\tsample")
+    assert len(lines) == 3
+    assert lines[1].split("\t")[2:] == ["female", "ADM1003A3"]
+
+
+def test_sex_store(cli_runner, existing_db, bam_path):
+    # GIVEN a database with the sample from the BAM file
+    with existing_db.begin() as session:
+        session.add(Sample(id="ADM1003A3"))
+    # WHEN guessing sex and storing the result
+    result = cli_runner.invoke(
+        root, ["--database", existing_db.uri, "sex", "--fast", "--store", bam_path]
+    )
+    # THEN the prediction should be saved on the sample
+    assert result.exit_code == 0
+    with existing_db.begin() as session:
+        assert session.get(Sample, "ADM1003A3").sex == "female"
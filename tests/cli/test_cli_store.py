@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 import json
 
+import pytest
+from sqlalchemy import text
+
 from chanjo.cli import root
-from chanjo.store.models import Sample, TranscriptStat
+from chanjo.cli.db import stream_json
+from chanjo.store.models import Sample, SampleSummary, TranscriptStat
 
 
 def test_setup(cli_runner, tmp_path):
@@ -134,3 +138,64 @@ def test_delete_group(cli_runner, popexist_db):
 
         # THEN the sample is no longer in the database
         assert session.first(Sample.select()) is None
+
+
+def test_migrate(cli_runner, existing_db):
+    # GIVEN an up to date database
+    # WHEN migrating it
+    result = cli_runner.invoke(root, ["--database", existing_db.uri, "db", "migrate"])
+    # THEN nothing should be added
+    assert result.exit_code == 0
+    assert "added column:" not in result.output
+
+
+def test_refresh_summaries(cli_runner, popexist_db):
+    # GIVEN a database where the summaries were cleared
+    with popexist_db.begin() as session:
+        session.execute(SampleSummary.__table__.delete())
+    # WHEN refreshing the summaries
+    result = cli_runner.invoke(root, ["--database", popexist_db.uri, "db", "refresh-summaries"])
+    # THEN they should be rebuilt
+    assert result.exit_code == 0
+    with popexist_db.begin() as session:
+        assert session.get(SampleSummary, "sample").transcript_count == 9
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize("rows", [[], [{"id": "sample", "sex": None}, {"id": "sample2"}]])
+def test_stream_json(rows, pretty):
+    # GIVEN some rows
+    # WHEN streaming them as a JSON array
+    output = "".join(stream_json(iter(rows), pretty=pretty))
+    # THEN the output should be the same as dumping the whole list
+    assert output == json.dumps(rows, indent=4 if pretty else None) + "\n"
+
+
+def test_transcripts_ndjson(cli_runner, popexist_db):
+    # GIVEN an existing database with one sample
+    # WHEN fetching the transcripts as NDJSON
+    result = cli_runner.invoke(
+        root,
+        ["--database", popexist_db.uri, "db", "transcripts", "--sample-id", "sample", "--ndjson"],
+    )
+    # THEN each line should be a transcript
+    assert result.exit_code == 0
+    lines = result.output.strip().split("\n")
+    assert len(lines) == 9
+    for line in lines:
+        transcript = json.loads(line)
+        assert transcript["sample_id"] == "sample"
+        # incomplete exons are decoded, not the raw packed bytes
+        assert "_packed_exons" not in transcript
+        assert isinstance(transcript["incomplete_exons"], list)
+
+
+def test_remove_without_generation_table(cli_runner, popexist_db):
+    # GIVEN a database that hasn't been migrated to the generation table
+    with popexist_db.engine.begin() as connection:
+        connection.execute(text("DROP TABLE generation"))
+    # WHEN removing a sample
+    result = cli_runner.invoke(root, ["--database", popexist_db.uri, "db", "remove", "sample"])
+    # THEN the sample should be removed without an error
+    assert result.exit_code == 0
+    assert popexist_db.fetch_samples(sample_id="sample").first() is None
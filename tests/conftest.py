@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import codecs
 import os
+import threading
 from functools import partial
 
 import pytest
@@ -10,6 +11,7 @@ from chanjo.cli import root
 from chanjo.load.link import link_elements
 from chanjo.load.parse import bed, sambamba
 from chanjo.load.sambamba import load_transcripts
+from chanjo.server import make_server
 from chanjo.store.api import ChanjoDB
 
 
@@ -66,6 +68,16 @@ def populated_db(chanjo_db, exon_lines):
     yield chanjo_db
 
 
+@pytest.fixture(scope="function")
+def server_url(popexist_db):
+    server = make_server(popexist_db)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://{}:{}".format(*server.server_address[:2])
+    server.shutdown()
+    server.server_close()
+
+
 @pytest.fixture
 def exon_lines(sambamba_path):
     with codecs.open(sambamba_path, "r", encoding="utf-8") as stream:
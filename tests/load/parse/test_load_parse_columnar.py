@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from chanjo.exc import BedFormattingError
+
+columnar = pytest.importorskip("chanjo.load.parse.columnar")
+
+
+def test_depth_output(exon_lines):
+    # GIVEN sambamba depth output lines
+    # WHEN parsing them into column arrays
+    columns = columnar.depth_output(exon_lines)
+    # THEN each exon should be one array element
+    assert len(columns.start) == len(exon_lines) - 1
+    assert columns.chroms[columns.chrom[0]] == "1"
+    assert sorted(columns.thresholds) == [10, 20, 100]
+    assert columns.sample_name == "ADM992A10"
+    # ... and exons shared by several transcripts should be paired with each
+    assert len(columns.transcripts) == 9
+    assert len(columns.pair_row) > len(columns.start)
+
+
+def test_depth_output_malformed():
+    exon_lines = ["# chrom chromStart chromEnd\n", "1 10 100\n"]
+    with pytest.raises(BedFormattingError):
+        columnar.depth_output(exon_lines)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from chanjo.load import batch
+
+
+def test_read_manifest(sambamba_path):
+    # GIVEN a manifest with one sample and missing optional columns
+    lines = ["path\tsample\tgroup\n", "{}\tADM1\tfamily\n".format(sambamba_path)]
+    # WHEN parsing the manifest
+    jobs = list(batch.read_manifest(lines))
+    # THEN one job should be generated
+    assert len(jobs) == 1
+    assert jobs[0].path == sambamba_path
+    assert jobs[0].sample_id == "ADM1"
+    assert jobs[0].group_id == "family"
+    assert jobs[0].name is None
+
+
+def test_process_jobs(sambamba_path, tmpdir):
+    # GIVEN one valid and one malformed Sambamba output
+    bad_path = tmpdir.join("bad.bed")
+    bad_path.write("not\ta\tsambamba\tfile\n")
+    jobs = [
+        batch.Job(sambamba_path, "sample", "group", None, None),
+        batch.Job(str(bad_path), "bad", "group", None, None),
+    ]
+    # WHEN processing them in a pool of workers
+    results = {result.job.sample_id: result for result in batch.process_jobs(jobs, processes=2)}
+    # THEN the valid sample should be aggregated
+    assert len(results["sample"].stats) == 9
+    assert results["sample"].error is None
+    # ... and the malformed one should report an error
+    assert results["bad"].stats is None
+    assert results["bad"].error
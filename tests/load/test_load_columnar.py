@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from chanjo.load import sambamba
+
+columnar = pytest.importorskip("chanjo.load.columnar")
+
+
+def test_load_transcripts(exon_lines):
+    # GIVEN sambamba depth output lines
+    # WHEN loading transcript stats from column arrays
+    result = columnar.load_transcripts(exon_lines, sample_id="sample", group_id="group")
+    # THEN the sample and all transcripts should be picked up
+    assert result.count == 9
+    assert result.sample.id == "sample"
+    assert len(list(result.models)) == 9
+
+
+def test_tx_stats_matches_tx_stat(exon_lines):
+    # GIVEN the same input aggregated per exon dict and per column array
+    expected = dict(sambamba.load_transcripts(exon_lines, threshold=100).stats)
+    # WHEN aggregating over column arrays
+    stats = dict(columnar.load_transcripts(exon_lines, threshold=100).stats)
+    # THEN the results should be identical
+    assert list(stats) == list(expected)
+    for tx_id, fields in stats.items():
+        assert fields.keys() == expected[tx_id].keys()
+        assert fields["incomplete_exons"] == expected[tx_id]["incomplete_exons"]
+        for key in ["mean_coverage", "completeness_10", "completeness_100"]:
+            assert fields[key] == pytest.approx(expected[tx_id][key])
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+import pytest
+
+from chanjo.exc import BedFormattingError
 from chanjo.load import sambamba
-from chanjo.store.models import TranscriptStat
+from chanjo.store.models import Exon, TranscriptStat
 
 
 def test_load_transcripts(exon_lines):
@@ -28,3 +31,66 @@ def test_load_transcripts_with_threshold(exon_lines):
     # THEN some transcripts will have incomplete exons linked
     incompletes = [transcript for transcript in result.models if transcript.incomplete_exons]
     assert len(incompletes) > 0
+
+
+def test_load_transcripts_stream(exon_lines):
+    # GIVEN sambamba depth output lines sorted by position
+    # WHEN streaming transcript stats
+    result = sambamba.load_transcripts(exon_lines, stream=True, window=100000)
+    # THEN the count is unknown up front but all transcripts are emitted
+    assert result.count is None
+    assert result.sample.id == "ADM992A10"
+    expected = dict(sambamba.load_transcripts(exon_lines).stats)
+    assert dict(result.stats) == expected
+
+
+def test_tx_stat_custom_levels():
+    # GIVEN exons with a completeness level outside the default columns
+    exons = [
+        {
+            "chrom": "1",
+            "chromStart": 0,
+            "chromEnd": 100,
+            "meanCoverage": 20.0,
+            "thresholds": {10: 100.0, 30: 50.0},
+        },
+        {
+            "chrom": "1",
+            "chromStart": 200,
+            "chromEnd": 500,
+            "meanCoverage": 40.0,
+            "thresholds": {10: 100.0, 30: 100.0},
+        },
+    ]
+    # WHEN aggregating with a threshold at that level
+    fields = sambamba.tx_stat("NM_152486", exons, threshold=30)
+    # THEN every level should be kept, only defaults get their own column
+    assert fields["completeness"] == {"10": 100.0, "30": 87.5}
+    assert fields["completeness_10"] == 100.0
+    assert "completeness_30" not in fields
+    assert fields["mean_coverage"] == 35.0
+    assert fields["incomplete_exons"] == [Exon("1", 0, 100, 50.0)]
+
+
+def test_load_transcripts_thresholds(exon_lines):
+    # GIVEN sambamba output with completeness at 10x, 20x and 100x
+    # WHEN loading transcript stats
+    result = sambamba.load_transcripts(exon_lines)
+    # THEN the sample should record the levels
+    assert result.sample.thresholds == [10, 20, 100]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("header", [False, True])
+def test_load_transcripts_empty(exon_lines, stream, header):
+    # GIVEN Sambamba output without exons and a sample id
+    lines = exon_lines[:1] if header else []
+    # WHEN loading transcripts
+    result = sambamba.load_transcripts(lines, sample_id="sample", stream=stream)
+    # THEN nothing should be loaded for the sample
+    assert result.sample.id == "sample"
+    assert list(result.models) == []
+    # WHEN there's no sample id to fall back on
+    # THEN it should be reported as malformed input
+    with pytest.raises(BedFormattingError):
+        sambamba.load_transcripts(lines, stream=stream)
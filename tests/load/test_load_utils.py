@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
+import pytest
+
+from chanjo.exc import BedFormattingError
 from chanjo.load import utils
+from chanjo.load.parse import sambamba
 
 
 def test_groupby_tx(bed_exons, sambamba_exons):
@@ -9,3 +13,36 @@ def test_groupby_tx(bed_exons, sambamba_exons):
     # GIVEN sambamba lines
     transcripts = list(utils.groupby_tx(sambamba_exons, sambamba=True))
     assert len(transcripts) == 9
+
+
+def test_stream_tx(exon_lines):
+    # GIVEN sambamba lines with the exons of each transcript on consecutive rows
+    exons = sambamba.depth_output(exon_lines[:18])
+    # WHEN streaming transcripts
+    transcripts = list(utils.stream_tx(exons, sambamba=True))
+    # THEN all transcripts should be emitted once with all their exons
+    tx_ids = [tx_id for tx_id, _ in transcripts]
+    assert len(tx_ids) == len(set(tx_ids)) == 5
+    assert len(dict(transcripts)["NM_152486"]) == 13
+
+
+def test_stream_tx_window(exon_lines):
+    # GIVEN sambamba lines sorted by position
+    exons = sambamba.depth_output(exon_lines)
+    # WHEN streaming transcripts with a window larger than any intron
+    transcripts = dict(utils.stream_tx(exons, sambamba=True, window=100000))
+    # THEN transcripts should be grouped the same as without streaming
+    expected = utils.groupby_tx(sambamba.depth_output(exon_lines), sambamba=True)
+    assert {tx_id: len(exons) for tx_id, exons in transcripts.items()} == {
+        tx_id: len(exons) for tx_id, exons in expected.items()
+    }
+
+
+def test_stream_tx_unsorted(exon_lines):
+    # GIVEN sambamba lines where a transcript is split up
+    exon_lines = exon_lines[:4] + exon_lines[5:] + exon_lines[4:5]
+    exons = sambamba.depth_output(exon_lines)
+    # WHEN streaming transcripts
+    # THEN it should fail when the transcript turns up again
+    with pytest.raises(BedFormattingError):
+        list(utils.stream_tx(exons, sambamba=True))
@@ -5,10 +5,13 @@ Tests for store
 from datetime import datetime
 
 import pytest
+from sqlalchemy import func, select, text
 from sqlalchemy.exc import IntegrityError
 
+from chanjo.load.sambamba import load_transcripts
 from chanjo.store.api import ChanjoDB
-from chanjo.store.models import Sample, TranscriptStat
+from chanjo.store.migrations import convert_incomplete_exons
+from chanjo.store.models import BASE, Exon, GeneStat, Sample, SampleSummary, TranscriptStat
 
 
 def test_dialect(chanjo_db):
@@ -133,3 +136,141 @@ def test_delete_group(populated_db):
 
     # THEN that sample and all its transcripts are deleted from the database
     assert len(list(store.fetch_samples(group_id=group_id))) == 0
+
+
+def test_add_transcript_stats(chanjo_db, exon_lines):
+    # GIVEN raw transcript stats for a new sample
+    result = load_transcripts(exon_lines, sample_id="sample", group_id="group")
+
+    # WHEN bulk inserting them in small batches
+    total = chanjo_db.add_transcript_stats(result.sample, result.stats, batch_size=2)
+
+    # THEN the sample and all its transcript stats are stored
+    assert total == result.count
+    with chanjo_db.begin() as session:
+        assert session.first(Sample.select()).id == "sample"
+        stats = session.all(TranscriptStat.select())
+        assert len(stats) == result.count
+        assert all(stat.sample_id == "sample" for stat in stats)
+
+
+def test_migrate(existing_db):
+    # GIVEN a database created before the "sex" column existed
+    with existing_db.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE sample DROP COLUMN sex"))
+    # WHEN migrating it
+    added = existing_db.migrate()
+    # THEN the column should be added back, and only once
+    assert added == ["sample.sex"]
+    assert existing_db.migrate() == []
+    with existing_db.begin() as session:
+        session.add(Sample(id="sample", sex="male"))
+
+
+def test_migrate_completeness(popexist_db):
+    # GIVEN a database loaded before completeness was stored per level
+    with popexist_db.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE transcript_stat DROP COLUMN completeness"))
+        connection.execute(text("ALTER TABLE sample DROP COLUMN thresholds"))
+    # WHEN migrating it
+    popexist_db.migrate()
+    # THEN the new columns should be filled in from the fixed columns
+    with popexist_db.begin() as session:
+        assert session.get(Sample, "sample").thresholds == [10, 15, 20, 50, 100]
+        stat = session.first(TranscriptStat.select())
+        assert stat.completeness["10"] == stat.completeness_10
+        assert stat.completeness["100"] == stat.completeness_100
+
+
+def test_migrate_incomplete_exons(existing_db):
+    # GIVEN a transcript stat with incomplete exons in the legacy text column
+    with existing_db.begin() as session:
+        session.add(Sample(id="sample"))
+        session.flush()
+        session.add(
+            TranscriptStat(
+                sample_id="sample",
+                transcript_id="NM_1",
+                mean_coverage=10.0,
+                _incomplete_exons="1|10|100|99.1",
+            )
+        )
+    with existing_db.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE transcript_stat DROP COLUMN _packed_exons"))
+    # WHEN migrating the database
+    existing_db.migrate()
+    # THEN the exons should be converted to the binary encoding
+    with existing_db.begin() as session:
+        stat = session.first(TranscriptStat.select())
+        assert stat._incomplete_exons is None
+        assert list(stat.incomplete_exons) == [Exon("1", 10, 100, 99.1)]
+
+
+def test_convert_incomplete_exons_in_pages(existing_db):
+    # GIVEN transcript stats with legacy incomplete exons
+    with existing_db.begin() as session:
+        session.add(Sample(id="sample"))
+        session.flush()
+        for index in range(5):
+            session.add(
+                TranscriptStat(
+                    sample_id="sample",
+                    transcript_id="NM_{}".format(index),
+                    mean_coverage=10.0,
+                    _incomplete_exons="1|{}|100|99.1".format(index),
+                )
+            )
+    # WHEN converting them two at a time
+    with existing_db.engine.begin() as connection:
+        assert convert_incomplete_exons(connection, batch_size=2) == 5
+    # THEN every row should be converted
+    with existing_db.begin() as session:
+        stats = session.all(TranscriptStat.select().order_by(TranscriptStat.transcript_id))
+        assert [list(stat.incomplete_exons)[0].start for stat in stats] == [0, 1, 2, 3, 4]
+        assert all(stat._incomplete_exons is None for stat in stats)
+
+
+def test_migrate_summaries(popexist_db):
+    # GIVEN a loaded database from before the summary tables
+    with popexist_db.engine.begin() as connection:
+        connection.execute(text("DROP TABLE sample_summary"))
+        connection.execute(text("DROP TABLE gene_stat"))
+    # WHEN migrating it
+    popexist_db.migrate()
+    # THEN the summaries should be built
+    assert len(popexist_db.mean().all()) == 1
+
+
+def test_delete_group_rows(populated_db):
+    # GIVEN a populated database with another group
+    store = populated_db
+    with store.begin() as session:
+        session.add(Sample(id="other", group_id="other"))
+    store.refresh_summaries()
+
+    # WHEN deleting a group
+    store.delete_group(group_id="group")
+
+    # THEN no transcript stats or summaries are left behind for its samples
+    with store.begin() as session:
+        assert session.query(TranscriptStat).count() == 0
+        assert session.query(SampleSummary).count() == 0
+        assert session.query(GeneStat).count() == 0
+        assert [sample.id for sample in session.all(Sample.select())] == ["other"]
+    # ... and a missing sample is reported
+    assert store.delete_sample(sample_id="sample") is False
+
+
+def test_delete_sample_every_table(popexist_db):
+    # GIVEN a sample with rows in every table that has a "sample_id" column
+    popexist_db.add_panel("panel", [28706])
+    tables = [table for table in BASE.metadata.sorted_tables if "sample_id" in table.c]
+    with popexist_db.begin() as session:
+        for table in tables:
+            assert session.execute(select(func.count()).select_from(table)).scalar() > 0, table
+    # WHEN deleting the sample
+    popexist_db.delete_sample("sample")
+    # THEN none of its rows should be left behind
+    with popexist_db.begin() as session:
+        for table in tables:
+            assert session.execute(select(func.count()).select_from(table)).scalar() == 0, table
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from chanjo.store.async_api import AsyncChanjoDB, async_uri
+
+pytest.importorskip("aiosqlite")
+
+GENE_IDS = [14825, 28706, 31275]
+
+
+def run(popexist_db, method, *args, **kwargs):
+    """Call a method on an async store for the database and wait for it."""
+
+    async def call():
+        async_db = AsyncChanjoDB(popexist_db.uri)
+        try:
+            return await getattr(async_db, method)(*args, **kwargs)
+        finally:
+            await async_db.close()
+
+    return asyncio.run(call())
+
+
+def test_async_uri(tmp_path):
+    # GIVEN database paths and URIs
+    # THEN they should use async drivers
+    db_path = tmp_path.joinpath("coverage.sqlite3")
+    assert async_uri(str(db_path)) == "sqlite+aiosqlite:///{}".format(db_path)
+    assert async_uri("sqlite://") == "sqlite+aiosqlite://"
+    assert async_uri("mysql+pymysql://user@host/db") == "mysql+asyncmy://user@host/db"
+    assert async_uri("postgresql+asyncpg://host/db") == "postgresql+asyncpg://host/db"
+
+
+@pytest.mark.parametrize("summary", [True, False])
+def test_mean(popexist_db, summary):
+    # GIVEN a database with one sample
+    # WHEN calculating mean values asynchronously
+    rows = run(popexist_db, "mean", summary=summary)
+    # THEN they should match the sync store
+    assert [tuple(row) for row in rows] == [tuple(row) for row in popexist_db.mean(summary=summary)]
+
+
+def test_gene_metrics(popexist_db):
+    # GIVEN a database with one sample
+    # WHEN calculating gene metrics asynchronously
+    rows = run(popexist_db, "gene_metrics", 28706, weighted=True)
+    # THEN they should match the sync store
+    assert [tuple(row) for row in rows] == [
+        tuple(row) for row in popexist_db.gene_metrics(28706, weighted=True)
+    ]
+
+
+@pytest.mark.parametrize("summary", [True, False])
+def test_sample_coverage(popexist_db, summary):
+    # GIVEN a database with one sample
+    # WHEN calculating coverage asynchronously
+    data = run(popexist_db, "sample_coverage", ["sample"], GENE_IDS, summary=summary)
+    # THEN it should match the sync store
+    assert data == popexist_db.sample_coverage(["sample"], GENE_IDS, summary=summary)
+
+
+def test_sample_coverage_long_gene_list(popexist_db):
+    # GIVEN more genes than are inlined in the query
+    genes = GENE_IDS + list(range(100000, 101000))
+    # WHEN calculating coverage asynchronously
+    data = run(popexist_db, "sample_coverage", ["sample"], genes)
+    # THEN the temporary gene table should work the same
+    assert data == popexist_db.sample_coverage(["sample"], GENE_IDS)
+
+
+def test_concurrent_coverage(popexist_db):
+    # GIVEN an async store
+    async def reports():
+        async_db = AsyncChanjoDB(popexist_db.uri)
+        try:
+            calls = [async_db.sample_coverage(["sample"], [gene_id]) for gene_id in GENE_IDS * 5]
+            return await asyncio.gather(*calls)
+        finally:
+            await async_db.close()
+
+    # WHEN running many coverage queries at once
+    results = asyncio.run(reports())
+    # THEN each should get its own result
+    assert results[:3] == [
+        popexist_db.sample_coverage(["sample"], [gene_id]) for gene_id in GENE_IDS
+    ]
+    assert results[3:6] == results[:3]
+
+
+def test_fetch(popexist_db):
+    # GIVEN a database with one sample
+    # WHEN fetching samples and transcripts asynchronously
+    samples = run(popexist_db, "fetch_samples", group_id="group")
+    transcripts = run(popexist_db, "fetch_transcripts", "sample")
+    # THEN the models should be returned
+    assert [sample.id for sample in samples] == ["sample"]
+    assert len(transcripts) == 9
+    assert all(stat.sample_id == "sample" for stat in transcripts)
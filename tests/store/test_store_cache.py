@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+from sqlalchemy import text
+
+from chanjo.load.sambamba import load_transcripts
+from chanjo.store.cache import (
+    DiskCache,
+    MemoryCache,
+    ResultCache,
+    bump_generation,
+    cache_key,
+    current_generation,
+)
+
+GENE_IDS = [14825, 28706, 31275]
+
+
+def test_cache_key():
+    # WHEN hashing the same samples and genes in different order
+    key = cache_key("sample_coverage", frozenset(["a", "b"]), frozenset([1, 2]), 10)
+    other = cache_key("sample_coverage", frozenset(["b", "a"]), frozenset([2, 1]), 10)
+    # THEN the keys should be the same
+    assert key == other
+    # ... but differ for another level
+    assert key != cache_key("sample_coverage", frozenset(["a", "b"]), frozenset([1, 2]), 20)
+
+
+def test_generation(chanjo_db):
+    # GIVEN an empty database
+    with chanjo_db.begin() as session:
+        assert current_generation(session) == 0
+        # WHEN bumping the generation twice
+        bump_generation(session)
+        bump_generation(session)
+    # THEN the counter should follow
+    with chanjo_db.begin() as session:
+        assert current_generation(session) == 2
+
+
+def test_memory_cache_lru():
+    # GIVEN a cache for two results
+    cache = MemoryCache(maxsize=2)
+    cache.set(1, "a", {"value": 1})
+    cache.set(1, "b", {"value": 2})
+    # WHEN using the first and adding a third result
+    assert cache.get(1, "a") == {"value": 1}
+    cache.set(1, "c", {"value": 3})
+    # THEN the least recently used result should be evicted
+    assert cache.get(1, "b") is None
+    assert len(cache) == 2
+    # WHEN pruning another generation
+    cache.prune(2)
+    # THEN all results should be gone
+    assert len(cache) == 0
+
+
+def test_sample_coverage_cached(populated_db):
+    # GIVEN a store with a result cache
+    populated_db.result_cache = ResultCache()
+    sample_ids = ["sample", "sample2"]
+    # WHEN calculating the same coverage twice, in another order
+    first = populated_db.sample_coverage(sample_ids, genes=GENE_IDS)
+    second = populated_db.sample_coverage(sample_ids[::-1], genes=GENE_IDS[::-1])
+    # THEN the second call should be answered from the cache
+    assert first == second
+    assert populated_db.result_cache.stats()["hits"] == 1
+    assert populated_db.result_cache.stats()["misses"] == 1
+    # ... and changing a result shouldn't change the cache
+    second["sample"]["mean_coverage"] = 0
+    assert populated_db.sample_coverage(sample_ids, genes=GENE_IDS) == first
+
+
+def test_cache_invalidated(populated_db, exon_lines):
+    # GIVEN a cached coverage calculation
+    populated_db.result_cache = ResultCache()
+    assert set(populated_db.sample_coverage(["sample", "new"], genes=GENE_IDS)) == {"sample"}
+    # WHEN loading another sample
+    result = load_transcripts(exon_lines, sample_id="new", group_id="group")
+    populated_db.add_transcript_stats(result.sample, result.stats)
+    # THEN the calculation should be repeated
+    assert set(populated_db.sample_coverage(["sample", "new"], genes=GENE_IDS)) == {"sample", "new"}
+    # WHEN deleting the sample
+    populated_db.delete_sample("new")
+    # THEN the cached result should not be used either
+    assert set(populated_db.sample_coverage(["sample", "new"], genes=GENE_IDS)) == {"sample"}
+    assert populated_db.result_cache.stats()["hits"] == 0
+    assert populated_db.result_cache.stats()["misses"] == 3
+
+
+def test_disk_cache(populated_db, tmp_path):
+    # GIVEN a result calculated with an on-disk cache
+    populated_db.result_cache = ResultCache(DiskCache(tmp_path))
+    result = populated_db.sample_coverage(["sample"], genes=GENE_IDS)
+    # WHEN calculating again with a new cache on the same directory
+    populated_db.result_cache = ResultCache(DiskCache(tmp_path))
+    # THEN the stored result should be used
+    assert populated_db.sample_coverage(["sample"], genes=GENE_IDS) == result
+    assert populated_db.result_cache.stats() == {
+        "hits": 1,
+        "misses": 0,
+        "size": 1,
+        "generation": populated_db.result_cache.generation,
+    }
+    # WHEN adding a panel
+    populated_db.add_panel("panel", GENE_IDS)
+    populated_db.sample_coverage(["sample"], genes=GENE_IDS)
+    # THEN the results of the old generation should be removed
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_without_generation_table(popexist_db, exon_lines):
+    # GIVEN a database from before the generation table
+    with popexist_db.engine.begin() as connection:
+        connection.execute(text("DROP TABLE generation"))
+    popexist_db.engine.dispose()
+    popexist_db.result_cache = ResultCache()
+    # WHEN loading and deleting samples
+    result = load_transcripts(exon_lines, sample_id="new", group_id="group")
+    popexist_db.add_transcript_stats(result.sample, result.stats)
+    assert popexist_db.delete_sample("new") is True
+    # THEN results should be calculated without caching
+    popexist_db.sample_coverage(["sample"], genes=GENE_IDS)
+    popexist_db.sample_coverage(["sample"], genes=GENE_IDS)
+    assert popexist_db.result_cache.stats()["size"] == 0
+    # WHEN migrating the database
+    popexist_db.migrate()
+    # THEN the counter should be created, starting from zero
+    with popexist_db.begin() as session:
+        assert current_generation(session) == 0
+
+
+def test_migrate_seeds_generation(existing_db):
+    # GIVEN a generation table without its row
+    with existing_db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM generation"))
+    # WHEN migrating the database
+    existing_db.migrate()
+    # THEN the row should be inserted, so writers only need to update it
+    with existing_db.begin() as session:
+        bump_generation(session)
+    with existing_db.begin() as session:
+        assert current_generation(session) == 1
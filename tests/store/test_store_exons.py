@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from chanjo.store.exons import Exon, ExonView, pack_exons
+
+
+def test_pack_exons():
+    # GIVEN incomplete exons across two chromosomes
+    exons = [Exon("X", 10, 100, 99.1), Exon("Y", 200, 300, 80.5), Exon("X", 400, 450, 12.0)]
+    # WHEN packing and viewing them
+    view = ExonView(pack_exons(exons))
+    # THEN they should round-trip exactly
+    assert len(view) == 3
+    assert list(view) == exons
+    assert view[-1] == exons[-1]
+    assert view[1:] == exons[1:]
+    # ... and columns should be accessible without building tuples
+    assert view.chromosomes == ["X", "Y"]
+    assert list(view.codes) == [0, 1, 0]
+    assert view.starts.tolist() == [10, 200, 400]
+    assert view.completeness.tolist() == [99.1, 80.5, 12.0]
+
+
+def test_pack_exons_empty():
+    # GIVEN no incomplete exons
+    # WHEN packing them
+    # THEN nothing should be stored
+    assert pack_exons([]) is None
+    assert len(ExonView(None)) == 0
+    assert not ExonView(None)
+    assert list(ExonView(None)) == []
+
+
+def test_exon_view_numpy():
+    np = pytest.importorskip("numpy")
+    # GIVEN packed exons
+    view = ExonView(pack_exons([Exon("1", 10, 100, 90.0), Exon("1", 150, 200, 50.0)]))
+    # WHEN reading the columns as NumPy arrays
+    arrays = view.to_numpy()
+    # THEN they should hold the exon values
+    assert arrays["ends"].tolist() == [100, 200]
+    assert np.allclose(arrays["completeness"], [90.0, 50.0])
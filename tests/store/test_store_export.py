@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from chanjo.store.export import NULL_PARTITION, partition_path
+from chanjo.store.models import Sample
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_coverage_batches(populated_db):
+    # GIVEN a database with two samples
+    # WHEN streaming transcript stats in small batches
+    batches = list(populated_db.coverage_batches(batch_size=4))
+    # THEN all rows should be returned as record batches
+    assert all(batch.num_rows <= 4 for batch in batches)
+    table = pa.Table.from_batches(batches)
+    assert table.num_rows == 18
+    assert set(table.column("sample_id").to_pylist()) == {"sample", "sample2"}
+    assert table.column("gene_id").null_count == 0
+
+
+def test_export_parquet(populated_db, tmp_path):
+    # GIVEN a database with two samples
+    out_path = tmp_path.joinpath("coverage.parquet")
+    # WHEN exporting one sample to a single file
+    written = populated_db.export_coverage(out_path, sample_ids=["sample"])
+    # THEN the file should hold the transcript stats of the sample
+    assert written == {out_path: 9}
+    table = pq.read_table(out_path)
+    assert set(table.column("sample_id").to_pylist()) == {"sample"}
+    means = dict(populated_db.mean(sample_ids=["sample"]).all()[0]._mapping)
+    assert pa.compute.mean(table.column("mean_coverage")).as_py() == pytest.approx(
+        means["mean_coverage"]
+    )
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_export_partitioned(populated_db, tmp_path, file_format):
+    # GIVEN a database with two samples
+    # WHEN exporting partitioned by sample
+    written = populated_db.export_coverage(tmp_path, file_format=file_format, partition_by="sample")
+    # THEN there should be one partition per sample
+    assert sorted(path.parent.name for path in written) == ["sample_id=sample", "sample_id=sample2"]
+    # ... readable as a dataset
+    dataset = ds.dataset(tmp_path, format=file_format, partitioning="hive")
+    assert dataset.to_table().num_rows == 18
+
+
+@pytest.mark.parametrize("partition_by", ["sample", "group"])
+def test_export_partitioned_without_stats(populated_db, tmp_path, partition_by):
+    # GIVEN a sample in another group without any transcript stats
+    with populated_db.begin() as session:
+        session.add(Sample(id="empty", group_id="empty_group"))
+    # WHEN exporting partitioned
+    written = populated_db.export_coverage(tmp_path, partition_by=partition_by)
+    # THEN no empty partition should be written for it
+    assert all(count > 0 for count in written.values())
+    assert not any("empty" in path.parent.name for path in written)
+
+
+def test_partition_path(tmp_path):
+    # GIVEN partition values with path separators or missing values
+    # THEN they should be escaped
+    path = partition_path(tmp_path, "group_id", "a/b", "parquet")
+    assert path == tmp_path.joinpath("group_id=a%2Fb", "part-0.parquet")
+    assert partition_path(tmp_path, "group_id", None, "arrow").parent.name == (
+        "group_id=" + NULL_PARTITION
+    )
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Check that the calculate queries are planned with the covering indexes.
+
+Runs on SQLite, and on MySQL when "CHANJO_TEST_MYSQL_URI" is set.
+"""
+import os
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from chanjo.load.link import link_elements
+from chanjo.load.sambamba import load_transcripts
+from chanjo.store.api import ChanjoDB
+from chanjo.store.models import TranscriptStat
+
+
+@pytest.fixture(params=["sqlite", "mysql"])
+def indexed_db(request, exon_lines):
+    if request.param == "mysql":
+        uri = os.environ.get("CHANJO_TEST_MYSQL_URI")
+        if not uri:
+            pytest.skip("CHANJO_TEST_MYSQL_URI not set")
+    else:
+        uri = "sqlite://"
+    chanjo_db = ChanjoDB(uri)
+    chanjo_db.set_up()
+    with chanjo_db.begin() as session:
+        session.add_all(link_elements(exon_lines).models)
+    for sample_id in ["sample", "sample2"]:
+        result = load_transcripts(exon_lines, sample_id=sample_id)
+        chanjo_db.add_transcript_stats(result.sample, result.stats)
+    yield chanjo_db
+    chanjo_db.tear_down()
+
+
+def explain(chanjo_db, query):
+    """Return the plan of a query as a single string."""
+    engine = chanjo_db.engine
+    sql = str(
+        query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    )
+    with engine.connect() as connection:
+        if chanjo_db.dialect == "sqlite":
+            return " ".join(
+                row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)
+            )
+        rows = connection.exec_driver_sql("EXPLAIN " + sql).mappings()
+        return " ".join(str(row["key"]) for row in rows)
+
+
+def test_sample_coverage_uses_covering_indexes(indexed_db):
+    with indexed_db.begin() as session:
+        query = indexed_db.coverage_query(session, ["sample"], [14825, 28706], summary=False)
+        plan = explain(indexed_db, query)
+    assert "ix_transcript_stat_sample_covering" in plan
+    assert "ix_transcript_gene_covering" in plan
+
+
+def test_sample_coverage_summary_uses_covering_index(indexed_db):
+    with indexed_db.begin() as session:
+        query = indexed_db.coverage_query(session, ["sample"], [14825, 28706])
+        plan = explain(indexed_db, query)
+    # either covering index answers the query without the table
+    assert "ix_gene_stat_sample_covering" in plan or "ix_gene_stat_gene_covering" in plan
+
+
+def test_mean_uses_covering_index(indexed_db):
+    plan = explain(indexed_db, indexed_db.mean(summary=False))
+    assert "ix_transcript_stat_sample_covering" in plan
+
+
+def test_gene_metrics_uses_covering_indexes(indexed_db):
+    plan = explain(indexed_db, indexed_db.gene_metrics(14825, 28706, summary=False))
+    assert "ix_transcript_gene_covering" in plan
+    assert "ix_transcript_stat_transcript" in plan
+
+
+def test_gene_metrics_summary_uses_covering_index(indexed_db):
+    plan = explain(indexed_db, indexed_db.gene_metrics(14825, 28706))
+    assert "ix_gene_stat_gene_covering" in plan
+
+
+def test_fetch_transcripts_uses_sample_index(indexed_db):
+    plan = explain(indexed_db, indexed_db.fetch_transcripts(sample_id="sample"))
+    assert "ix_transcript_stat_sample_covering" in plan
+
+
+def test_migrate_creates_indexes(existing_db):
+    # GIVEN a database from before the covering indexes
+    with existing_db.engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_transcript_stat_sample_covering"))
+        connection.execute(text("DROP INDEX ix_transcript_stat_transcript"))
+    # WHEN migrating it
+    existing_db.migrate()
+    # THEN the indexes should be created again
+    indexes = inspect(existing_db.engine).get_indexes("transcript_stat")
+    names = [index["name"] for index in indexes]
+    assert "ix_transcript_stat_sample_covering" in names
+    assert "ix_transcript_stat_transcript" in names
+
+
+def test_one_stat_per_sample_and_transcript(indexed_db):
+    # GIVEN a loaded sample
+    # WHEN inserting another stat for one of its transcripts
+    row = dict(sample_id="sample", transcript_id="NM_152486", mean_coverage=1.0)
+    # THEN the unique index should reject it
+    with pytest.raises(IntegrityError):
+        with indexed_db.engine.begin() as connection:
+            connection.execute(TranscriptStat.__table__.insert(), [row])
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from chanjo.load.link import link_elements
+from chanjo.store.insert import make_row
+from chanjo.store.models import Exon, ExonView, Transcript
+
+
+def test_make_row():
+    # GIVEN raw stats with an incomplete exon and a missing completeness level
+    fields = {
+        "mean_coverage": 12.5,
+        "completeness_10": 90.0,
+        "incomplete_exons": [Exon("1", 10, 100, 90.0)],
+        "threshold": 10,
+    }
+    # WHEN composing a row for bulk inserts
+    row = make_row("sample", "NM_152486", fields)
+    # THEN it should cover every completeness column and serialize the exons
+    assert row["sample_id"] == "sample"
+    assert row["transcript_id"] == "NM_152486"
+    assert row["completeness_100"] is None
+    assert list(ExonView(row["_packed_exons"])) == [Exon("1", 10, 100, 90.0)]
+
+
+def test_link_transcripts_rollback(chanjo_db, exon_lines):
+    # GIVEN linked transcripts and an exon index with a broken row
+    result = link_elements(exon_lines)
+    exons = list(result.exons) + [{"chromosome": "1", "start": 1, "end": 2, "transcript_id": None}]
+    # WHEN linking fails while adding the exon index
+    with pytest.raises(IntegrityError):
+        chanjo_db.link_transcripts(result.models, exons)
+    # THEN no transcripts should be left without their exons
+    with chanjo_db.begin() as session:
+        assert session.query(Transcript).count() == 0
+    # WHEN linking valid elements
+    result = link_elements(exon_lines)
+    chanjo_db.link_transcripts(result.models, result.exons)
+    # THEN transcripts and exons should both be stored
+    assert chanjo_db.fetch_exon_index()
@@ -10,3 +10,24 @@ def test_TranscriptStat():
     parsed_exons = list(stat.incomplete_exons)
     # THEN should be the same
     assert parsed_exons == exons
+
+
+def test_TranscriptStat_legacy_exons():
+    # GIVEN a transcript stat stored with the text encoding
+    stat = TranscriptStat(mean_coverage=10.3, _incomplete_exons="1|10|100|99.1,1|200|300|80.5")
+    # WHEN accessing the incomplete exons
+    # THEN they should be parsed from the text column
+    assert stat.incomplete_exons == [Exon("1", 10, 100, 99.1), Exon("1", 200, 300, 80.5)]
+
+
+def test_TranscriptStat_to_dict():
+    # GIVEN a transcript stat with an incomplete exon
+    stat = TranscriptStat(mean_coverage=10.3, incomplete_exons=[Exon("1", 10, 100, 99.1)])
+    # WHEN serializing it
+    data = dict(stat)
+    # THEN the exons should be decoded and the raw columns left out
+    assert data["incomplete_exons"] == [
+        {"chrom": "1", "start": 10, "end": 100, "completeness": 99.1}
+    ]
+    assert "_packed_exons" not in data
+    assert "_incomplete_exons" not in data
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from chanjo.load.link import link_elements
+from chanjo.load.sambamba import load_transcripts
+from chanjo.store.models import GenePanelGene, PanelCoverage
+
+GENE_IDS = [14825, 28706, 31275]
+
+
+def test_add_panel(populated_db):
+    # GIVEN a database with two samples
+    # WHEN storing a gene panel
+    assert populated_db.add_panel("panel", GENE_IDS) == 3
+    # THEN the panel coverage should match calculating on the genes
+    sample_ids = ["sample", "sample2"]
+    panel = populated_db.sample_coverage(sample_ids=sample_ids, panel="panel")
+    live = populated_db.sample_coverage(sample_ids=sample_ids, genes=GENE_IDS, summary=False)
+    assert set(panel) == set(sample_ids)
+    for sample_id in sample_ids:
+        for key in ["mean_coverage", "mean_completeness"]:
+            assert panel[sample_id][key] == pytest.approx(live[sample_id][key])
+
+
+def test_panel_coverage_calculated(populated_db):
+    # GIVEN a stored panel
+    populated_db.add_panel("panel", GENE_IDS)
+    # WHEN calculating for a level or weighting without a summary column
+    panel = populated_db.sample_coverage(sample_ids=["sample"], panel="panel", weighted=True)
+    live = populated_db.sample_coverage(sample_ids=["sample"], genes=GENE_IDS, weighted=True)
+    # THEN the panel genes should be used
+    assert panel == live
+
+
+def test_panel_follows_load(chanjo_db, exon_lines):
+    # GIVEN a database with a panel but no samples
+    with chanjo_db.begin() as session:
+        session.add_all(link_elements(exon_lines).models)
+    chanjo_db.add_panel("panel", GENE_IDS)
+    # WHEN loading a sample
+    result = load_transcripts(exon_lines, sample_id="sample", group_id="group")
+    chanjo_db.add_transcript_stats(result.sample, result.stats)
+    # THEN panel coverage should be calculated for it
+    with chanjo_db.begin() as session:
+        assert session.get(PanelCoverage, ("sample", "panel")) is not None
+    # WHEN deleting the sample
+    chanjo_db.delete_sample(sample_id="sample")
+    # THEN the panel coverage should go with it
+    with chanjo_db.begin() as session:
+        assert session.query(PanelCoverage).count() == 0
+
+
+def test_replace_panel(populated_db):
+    # GIVEN a stored panel
+    populated_db.add_panel("panel", GENE_IDS)
+    # WHEN replacing it with a single gene
+    populated_db.add_panel("panel", [28706], replace=True)
+    # THEN only the new genes should be kept
+    assert populated_db.panel_genes("panel") == [28706]
+    panel = populated_db.sample_coverage(sample_ids=["sample"], panel="panel")
+    genes = populated_db.sample_coverage(sample_ids=["sample"], genes=[28706])
+    assert panel == genes
+
+
+def test_remove_panel(populated_db):
+    # GIVEN a stored panel
+    populated_db.add_panel("panel", GENE_IDS)
+    # WHEN removing it
+    assert populated_db.remove_panel("panel") is True
+    # THEN the genes and coverage should be gone
+    with populated_db.begin() as session:
+        assert session.query(GenePanelGene).count() == 0
+        assert session.query(PanelCoverage).count() == 0
+    assert populated_db.fetch_panels().all() == []
+    # ... and removing it again reports it missing
+    assert populated_db.remove_panel("panel") is False
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from chanjo.store.api import ChanjoDB
+from chanjo.store.parquet import ParquetStore, get_store, is_parquet_uri
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("duckdb")
+
+GENE_IDS = [14825, 28706, 31275]
+
+
+@pytest.fixture
+def parquet_store(populated_db, tmp_path):
+    populated_db.export_coverage(tmp_path, partition_by="sample")
+    store = ParquetStore(tmp_path)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_mean(populated_db, parquet_store, weighted):
+    # GIVEN the samples of a database exported to Parquet
+    # WHEN calculating mean metrics from the files
+    rows = parquet_store.mean(weighted=weighted)
+    # THEN they should match the SQL store
+    expected = sorted(populated_db.mean(summary=False, weighted=weighted).all())
+    assert [row[0] for row in rows] == [row[0] for row in expected]
+    for row, expected_row in zip(rows, expected):
+        assert list(row[1:]) == pytest.approx(list(expected_row[1:]), nan_ok=True)
+
+
+def test_mean_samples(parquet_store):
+    # GIVEN exported samples
+    # WHEN limiting to one sample and level
+    rows = parquet_store.mean(sample_ids=["sample2"], levels=[20])
+    # THEN only that sample and level should be returned
+    assert len(rows) == 1
+    assert rows[0][0] == "sample2"
+    assert len(rows[0]) == 3
+    # ... and levels that aren't exported are refused
+    with pytest.raises(ValueError):
+        parquet_store.mean(levels=[30])
+
+
+def test_gene_metrics(populated_db, parquet_store):
+    # GIVEN exported samples
+    # WHEN calculating gene metrics
+    rows = parquet_store.gene_metrics(28706)
+    # THEN they should match the SQL store
+    expected = sorted(populated_db.gene_metrics(28706, summary=False).all())
+    assert len(rows) == len(expected) == 2
+    for row, expected_row in zip(rows, expected):
+        assert list(row) == pytest.approx(list(expected_row), nan_ok=True)
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_sample_coverage(populated_db, parquet_store, weighted):
+    # GIVEN exported samples
+    sample_ids = ["sample", "sample2"]
+    # WHEN calculating coverage across genes
+    data = parquet_store.sample_coverage(sample_ids, genes=GENE_IDS, weighted=weighted)
+    # THEN it should match the SQL store
+    expected = populated_db.sample_coverage(
+        sample_ids, genes=GENE_IDS, summary=False, weighted=weighted
+    )
+    assert set(data) == set(expected)
+    for sample_id in sample_ids:
+        for key in ["mean_coverage", "mean_completeness"]:
+            assert data[sample_id][key] == pytest.approx(expected[sample_id][key])
+
+
+def test_fetch(parquet_store):
+    # GIVEN exported samples
+    # WHEN fetching samples and transcripts
+    samples = parquet_store.fetch_samples(group_id="group")
+    transcripts = parquet_store.fetch_transcripts("sample")
+    # THEN they should be read from the files
+    assert samples == [
+        {"id": "sample", "group_id": "group"},
+        {"id": "sample2", "group_id": "group"},
+    ]
+    assert len(transcripts) == 9
+    assert all(transcript["sample_id"] == "sample" for transcript in transcripts)
+
+
+def test_get_store(populated_db, tmp_path):
+    # GIVEN a Parquet export and a SQLite path
+    out_path = tmp_path.joinpath("coverage.parquet")
+    populated_db.export_coverage(out_path)
+    # THEN the store should be picked from the URI
+    assert is_parquet_uri(str(out_path))
+    assert is_parquet_uri("parquet://{}".format(tmp_path))
+    assert not is_parquet_uri("sqlite://")
+    store = get_store("parquet://{}".format(out_path))
+    assert isinstance(store, ParquetStore)
+    assert len(store.fetch_samples()) == 2
+    assert isinstance(get_store(str(tmp_path.joinpath("coverage.sqlite3"))), ChanjoDB)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sqlalchemy import text
+
+from chanjo.load.sambamba import load_transcripts
+from chanjo.store.api import ChanjoDB
+from chanjo.store.models import Transcript, TranscriptStat
+from chanjo.store.profiles import PROFILES, resolve_profile
+
+
+def pragma(chanjo_db, name):
+    with chanjo_db.engine.connect() as connection:
+        return connection.execute(text("PRAGMA {}".format(name))).scalar()
+
+
+def test_default_profile(tmp_path):
+    # GIVEN a SQLite database without a profile
+    chanjo_db = ChanjoDB(str(tmp_path / "coverage.sqlite3"))
+    # THEN SQLite defaults should be used
+    assert pragma(chanjo_db, "journal_mode") == "delete"
+    assert pragma(chanjo_db, "synchronous") == 2  # FULL
+
+
+def test_bulk_profile(tmp_path):
+    # GIVEN a SQLite database opened for bulk loads
+    chanjo_db = ChanjoDB(str(tmp_path / "coverage.sqlite3"), profile="bulk")
+    chanjo_db.set_up()
+    # THEN each connection should use WAL with fewer fsyncs
+    assert pragma(chanjo_db, "journal_mode") == "wal"
+    assert pragma(chanjo_db, "synchronous") == 1  # NORMAL
+    assert pragma(chanjo_db, "cache_size") == PROFILES["bulk"]["pragmas"]["cache_size"]
+    assert pragma(chanjo_db, "foreign_keys") == 1
+
+
+def test_read_profile_overrides(tmp_path):
+    # GIVEN a SQLite database opened for reads with an override
+    chanjo_db = ChanjoDB(
+        str(tmp_path / "coverage.sqlite3"), profile="read", pragmas={"cache_size": -1000}
+    )
+    # THEN the override should replace the profile value
+    assert pragma(chanjo_db, "cache_size") == -1000
+    assert pragma(chanjo_db, "foreign_keys") == 1
+
+
+def test_resolve_profile():
+    # WHEN resolving a profile with pool overrides
+    pragmas, pool = resolve_profile("read", pool={"pool_size": 3})
+    # THEN the overrides should be merged into the profile
+    assert pragmas == PROFILES["read"]["pragmas"]
+    assert pool["pool_size"] == 3
+    assert pool["max_overflow"] == PROFILES["read"]["pool"]["max_overflow"]
+    # ... and unknown profiles rejected
+    with pytest.raises(ValueError):
+        resolve_profile("fast")
+
+
+def test_bulk_profile_skips_unlinked(tmp_path, exon_lines, caplog):
+    # GIVEN a database enforcing foreign keys with one linked transcript
+    chanjo_db = ChanjoDB(str(tmp_path / "coverage.sqlite3"), profile="bulk")
+    chanjo_db.set_up()
+    with chanjo_db.begin() as session:
+        session.add(Transcript(id="NM_152486", gene_id=28706, chromosome="1", length=2553))
+    # WHEN loading a sample
+    result = load_transcripts(exon_lines, sample_id="sample")
+    count = chanjo_db.add_transcript_stats(result.sample, result.stats)
+    # THEN only the stats of the linked transcript should be stored
+    assert count == 1
+    assert "not linked" in caplog.text
+    # ... and deleting the sample should cascade
+    chanjo_db.delete_sample("sample")
+    with chanjo_db.begin() as session:
+        assert session.query(TranscriptStat).count() == 0
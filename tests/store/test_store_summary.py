@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import pytest
+from sqlalchemy import delete
+
+from chanjo.load.link import link_elements
+from chanjo.load.sambamba import load_transcripts
+from chanjo.store.models import GeneStat, SampleSummary, TranscriptStat
+
+
+def test_refresh_summaries(populated_db):
+    # GIVEN a database with summaries for two samples
+    # WHEN comparing summary reads with calculating from transcript stats
+    summary = sorted(populated_db.mean().all())
+    live = sorted(populated_db.mean(summary=False).all())
+    # THEN they should agree
+    assert len(summary) == 2
+    for summary_row, live_row in zip(summary, live):
+        assert summary_row[0] == live_row[0]
+        assert list(summary_row[1:]) == pytest.approx(list(live_row[1:]), nan_ok=True)
+
+
+def test_gene_metrics_summary(populated_db):
+    # GIVEN a database with summaries
+    # WHEN calculating gene metrics from the "gene_stat" table
+    summary = sorted(populated_db.gene_metrics(28706).all())
+    live = sorted(populated_db.gene_metrics(28706, summary=False).all())
+    # THEN the rows should match a live calculation
+    assert len(summary) == len(live) == 2
+    for summary_row, live_row in zip(summary, live):
+        assert list(summary_row) == pytest.approx(list(live_row), nan_ok=True)
+
+
+def test_sample_coverage_summary(populated_db):
+    # GIVEN genes with different numbers of transcripts
+    gene_ids = [14825, 28706, 31275]
+    # WHEN averaging from per gene summaries
+    summary = populated_db.sample_coverage(sample_ids=["sample"], genes=gene_ids)
+    live = populated_db.sample_coverage(sample_ids=["sample"], genes=gene_ids, summary=False)
+    # THEN it should be weighted to an average across transcripts
+    for key in ["mean_coverage", "mean_completeness"]:
+        assert summary["sample"][key] == pytest.approx(live["sample"][key])
+
+
+def test_summaries_follow_load_and_delete(chanjo_db, exon_lines):
+    # GIVEN a database with linked transcripts
+    with chanjo_db.begin() as session:
+        session.add_all(link_elements(exon_lines).models)
+    # WHEN bulk loading a sample
+    result = load_transcripts(exon_lines, sample_id="sample", group_id="group")
+    chanjo_db.add_transcript_stats(result.sample, result.stats)
+    # THEN summaries should be added
+    with chanjo_db.begin() as session:
+        assert session.get(SampleSummary, "sample").transcript_count == 9
+        assert session.query(GeneStat).count() > 0
+    # WHEN deleting the group
+    chanjo_db.delete_group(group_id="group")
+    # THEN summaries should be removed
+    with chanjo_db.begin() as session:
+        assert session.query(SampleSummary).count() == 0
+        assert session.query(GeneStat).count() == 0
+
+
+def test_summaries_follow_orm_writes(chanjo_db, exon_lines):
+    # GIVEN a sample added as models through the ORM
+    exon_lines = list(exon_lines)
+    with chanjo_db.begin() as session:
+        session.add_all(link_elements(exon_lines).models)
+        result = load_transcripts(exon_lines, sample_id="sample", group_id="group")
+        session.add(result.sample)
+        session.add_all(result.models)
+    # THEN the summaries should be refreshed on flush
+    with chanjo_db.begin() as session:
+        stat_count = session.query(TranscriptStat).count()
+        assert session.get(SampleSummary, "sample").transcript_count == stat_count
+    # WHEN changing a transcript stat through the ORM
+    with chanjo_db.begin() as session:
+        stat = session.first(TranscriptStat.select())
+        stat.mean_coverage = 1000.0
+    # THEN the summary should follow
+    summary = chanjo_db.mean(sample_ids=["sample"]).one()
+    live = chanjo_db.mean(sample_ids=["sample"], summary=False).one()
+    assert summary[1] == pytest.approx(live[1])
+
+
+def test_missing_summary_calculated(chanjo_db, exon_lines):
+    # GIVEN a sample whose stats were inserted without summaries
+    exon_lines = list(exon_lines)
+    with chanjo_db.begin() as session:
+        session.add_all(link_elements(exon_lines).models)
+        result = load_transcripts(exon_lines, sample_id="sample", group_id="group")
+        session.add(result.sample)
+        session.add_all(result.models)
+    with chanjo_db.engine.begin() as connection:
+        connection.execute(delete(SampleSummary))
+        connection.execute(delete(GeneStat))
+    # WHEN calculating with the default summary reads
+    # THEN the results should come from the transcript stats
+    assert chanjo_db.mean().all() == chanjo_db.mean(summary=False).all()
+    assert len(chanjo_db.gene_metrics(28706).all()) == 1
+    coverage = chanjo_db.sample_coverage(["sample"], genes=[14825, 28706])
+    assert coverage == chanjo_db.sample_coverage(["sample"], genes=[14825, 28706], summary=False)
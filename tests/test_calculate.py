@@ -1,6 +1,10 @@
 """Test calculate module"""
 
-from chanjo.store.models import Sample
+import pytest
+from sqlalchemy import text
+
+from chanjo.calculate import IN_LIST_LIMIT, gene_filter
+from chanjo.store.models import Sample, Transcript, TranscriptStat
 
 
 def test_mean(populated_db):
@@ -65,3 +69,102 @@ def test_sample_coverage(populated_db):
         assert set(query.keys()) == set(sample_ids)
         for _, value in query.items():
             assert set(value.keys()) == set(["mean_coverage", "mean_completeness"])
+
+
+def test_sample_coverage_custom_level(chanjo_db):
+    """Test for coverage at a completeness level without its own column"""
+    # GIVEN a sample with completeness at 30x
+    with chanjo_db.begin() as session:
+        session.add(Transcript(id="NM_1", gene_id=1, gene_name="A", chromosome="1", length=10))
+        session.add(Sample(id="sample", thresholds=[10, 30]))
+        session.flush()
+        session.add(
+            TranscriptStat(
+                sample_id="sample",
+                transcript_id="NM_1",
+                mean_coverage=25.0,
+                completeness_10=100.0,
+                completeness={"10": 100.0, "30": 40.0},
+            )
+        )
+    chanjo_db.refresh_summaries()
+    # WHEN calculating coverage at 30x
+    data = chanjo_db.sample_coverage(sample_ids=["sample"], genes=[1], level=30)
+    # THEN completeness should be read from the JSON column
+    assert data["sample"]["mean_completeness"] == 40.0
+    # ... and default levels from their own columns
+    data = chanjo_db.sample_coverage(sample_ids=["sample"], genes=[1])
+    assert data["sample"]["mean_completeness"] == 100.0
+
+
+def test_sample_coverage_weighted(populated_db):
+    """Test for coverage weighted by transcript length"""
+    gene_ids = [14825, 28706, 31275]
+    # GIVEN transcript stats and lengths for a few genes
+    with populated_db.begin() as session:
+        rows = (
+            session.query(TranscriptStat.mean_coverage, Transcript.length)
+            .join(Transcript)
+            .filter(TranscriptStat.sample_id == "sample", Transcript.gene_id.in_(gene_ids))
+            .all()
+        )
+    expected = sum(coverage * length for coverage, length in rows) / sum(
+        length for _, length in rows
+    )
+    # WHEN calculating weighted coverage in the database
+    data = populated_db.sample_coverage(sample_ids=["sample"], genes=gene_ids, weighted=True)
+    # THEN it should match the weighted average
+    assert data["sample"]["mean_coverage"] == pytest.approx(expected)
+
+
+def test_gene_weighted(populated_db):
+    """Test for gene metrics weighted by transcript length"""
+    # GIVEN a database loaded with 2 samples
+    # WHEN calculating weighted metrics for a gene
+    results = populated_db.gene_metrics(28706, weighted=True).all()
+    # THEN there should be a row per sample with the gene id last
+    assert len(results) == 2
+    assert all(result[-1] == 28706 for result in results)
+
+
+@pytest.mark.parametrize("summary", [True, False])
+def test_sample_coverage_long_gene_list(populated_db, summary):
+    """Test for coverage on a gene list too long to inline"""
+    gene_ids = [14825, 28706]
+    # GIVEN a gene list padded past the inline limit
+    long_list = gene_ids + list(range(1000000, 1000000 + IN_LIST_LIMIT))
+    # WHEN calculating coverage with a temporary table
+    data = populated_db.sample_coverage(["sample"], genes=long_list, summary=summary)
+    # THEN it should match the short list
+    expected = populated_db.sample_coverage(["sample"], genes=gene_ids, summary=summary)
+    assert data == expected
+    # ... also when the table is reused
+    assert populated_db.sample_coverage(["sample"], genes=long_list, summary=summary) == expected
+
+
+def test_gene_filter(chanjo_db):
+    """Test for inlining short gene lists"""
+    with chanjo_db.begin() as session:
+        # GIVEN a short and a long gene list
+        # WHEN composing the filters
+        short_filter = gene_filter(session, Transcript.gene_id, [1, 2])
+        long_filter = gene_filter(session, Transcript.gene_id, range(IN_LIST_LIMIT + 1))
+        # THEN only the long list should use the temporary table
+        assert "chanjo_gene_filter" not in str(short_filter)
+        assert "chanjo_gene_filter" in str(long_filter)
+
+
+def test_gene_filter_rollback(chanjo_db):
+    """Test for reloading the gene filter after a rollback"""
+    genes = range(IN_LIST_LIMIT + 1)
+    # GIVEN a long gene list loaded in a transaction that is rolled back
+    with pytest.raises(RuntimeError):
+        with chanjo_db.begin() as session:
+            gene_filter(session, Transcript.gene_id, genes)
+            raise RuntimeError
+    # WHEN filtering on the same list again
+    with chanjo_db.begin() as session:
+        gene_filter(session, Transcript.gene_id, genes)
+        # THEN the genes should be loaded again
+        count = session.execute(text("SELECT COUNT(*) FROM chanjo_gene_filter")).scalar()
+        assert count == IN_LIST_LIMIT + 1
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import shutil
+
+import pytest
+
+from chanjo.load.parse.sambamba import depth_output
+from chanjo.sambamba import run_sambamba
+
+coverage = pytest.importorskip("chanjo.coverage")
+
+
+def test_read_regions(bed_lines):
+    # GIVEN chanjo BED lines
+    # WHEN parsing the regions
+    regions = coverage.read_regions(bed_lines)
+    # THEN the coordinates and extra columns should be split up
+    assert len(regions) == len(bed_lines)
+    assert regions[0] == ("1", 11, 18, ["1-11-18", "NM_152486", "28706", "SAMD11"])
+
+
+def test_bam_coverage(bam_path, bed_lines):
+    # GIVEN exon regions and a BAM file with coverage on chromosomes 22 and X
+    regions = coverage.read_regions(bed_lines)
+    # WHEN calculating coverage in a pool of workers
+    exons = list(coverage.bam_coverage(bam_path, regions, thresholds=[10, 50], processes=2))
+    # THEN each region should get coverage metrics in input order
+    assert [(exon["chrom"], exon["chromStart"]) for exon in exons] == [
+        (chrom, start) for chrom, start, _, _ in regions
+    ]
+    by_chrom = {exon["chrom"]: exon for exon in exons}
+    assert by_chrom["Y"]["meanCoverage"] == 0
+    assert by_chrom["X"]["readCount"] > 0
+    assert by_chrom["X"]["meanCoverage"] > 0
+    assert set(by_chrom["X"]["thresholds"]) == {10, 50}
+    assert by_chrom["X"]["sampleName"] == "ADM1003A3"
+
+
+def test_bam_coverage_missing_contig(bam_path):
+    # GIVEN a region on a contig that isn't in the BAM file
+    regions = [("chr1", 100, 200, [])]
+    # WHEN calculating coverage
+    exons = list(coverage.bam_coverage(bam_path, regions, thresholds=[10], processes=1))
+    # THEN the region should be reported without coverage
+    assert exons[0]["meanCoverage"] == 0
+    assert exons[0]["thresholds"] == {10: 0.0}
+
+
+def test_region_coverage_thresholds(bam_path):
+    # GIVEN an exon on chromosome 22 with coverage from 42x to 84x, per base
+    # depth as Sambamba counts it (aligned read bases, default filters)
+    regions = [("22", 32588888, 32589260, [])]
+    # WHEN calculating coverage at several levels
+    exon = coverage.region_coverage(bam_path, regions, thresholds=[0, 1, 10, 50, 100])[0]
+    # THEN each base should be counted once
+    assert exon["meanCoverage"] == pytest.approx(60.96774, abs=1e-4)
+    assert exon["thresholds"] == pytest.approx(
+        {0: 100.0, 1: 100.0, 10: 100.0, 50: 79.83871, 100: 0.0}, abs=1e-4
+    )
+
+
+@pytest.mark.skipif(shutil.which("sambamba") is None, reason="sambamba not installed")
+def test_region_coverage_like_sambamba(tmp_path, bam_path, bed_path):
+    # GIVEN Sambamba output for the exons of a BAM file
+    out_path = tmp_path.joinpath("coverage.bed")
+    run_sambamba(bam_path, bed_path, outfile=str(out_path), cov_thresholds=[10, 20, 50])
+    with open(out_path) as handle:
+        expected = list(depth_output(handle))
+    # WHEN calculating coverage in-process
+    with open(bed_path) as handle:
+        regions = coverage.read_regions(handle)
+    exons = coverage.region_coverage(bam_path, regions, thresholds=[10, 20, 50])
+    # THEN the metrics should match Sambamba's
+    for exon, sambamba_exon in zip(exons, expected):
+        assert exon["meanCoverage"] == pytest.approx(sambamba_exon["meanCoverage"], abs=0.01)
+        for level in [10, 20, 50]:
+            assert exon["thresholds"][level] == pytest.approx(
+                sambamba_exon["thresholds"][level], abs=0.01
+            )
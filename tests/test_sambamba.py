@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 import pytest
 
-from chanjo.sambamba import run_sambamba
+from chanjo.sambamba import merge_outputs, run_sambamba, split_regions
 
 THRESHOLDS = (10, 20)
 
@@ -16,3 +16,48 @@ def test_run_sambamba_missing(tmpdir, reset_path, bed_path, bam_path):
     out_path = tmpdir.join("ccds.coverage.bed")
     with pytest.raises(OSError):
         run_sambamba(bam_path, bed_path, outfile=str(out_path), cov_thresholds=THRESHOLDS)
+
+
+def test_run_sambamba_sharded_missing(tmpdir, reset_path, bed_path, bam_path):
+    out_path = tmpdir.join("ccds.coverage.bed")
+    with pytest.raises(OSError):
+        run_sambamba(bam_path, bed_path, outfile=str(out_path), processes=2)
+
+
+def test_split_regions_by_contig(bed_lines):
+    # GIVEN BED lines on four contigs
+    # WHEN splitting them up
+    shards = split_regions(bed_lines)
+    # THEN there should be one shard per contig in input order
+    assert [shard[0].split("\t")[0] for shard in shards] == ["1", "22", "X", "Y"]
+    assert sum(len(shard) for shard in shards) == len(bed_lines)
+
+
+def test_split_regions_balanced(bed_lines):
+    # GIVEN BED lines with one very long exon
+    # WHEN splitting them into balanced shards
+    shards = split_regions(bed_lines, shards=3)
+    # THEN at most three shards should keep all lines in input order
+    assert 1 < len(shards) <= 3
+    assert [line for shard in shards for line in shard] == bed_lines
+
+
+def test_split_regions_no_shards(bed_lines):
+    # GIVEN BED lines
+    # WHEN asking for zero shards
+    # THEN it should be rejected
+    with pytest.raises(ValueError):
+        split_regions(bed_lines, shards=0)
+
+
+def test_merge_outputs(tmpdir):
+    # GIVEN two sambamba outputs with a header each
+    paths = [tmpdir.join("shard0.bed"), tmpdir.join("shard1.bed")]
+    paths[0].write("# chrom\tchromStart\n1\t10\n")
+    paths[1].write("# chrom\tchromStart\n2\t20\n")
+    out_path = tmpdir.join("merged.bed")
+    # WHEN merging them
+    with open(str(out_path), "w") as out_handle:
+        merge_outputs([str(path) for path in paths], out_handle)
+    # THEN only the first header should be kept
+    assert out_path.read() == "# chrom\tchromStart\n1\t10\n2\t20\n"
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import stat
+import threading
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+import pytest
+
+from chanjo.client import ChanjoClient
+from chanjo.exc import ServerError
+from chanjo.server import is_loopback, make_unix_server
+from chanjo.store.cache import ResultCache
+
+
+def test_health(server_url):
+    # GIVEN a running server
+    # WHEN checking its health
+    data = ChanjoClient(server_url).health()
+    # THEN it should report ok
+    assert data["status"] == "ok"
+
+
+def test_calculate(popexist_db, server_url):
+    # GIVEN a server for a database with one sample
+    client = ChanjoClient(server_url)
+    # WHEN calculating through the client
+    # THEN the results should be the same as calling the store
+    assert client.mean() == [list(row) for row in popexist_db.mean()]
+    assert client.gene_metrics(28706, summary=False) == [
+        list(row) for row in popexist_db.gene_metrics(28706, summary=False)
+    ]
+    coverage = client.sample_coverage(["sample"], genes=[14825, 28706], weighted=True)
+    assert coverage == popexist_db.sample_coverage(["sample"], genes=[14825, 28706], weighted=True)
+
+
+def test_fetch(server_url):
+    # GIVEN a server for a database with one sample
+    client = ChanjoClient(server_url)
+    # WHEN fetching samples and transcripts
+    samples = client.fetch_samples(group_id="group")
+    transcripts = client.fetch_transcripts("sample")
+    # THEN they should be returned as dicts
+    assert [sample["id"] for sample in samples] == ["sample"]
+    assert len(transcripts) == 9
+
+
+def test_load(popexist_db, server_url, exon_lines):
+    # GIVEN a server and Sambamba output for a new sample
+    client = ChanjoClient(server_url)
+    # WHEN loading it through the client
+    result = client.load("".join(exon_lines), sample_id="new", group_id="group", name="New")
+    # THEN the sample should be stored by the server
+    assert result == {"sample_id": "new", "count": 9}
+    assert popexist_db.fetch_samples(sample_id="new").first().name == "New"
+    # WHEN loading the same sample again
+    # THEN the server should refuse it
+    with pytest.raises(ServerError, match="already loaded"):
+        client.load("".join(exon_lines), sample_id="new")
+
+
+def test_errors(server_url):
+    # GIVEN a server
+    client = ChanjoClient(server_url)
+    # WHEN calling an unknown method or passing unknown arguments
+    # THEN the errors should be raised in the client
+    with pytest.raises(ServerError, match="unknown method"):
+        client._call("drop_all")
+    with pytest.raises(ServerError, match="unexpected keyword"):
+        client._call("mean", sample=["sample"])
+    # WHEN the server can't be reached
+    with pytest.raises(ServerError, match="can't reach"):
+        ChanjoClient("http://127.0.0.1:1").health()
+
+
+def test_health_cache(popexist_db, server_url):
+    # GIVEN a server for a store with a result cache
+    popexist_db.result_cache = ResultCache()
+    client = ChanjoClient(server_url)
+    # WHEN calculating the same coverage twice
+    client.sample_coverage(["sample"], genes=[14825])
+    client.sample_coverage(["sample"], genes=[14825])
+    # THEN the cache counters should be reported
+    cache = client.health()["cache"]
+    assert (cache["hits"], cache["misses"]) == (1, 1)
+
+
+def test_fetch_transcripts_exons(popexist_db, server_url):
+    # GIVEN a server for a database with one sample
+    # WHEN fetching transcripts through the client
+    transcripts = ChanjoClient(server_url).fetch_transcripts("sample")
+    # THEN the exons should be decoded like the store does
+    by_id = {stat.transcript_id: stat for stat in popexist_db.fetch_transcripts("sample")}
+    for transcript in transcripts:
+        assert "_packed_exons" not in transcript
+        expected = [exon._asdict() for exon in by_id[transcript["transcript_id"]].incomplete_exons]
+        assert transcript["incomplete_exons"] == expected
+
+
+def test_release_connections(popexist_db, server_url):
+    # GIVEN a client for a server
+    client = ChanjoClient(server_url, timeout=10)
+    # WHEN calling it more often than the connection pool is large
+    for _ in range(20):
+        client.mean()
+        client.gene_metrics(28706)
+        client.fetch_samples()
+        client.fetch_transcripts("sample")
+    # THEN every call should return its connection to the pool
+    assert popexist_db.engine.pool.checkedout() == 0
+
+
+@pytest.mark.parametrize(
+    "host, loopback",
+    [("127.0.0.1", True), ("localhost", True), ("::1", True), ("0.0.0.0", False), ("host", False)],
+)
+def test_is_loopback(host, loopback):
+    assert is_loopback(host) is loopback
+
+
+def post(server_url, path, body, headers):
+    connection = HTTPConnection(urlsplit(server_url).netloc, timeout=10)
+    connection.request("POST", path, body=body, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response.status
+
+
+def test_reject_browser_requests(popexist_db, server_url, exon_lines):
+    # GIVEN a server and Sambamba output
+    body = json.dumps({"data": "".join(exon_lines), "sample_id": "new"})
+    # WHEN a web page posts it as a "simple" request without a preflight
+    status = post(server_url, "/load", body, {"Content-Type": "text/plain"})
+    # THEN it should be rejected
+    assert status == 415
+    # WHEN it's sent with a foreign host name, as after DNS rebinding
+    host = "attacker.example:{}".format(urlsplit(server_url).port)
+    status = post(server_url, "/load", body, {"Content-Type": "application/json", "Host": host})
+    # THEN it should be rejected too
+    assert status == 403
+    assert popexist_db.fetch_samples(sample_id="new").first() is None
+
+
+def test_unix_socket(popexist_db, tmp_path):
+    # GIVEN a server on a Unix socket
+    path = tmp_path.joinpath("chanjo.sock")
+    server = make_unix_server(popexist_db, path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        # THEN only the owner should be able to connect
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        # WHEN calling it through the client
+        client = ChanjoClient("unix://{}".format(path))
+        # THEN the results should be returned like over HTTP
+        assert client.health()["status"] == "ok"
+        assert [sample["id"] for sample in client.fetch_samples()] == ["sample"]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,5 +1,16 @@
 # -*- coding: utf-8 -*-
-from chanjo.sex import SexGuess, predict_sex, sex_from_bam
+import pytest
+
+from chanjo.sex import (
+    SexGuess,
+    index_path,
+    predict_sex,
+    read_index_counts,
+    sample_from_bam,
+    sex_from_bam,
+    sex_from_bams,
+    sex_from_index,
+)
 
 
 def test_SexGuess():
@@ -25,3 +36,50 @@ def test_sex_from_bam(bam_path):
     result = sex_from_bam(bam_path)
     assert result.x_coverage > result.y_coverage
     assert result.sex == "female"
+
+
+def test_read_index_counts(bam_path):
+    # GIVEN the index of a BAM file with reads on chromosomes 22 and X
+    # WHEN reading mapped reads per reference
+    mapped_reads = read_index_counts(index_path(bam_path))
+    # THEN only those references should have reads
+    assert sum(mapped_reads) == mapped_reads[21] + mapped_reads[22]
+    assert mapped_reads[22] > 0
+
+
+def test_sex_from_index(bam_path):
+    # use fixtures bam - doesn't have coverage on Y chromosome
+    result = sex_from_index(bam_path)
+    assert result.x_coverage > result.y_coverage
+    assert result.sex == "female"
+
+
+def test_sex_from_index_missing_chromosome(bam_path):
+    with pytest.raises(ValueError):
+        sex_from_index(bam_path, prefix="chr")
+
+
+def test_index_path_missing(tmp_path):
+    with pytest.raises(OSError):
+        index_path(tmp_path.joinpath("alignment.bam"))
+
+
+def test_sample_from_bam(bam_path):
+    # GIVEN a BAM file with a read group
+    # WHEN guessing the sample id
+    # THEN the "SM" tag should be used
+    assert sample_from_bam(bam_path) == "ADM1003A3"
+
+
+def test_sex_from_bams(bam_path, tmp_path):
+    # GIVEN two BAM files and a file that isn't a BAM
+    bad_path = tmp_path.joinpath("alignment.bam")
+    bad_path.write_text("not a bam")
+    bam_paths = [bam_path, str(bad_path), bam_path]
+    # WHEN predicting sex in batch
+    results = list(sex_from_bams(bam_paths, fast=True, workers=2))
+    # THEN results should come back in input order, failures as None
+    assert [path for path, _ in results] == bam_paths
+    assert results[0][1].sex == "female"
+    assert results[1][1] is None
+    assert results[2][1] == results[0][1]